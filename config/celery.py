@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_init
 from django.conf import settings
 
 # Set the default Django settings module for the 'celery' program.
@@ -15,6 +16,15 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@worker_init.connect
+def render_pdfs_inline(**kwargs):
+    """
+    Render PDFs in the task process: prefork children are daemonic and
+    cannot start a render pool of their own
+    """
+    settings.PDF_RENDER_POOL = {**settings.PDF_RENDER_POOL, "WORKERS": 0}
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
@@ -163,6 +163,14 @@ LOGGING = {
     },
 }
 
+# Cache shared by web and Celery workers (task progress and coordination)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": config('CACHE_URL', default='redis://localhost:6379/1'),
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
@@ -171,6 +179,21 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "remove-expired-exports": {
+        "task": "main.tasks.remove_expired_exports_task",
+        "schedule": 60 * 60,
+    },
+}
+
+# Server-Sent Events task progress: how often the stream checks the result
+# backend, and how long it stays open before the client has to reconnect
+TASK_EVENTS_POLL_INTERVAL = config('TASK_EVENTS_POLL_INTERVAL', default=0.5, cast=float)
+TASK_EVENTS_TIMEOUT = config('TASK_EVENTS_TIMEOUT', default=300, cast=int)
+# Every open stream holds a gunicorn thread. The Dockerfile runs 3 workers of
+# 8 threads; with at most 4 streams per worker, 4 threads of each stay free
+# for other requests. Clients past the cap reconnect a few seconds later.
+TASK_EVENTS_MAX_STREAMS = config('TASK_EVENTS_MAX_STREAMS', default=4, cast=int)
 
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
@@ -181,6 +204,118 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@cvproject.com')
 
+# Batch CV emails: messages sent per mail connection, and recipients per request
+EMAIL_BATCH_SIZE = config('EMAIL_BATCH_SIZE', default=50, cast=int)
+EMAIL_BATCH_MAX_RECIPIENTS = config('EMAIL_BATCH_MAX_RECIPIENTS', default=500, cast=int)
+
+# Seconds during which a repeated send of the same CV to the same recipient
+# (or with the same Idempotency-Key header) returns the first task instead
+EMAIL_IDEMPOTENCY_TIMEOUT = config('EMAIL_IDEMPOTENCY_TIMEOUT', default=600, cast=int)
+
+# Concurrent translation requests for the same CV version and languages share
+# one task. The lock expires after this many seconds if its worker dies
+TRANSLATION_SINGLE_FLIGHT_TIMEOUT = config('TRANSLATION_SINGLE_FLIGHT_TIMEOUT', default=600, cast=int)
+
+# Bulk CV upserts (POST /api/v1/cvs/bulk/): items per request, and items
+# written per transaction
+CV_BULK_MAX_ITEMS = config('CV_BULK_MAX_ITEMS', default=10000, cast=int)
+CV_BULK_CHUNK_SIZE = config('CV_BULK_CHUNK_SIZE', default=500, cast=int)
+
+# Text search configuration (stemming and stop words) of the PostgreSQL
+# full-text CV search
+SEARCH_CONFIG = config('SEARCH_CONFIG', default='english')
+# CVs per background task when a renamed or deleted skill is reindexed
+SEARCH_REINDEX_BATCH_SIZE = config('SEARCH_REINDEX_BATCH_SIZE', default=500, cast=int)
+
 # OpenAI Configuration
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
+# Point at an OpenAI-compatible server, e.g. a local stub in tests
+OPENAI_BASE_URL = config('OPENAI_BASE_URL', default='')
+
+# Concurrent requests per multi-language translation task, and the
+# requests/tokens per minute each worker process allows itself across all of
+# its OpenAI requests, sync or async (0 = no limit)
+OPENAI_CONCURRENCY = config('OPENAI_CONCURRENCY', default=4, cast=int)
+OPENAI_REQUESTS_PER_MINUTE = config('OPENAI_REQUESTS_PER_MINUTE', default=500, cast=int)
+OPENAI_TOKENS_PER_MINUTE = config('OPENAI_TOKENS_PER_MINUTE', default=60000, cast=int)
+
+# Token budgets of translation requests per model, "default" for the rest.
+# CHUNK_TOKENS is the most source text sent in one request; longer CV sections
+# are split at paragraphs and translated in parallel. MAX_TOKENS caps each
+# reply and leaves room for languages that need more tokens than English
+OPENAI_TRANSLATION_BUDGETS = {
+    "default": {"CHUNK_TOKENS": 800, "MAX_TOKENS": 2000},
+    "gpt-4o": {"CHUNK_TOKENS": 3000, "MAX_TOKENS": 8000},
+    "gpt-4o-mini": {"CHUNK_TOKENS": 3000, "MAX_TOKENS": 8000},
+}
+
+# Structured output mode per model, "default" for the rest: "json_schema"
+# (replies must match the schema), "json_object" (any JSON object) or None
+# for OpenAI-compatible servers without either
+OPENAI_RESPONSE_FORMATS = {
+    "default": "json_object",
+    "gpt-4o": "json_schema",
+    "gpt-4o-mini": "json_schema",
+}
+
+# Per-process OpenAI client: timeouts in seconds, retries of rate limited and
+# failed requests with exponential backoff, and a circuit breaker that fails
+# fast for CIRCUIT_RESET_TIMEOUT seconds after that many consecutive failures
+OPENAI_CLIENT = {
+    "TIMEOUT": config('OPENAI_TIMEOUT', default=60, cast=float),
+    "CONNECT_TIMEOUT": config('OPENAI_CONNECT_TIMEOUT', default=5, cast=float),
+    "MAX_RETRIES": config('OPENAI_MAX_RETRIES', default=3, cast=int),
+    "BACKOFF": 0.5,
+    "MAX_BACKOFF": 20,
+    "MAX_CONNECTIONS": 10,
+    "CIRCUIT_FAILURE_THRESHOLD": 5,
+    "CIRCUIT_RESET_TIMEOUT": 30,
+}
+
+# PDF Configuration
+PDF_CACHE = {
+    "STORAGE": "main.pdf.cache.FileSystemPdfStorage",
+    "OPTIONS": {
+        "location": config('PDF_CACHE_DIR', default=str(BASE_DIR / 'pdf_cache')),
+        "max_size": config('PDF_CACHE_MAX_SIZE', default=256 * 1024 * 1024, cast=int),
+    },
+}
+# Long-lived WeasyPrint processes per web worker. At most WORKERS + QUEUE_SIZE
+# renders are admitted at once; beyond that downloads get a 503 with Retry-After.
+# Set PDF_RENDER_WORKERS=0 to render inline. Celery workers always render
+# inline (see config/celery.py): their prefork children cannot start processes.
+PDF_RENDER_POOL = {
+    "WORKERS": config('PDF_RENDER_WORKERS', default=2, cast=int),
+    "QUEUE_SIZE": config('PDF_RENDER_QUEUE_SIZE', default=1, cast=int),
+    "TIMEOUT": config('PDF_RENDER_TIMEOUT', default=30, cast=int),
+    "RETRY_AFTER": config('PDF_RENDER_RETRY_AFTER', default=5, cast=int),
+}
+
+# PDF backend per call site. Call sites using the same backend share cached PDFs;
+# switch "email" to main.pdf.renderers.ReportLabRenderer for cheaper renders.
+PDF_RENDERERS = {
+    "download": {"BACKEND": "main.pdf.renderers.WeasyPrintRenderer"},
+    "email": {
+        "BACKEND": config('PDF_EMAIL_RENDERER', default='main.pdf.renderers.WeasyPrintRenderer'),
+        "OPTIONS": {"block": True},
+    },
+    "bulk": {
+        "BACKEND": config('PDF_BULK_RENDERER', default='main.pdf.renderers.WeasyPrintRenderer'),
+        "OPTIONS": {"block": True},
+    },
+}
+
+# Render PDFs in the background when a CV, its projects or its skills change.
+# Edits within DEBOUNCE seconds are folded into one render per CV.
+PDF_PRERENDER = {
+    "ENABLED": config('PDF_PRERENDER_ENABLED', default=True, cast=bool),
+    "DEBOUNCE": config('PDF_PRERENDER_DEBOUNCE', default=10, cast=int),
+    "PURPOSES": ["download", "email"],
+}
+
+# Bulk ZIP exports
+PDF_EXPORT_DIR = config('PDF_EXPORT_DIR', default=str(BASE_DIR / 'pdf_exports'))
+# Seconds an export archive stays downloadable; celery beat removes older ones
+PDF_EXPORT_RETENTION = config('PDF_EXPORT_RETENTION', default=24 * 60 * 60, cast=int)
+PDF_EXPORT_CHUNK_SIZE = config('PDF_EXPORT_CHUNK_SIZE', default=25, cast=int)
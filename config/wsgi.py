@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Warm up the PDF render processes once per web worker, before the first
+# download has to pay for loading WeasyPrint and the fonts
+from main.pdf.pool import get_render_pool  # noqa: E402
+
+get_render_pool().start()
@@ -1,5 +1,13 @@
 from django.contrib import admin
-from main.models import CV, Skill, Project
+from main.models import (
+    CV,
+    CVTranslation,
+    Project,
+    Skill,
+    SkillTranslation,
+    TranslationBatch,
+    TranslationMemory,
+)
 
 
 class SkillInline(admin.TabularInline):
@@ -83,3 +91,42 @@ class ProjectAdmin(admin.ModelAdmin):
         return obj.cv.full_name
 
     get_cv_name.short_description = "CV Owner"
+
+
+@admin.register(CVTranslation)
+class CVTranslationAdmin(admin.ModelAdmin):
+    list_display = ["cv", "language", "title", "updated_at"]
+    list_filter = ["language"]
+    search_fields = ["cv__first_name", "cv__last_name", "title"]
+    list_select_related = ["cv"]
+    readonly_fields = ["source_version", "created_at", "updated_at"]
+
+
+@admin.register(SkillTranslation)
+class SkillTranslationAdmin(admin.ModelAdmin):
+    list_display = ["skill", "language", "name"]
+    list_filter = ["language"]
+    search_fields = ["skill__name", "name"]
+    list_select_related = ["skill"]
+
+
+@admin.register(TranslationMemory)
+class TranslationMemoryAdmin(admin.ModelAdmin):
+    list_display = ["source_hash", "language", "model", "created_at"]
+    list_filter = ["language", "model"]
+    search_fields = ["source_hash", "translated_text"]
+    readonly_fields = ["created_at"]
+
+
+@admin.register(TranslationBatch)
+class TranslationBatchAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "languages",
+        "cvs",
+        "translated",
+        "skipped",
+        "failed",
+        "finished_at",
+    ]
+    readonly_fields = ["created_at", "updated_at", "finished_at"]
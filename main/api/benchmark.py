@@ -0,0 +1,116 @@
+"""
+Benchmark page latency of the CV list API at increasing depths, in cursor
+and page-number mode. The generated CVs are rolled back afterwards, so the
+database is untouched.
+"""
+
+import statistics
+import time
+
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.pagination import Cursor
+from rest_framework.test import APIRequestFactory
+
+from main.models import CV
+from .pagination import CVCursorPagination
+from .views import CVListCreateAPIView
+
+MODES = ["cursor", "page"]
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_DEPTHS = [0, 1_000, 10_000, 100_000, 500_000, 999_000]
+
+LIST_URL = "/api/v1/cvs/"
+
+
+def create_benchmark_rows(rows, batch_size=5000, on_progress=None):
+    """Insert rows generated CVs in batches"""
+    for start in range(0, rows, batch_size):
+        CV.objects.bulk_create(
+            [
+                CV(
+                    first_name="Benchmark",
+                    last_name=f"Candidate {i}",
+                    email=f"pagination-{i}@example.com",
+                    title="Software Engineer",
+                    bio="Builds and operates backend services.",
+                    experience="Backend engineer",
+                    education="Computer Science Degree",
+                )
+                for i in range(start, min(start + batch_size, rows))
+            ]
+        )
+        if on_progress:
+            on_progress(min(start + batch_size, rows))
+
+
+def page_url(mode, depth, page_size):
+    """URL of the page whose first row is the depth-th CV in API order"""
+    if mode == "page":
+        return f"{LIST_URL}?page={depth // page_size + 1}&page_size={page_size}"
+
+    # Jump straight to the row the cursor of the previous page would point at
+    paginator = CVCursorPagination()
+    paginator.base_url = f"http://testserver{LIST_URL}?page_size={page_size}"
+    if depth == 0:
+        return paginator.base_url
+    previous = CV.objects.order_by(*paginator.ordering).only("id", "updated_at")[
+        depth - 1
+    ]
+    return paginator.encode_cursor(
+        Cursor(offset=0, reverse=False, position=paginator.encode_position(previous))
+    )
+
+
+def measure_page(url, repeat):
+    """Time repeated GETs of one list page through the API view"""
+    factory = APIRequestFactory()
+    view = CVListCreateAPIView.as_view()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = view(factory.get(url))
+        response.render()
+        timings.append(time.perf_counter() - started)
+    return {
+        "status": response.status_code,
+        "wall_time": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "max": max(timings),
+        },
+    }
+
+
+def run_benchmark(
+    rows=DEFAULT_ROWS,
+    depths=DEFAULT_DEPTHS,
+    modes=MODES,
+    page_size=20,
+    repeat=5,
+    on_result=None,
+    on_progress=None,
+):
+    """Measure every mode at every depth below the number of rows"""
+    results = []
+    # Requests are built for the test server, whatever hosts this site serves
+    with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]):
+        create_benchmark_rows(rows, on_progress=on_progress)
+        for depth in [depth for depth in depths if depth < rows]:
+            for mode in modes:
+                result = {
+                    "case": f"{mode}:rows={rows}:depth={depth}",
+                    "mode": mode,
+                    "rows": rows,
+                    "depth": depth,
+                    "page_size": page_size,
+                    **measure_page(page_url(mode, depth, page_size), repeat),
+                }
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+        transaction.set_rollback(True)
+
+    return results
@@ -0,0 +1,134 @@
+"""
+Upsert many CVs matched on email. Items are validated one by one, then
+written in chunks: each chunk is one transaction with one INSERT ... ON
+CONFLICT per set of fields given, one pass over Skill.name, one bulk insert
+into the skills through table and a search index update.
+
+Items for new emails must be complete CVs. Items for existing emails may
+be partial: only the fields they give, skills included, are updated.
+"""
+
+import logging
+
+from django.db import DatabaseError, transaction
+
+from main.models import CV, Skill
+from main.search import reindex_cvs
+from .serializers import CVBulkSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_cvs(items, chunk_size=500):
+    """
+    Create or update a CV for every item. Returns one result per item, in
+    order, with status "created", "updated" or "error".
+    """
+    results = [None] * len(items)
+    emails = [
+        item["email"]
+        for item in items
+        if isinstance(item, dict) and isinstance(item.get("email"), str)
+    ]
+    existing = set(CV.objects.filter(email__in=emails).values_list("email", flat=True))
+
+    valid = []
+    seen = set()
+    for index, item in enumerate(items):
+        partial = isinstance(item, dict) and item.get("email") in existing
+        serializer = CVBulkSerializer(data=item, partial=partial)
+        if not serializer.is_valid():
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "errors": serializer.errors,
+            }
+            continue
+
+        email = serializer.validated_data["email"]
+        if email in seen:
+            results[index] = {
+                "index": index,
+                "email": email,
+                "status": "error",
+                "errors": {"email": ["Duplicate email in this request"]},
+            }
+            continue
+        seen.add(email)
+        valid.append((index, serializer.validated_data))
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start : start + chunk_size]
+        try:
+            with transaction.atomic():
+                _upsert_chunk(chunk, existing, results)
+        except DatabaseError as e:
+            logger.error(
+                f"Bulk CV upsert of items {chunk[0][0]}-{chunk[-1][0]} failed: {e}"
+            )
+            for index, data in chunk:
+                results[index] = {
+                    "index": index,
+                    "email": data["email"],
+                    "status": "error",
+                    "errors": {
+                        "non_field_errors": [
+                            "The chunk with this item could not be saved"
+                        ]
+                    },
+                }
+
+    return results
+
+
+def _upsert_chunk(chunk, existing, results):
+    emails = [data["email"] for _, data in chunk]
+
+    # Rows of one INSERT ... ON CONFLICT share the fields they update
+    by_fields = {}
+    for _, data in chunk:
+        fields = frozenset(data) - {"skills"}
+        by_fields.setdefault(fields, []).append(data)
+    for fields, group in by_fields.items():
+        CV.objects.bulk_create(
+            [CV(**{name: data[name] for name in fields}) for data in group],
+            update_conflicts=True,
+            unique_fields=["email"],
+            # updated_at also moves for items that only change skills
+            update_fields=sorted(fields - {"email"} | {"updated_at"}),
+        )
+    # Not every backend returns the ids of updated rows
+    cv_ids = dict(CV.objects.filter(email__in=emails).values_list("email", "pk"))
+
+    # Items with a skills list replace the CV's skills with it
+    with_skills = [
+        (cv_ids[data["email"]], data["skills"]) for _, data in chunk if "skills" in data
+    ]
+    if with_skills:
+        names = {name for _, skills in with_skills for name in skills}
+        Skill.objects.bulk_create(
+            [Skill(name=name) for name in names], ignore_conflicts=True
+        )
+        skill_ids = dict(Skill.objects.filter(name__in=names).values_list("name", "pk"))
+
+        through = CV.skills.through
+        through.objects.filter(cv_id__in=[cv_id for cv_id, _ in with_skills]).delete()
+        through.objects.bulk_create(
+            [
+                through(cv_id=cv_id, skill_id=skill_ids[name])
+                for cv_id, skills in with_skills
+                for name in dict.fromkeys(skills)
+            ]
+        )
+
+    # bulk_create sends no signals, so the search index is written here
+    reindex_cvs(list(cv_ids.values()))
+
+    for index, data in chunk:
+        email = data["email"]
+        results[index] = {
+            "index": index,
+            "email": email,
+            "id": cv_ids[email],
+            "status": "updated" if email in existing else "created",
+        }
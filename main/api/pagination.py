@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class CVCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the (-updated_at, id) index. The cursor holds both
+    columns of the last row of the previous page, so CVs sharing a timestamp
+    are neither skipped nor repeated, deep pages cost the same as the first
+    and no COUNT(*) is run.
+    """
+
+    ordering = ("-updated_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        if reverse:
+            queryset = queryset.order_by("updated_at", "-id")
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            updated_at, pk = self.decode_position(self.cursor.position)
+            # The range on updated_at alone lets the database seek the index
+            # instead of scanning it up to the cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(updated_at__gt=updated_at) | Q(id__lt=pk),
+                    updated_at__gte=updated_at,
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(updated_at__lt=updated_at) | Q(id__gt=pk),
+                    updated_at__lte=updated_at,
+                )
+
+        # One extra row tells whether there is a page after this one
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def encode_position(self, cv):
+        return f"{cv.id}:{cv.updated_at.isoformat()}"
+
+    def decode_position(self, position):
+        try:
+            pk, _, updated_at = (position or "").partition(":")
+            return datetime.fromisoformat(updated_at), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self.encode_position(self.page[-1])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self.encode_position(self.page[0])
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+
+class CVPageNumberPagination(PageNumberPagination):
+    """Opt-in page-number pagination for clients that need page counts"""
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
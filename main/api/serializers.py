@@ -1,11 +1,71 @@
 from rest_framework import serializers
-from main.models import CV
+from main.models import CV, Project, Skill
+
+
+class SkillSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Skill
+        fields = ["id", "name"]
+
+
+class ProjectSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Project
+        fields = [
+            "id",
+            "title",
+            "description",
+            "technologies",
+            "url",
+            "start_date",
+            "end_date",
+        ]
 
 
 class CVSerializer(serializers.ModelSerializer):
+    # Relations that ?expand= nests in responses, with the lookup to prefetch.
+    # Skills are written as primary keys either way.
+    EXPANDABLE = {
+        "skills": "skills",
+        "projects": "project_set",
+    }
+
+    # Named field sets for ?profile=; list responses default to compact
+    PROFILES = {
+        "compact": [
+            "id",
+            "first_name",
+            "last_name",
+            "email",
+            "title",
+            "location",
+            "created_at",
+            "updated_at",
+        ],
+    }
+
     class Meta:
         model = CV
-        fields = "__all__"
+        exclude = ["search_vector"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset chosen by the view, None for every field
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        expand = self.context.get("expand", ())
+        if "skills" in expand:
+            data["skills"] = SkillSerializer(instance.skills.all(), many=True).data
+        if "projects" in expand:
+            data["projects"] = ProjectSerializer(
+                instance.project_set.all(), many=True
+            ).data
+        return data
 
     def validate_email(self, value):
         """Validate email format"""
@@ -18,3 +78,15 @@ class CVSerializer(serializers.ModelSerializer):
         if not value.replace("+", "").replace("-", "").replace(" ", "").isdigit():
             raise serializers.ValidationError("Invalid phone number format")
         return value
+
+
+class CVBulkSerializer(CVSerializer):
+    """
+    One item of a bulk upsert. Items are matched on email, so it is not
+    checked for uniqueness, and skills are given by name.
+    """
+
+    email = serializers.EmailField(max_length=254)
+    skills = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False
+    )
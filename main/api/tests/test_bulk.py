@@ -0,0 +1,178 @@
+import json
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from audit.models import RequestLog
+from main.models import CV, Skill
+
+
+def make_item(i, **overrides):
+    return {
+        "first_name": "John",
+        "last_name": f"Doe {i}",
+        "email": f"john.doe{i}@example.com",
+        "title": "Software Developer",
+        "bio": "Experienced developer",
+        "experience": "5+ years of software development experience",
+        "education": "Bachelor's in Computer Science",
+        **overrides,
+    }
+
+
+class CVBulkUpsertTestCase(APITestCase):
+    """Test cases for POST /api/v1/cvs/bulk/"""
+
+    def setUp(self):
+        self.url = reverse("cv-bulk-upsert")
+        self.existing = CV.objects.create(**make_item(0, title="Junior Developer"))
+        self.existing.skills.add(Skill.objects.create(name="PHP"))
+
+    def test_array_creates_and_updates_on_email(self):
+        """Test that new emails are created and known ones updated in place"""
+        items = [make_item(0, title="Senior Developer"), make_item(1), make_item(2)]
+
+        response = self.client.post(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (
+                response.data["created"],
+                response.data["updated"],
+                response.data["failed"],
+            ),
+            (2, 1, 0),
+        )
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["updated", "created", "created"],
+        )
+        self.assertEqual(response.data["results"][0]["id"], self.existing.pk)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.title, "Senior Developer")
+        self.assertEqual(CV.objects.count(), 3)
+        self.assertEqual(RequestLog.objects.filter(path=self.url).count(), 1)
+
+    def test_ndjson_body_is_accepted(self):
+        """Test that one CV per line is read from an NDJSON body"""
+        body = "\n".join(json.dumps(make_item(i)) for i in range(1, 4)) + "\n"
+
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 3)
+
+    def test_invalid_ndjson_line_is_reported(self):
+        """Test that a broken NDJSON line fails the request with its number"""
+        body = json.dumps(make_item(1)) + "\n{not json\n"
+
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("line 2", response.data["detail"])
+
+    def test_skills_are_resolved_by_name_and_replaced(self):
+        """Test that skills are created once by name and replace the CV's set"""
+        items = [
+            make_item(0, skills=["Python", "Django"]),
+            make_item(1, skills=["Python", "Python"]),
+            make_item(2),
+        ]
+
+        self.client.post(self.url, items, format="json")
+
+        self.assertEqual(
+            sorted(self.existing.skills.values_list("name", flat=True)),
+            ["Django", "Python"],
+        )
+        cv = CV.objects.get(email="john.doe1@example.com")
+        self.assertEqual(list(cv.skills.values_list("name", flat=True)), ["Python"])
+        self.assertEqual(Skill.objects.filter(name="Python").count(), 1)
+
+    def test_partial_item_updates_only_its_fields(self):
+        """Test that fields left out of an item for an existing CV are kept"""
+        CV.objects.filter(pk=self.existing.pk).update(
+            phone="+1234567890",
+            location="Kyiv",
+            github_url="https://github.com/johndoe",
+        )
+
+        response = self.client.post(
+            self.url,
+            [{"email": self.existing.email, "title": "Staff Engineer"}],
+            format="json",
+        )
+
+        self.assertEqual(response.data["results"][0]["status"], "updated")
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.title, "Staff Engineer")
+        self.assertEqual(self.existing.phone, "+1234567890")
+        self.assertEqual(self.existing.location, "Kyiv")
+        self.assertEqual(self.existing.github_url, "https://github.com/johndoe")
+        self.assertEqual(self.existing.bio, "Experienced developer")
+        self.assertEqual(
+            list(self.existing.skills.values_list("name", flat=True)), ["PHP"]
+        )
+
+    def test_partial_item_for_new_email_is_rejected(self):
+        """Test that a new CV must be complete"""
+        response = self.client.post(
+            self.url, [{"email": "new@example.com", "title": "Designer"}], format="json"
+        )
+
+        self.assertEqual(response.data["results"][0]["status"], "error")
+        self.assertIn("bio", response.data["results"][0]["errors"])
+        self.assertFalse(CV.objects.filter(email="new@example.com").exists())
+
+    def test_invalid_items_fail_alone(self):
+        """Test that invalid and duplicate items are reported and the rest saved"""
+        items = [
+            make_item(1),
+            {"first_name": "No email"},
+            make_item(1, title="Duplicate"),
+            make_item(2),
+        ]
+
+        response = self.client.post(self.url, items, format="json")
+
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created", "error", "error", "created"],
+        )
+        self.assertIn("email", results[1]["errors"])
+        self.assertIn("email", results[2]["errors"])
+        self.assertEqual(
+            CV.objects.get(email="john.doe1@example.com").title, "Software Developer"
+        )
+
+    @override_settings(CV_BULK_CHUNK_SIZE=10)
+    def test_queries_per_chunk_do_not_grow_with_items(self):
+        """Test that a chunk costs the same queries for 2 or 10 CVs"""
+
+        def count_queries(start, size):
+            items = [
+                make_item(i, skills=["Python"]) for i in range(start, start + size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, items, format="json")
+            self.assertEqual(response.data["created"], size)
+            return len(queries)
+
+        self.assertEqual(count_queries(100, 2), count_queries(200, 10))
+
+    @override_settings(CV_BULK_MAX_ITEMS=2)
+    def test_body_must_be_a_bounded_list(self):
+        """Test that objects and oversized batches are rejected"""
+        response = self.client.post(self.url, make_item(1), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.url, [make_item(i) for i in range(3)], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(CV.objects.count(), 1)
@@ -0,0 +1,137 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from main.models import CV, Project, Skill
+
+
+# Pre-rendering is not under test and needs a broker
+@override_settings(
+    PDF_PRERENDER={"ENABLED": False, "DEBOUNCE": 10, "PURPOSES": ["download"]}
+)
+class CVConditionalAPITestCase(APITestCase):
+    """Test cases for ETag, Last-Modified and If-Match on the CV API"""
+
+    def setUp(self):
+        cache.clear()
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Software Developer",
+            bio="Experienced developer",
+            experience="5+ years of software development experience",
+            education="Bachelor's in Computer Science",
+        )
+        self.list_url = reverse("cv-list-create")
+        self.detail_url = reverse("cv-detail", kwargs={"pk": self.cv.pk})
+
+    def test_unchanged_cv_is_not_modified(self):
+        """Test that a matching If-None-Match or If-Modified-Since returns 304"""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changed_cv_is_sent_again(self):
+        """Test that edits to the CV or its projects change the ETag"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(
+                cv=self.cv,
+                title="Shop",
+                description="Online shop",
+                technologies="Django",
+            )
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_is_not_modified_until_a_cv_changes(self):
+        """Test that the list ETag follows creates, updates and deletes"""
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.cv.delete()
+        # Deletions are recorded in the database, not only in the cache
+        cache.clear()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+
+    def test_update_with_current_etag_succeeds(self):
+        """Test that If-Match with the current ETag updates and returns the new one"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        response = self.client.patch(
+            self.detail_url,
+            {"title": "Lead Developer"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(self.detail_url)["ETag"], response["ETag"])
+
+    def test_etag_after_skills_update_stays_current(self):
+        """Test that the ETag returned for a skills change allows the next update"""
+        python = Skill.objects.create(name="Python")
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.detail_url,
+                {"skills": [python.pk]},
+                format="json",
+                HTTP_IF_MATCH=etag,
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(self.detail_url)["ETag"], etag)
+
+        response = self.client.patch(
+            self.detail_url,
+            {"title": "Lead Developer"},
+            format="json",
+            HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lost_update_is_refused(self):
+        """Test that If-Match with an outdated ETag returns 412 and changes nothing"""
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.client.patch(self.detail_url, {"title": "Lead Developer"}, format="json")
+
+        response = self.client.patch(
+            self.detail_url, {"title": "Architect"}, format="json", HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.cv.refresh_from_db()
+        self.assertEqual(self.cv.title, "Lead Developer")
+
+    def test_missing_cv_is_not_found(self):
+        """Test that conditional requests for a missing CV still return 404"""
+        url = reverse("cv-detail", kwargs={"pk": 9999})
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(
+            url, {"title": "X"}, format="json", HTTP_IF_MATCH='"x"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,99 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from main.models import CV, Project, Skill
+
+
+class CVExpandTestCase(APITestCase):
+    """Test cases for nesting skills and projects with ?expand="""
+
+    def setUp(self):
+        python = Skill.objects.create(name="Python")
+        django = Skill.objects.create(name="Django")
+        for i in range(12):
+            cv = CV.objects.create(
+                first_name="John",
+                last_name=f"Doe {i}",
+                email=f"john.doe{i}@example.com",
+                title="Software Developer",
+                bio="Experienced developer",
+                experience="5+ years of software development experience",
+                education="Bachelor's in Computer Science",
+            )
+            cv.skills.add(python, django)
+            Project.objects.create(
+                cv=cv,
+                title=f"Project {i}",
+                description="A web application",
+                technologies="Python, Django",
+            )
+        self.cv = cv
+        self.list_url = reverse("cv-list-create")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_skills_and_projects_are_nested(self):
+        """Test that expanded relations are returned as objects"""
+        response = self.client.get(
+            reverse("cv-detail", kwargs={"pk": self.cv.pk}),
+            {"expand": "skills,projects"},
+        )
+
+        self.assertEqual(
+            [skill["name"] for skill in response.data["skills"]], ["Django", "Python"]
+        )
+        self.assertEqual(response.data["projects"][0]["title"], "Project 11")
+        self.assertEqual(response.data["projects"][0]["technologies"], "Python, Django")
+
+    def test_relations_are_not_nested_by_default(self):
+        """Test that without ?expand= skills stay primary keys and projects are left out"""
+        response = self.client.get(reverse("cv-detail", kwargs={"pk": self.cv.pk}))
+
+        self.assertEqual(len(response.data["skills"]), 2)
+        self.assertTrue(all(isinstance(pk, int) for pk in response.data["skills"]))
+        self.assertNotIn("projects", response.data)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        """Test that a page costs the same queries for 2 or 12 CVs"""
+        for expand in ["", "skills", "projects", "skills,projects"]:
+            with self.subTest(expand=expand):
+                small = self.count_queries(
+                    f"{self.list_url}?page_size=2&expand={expand}"
+                )
+                large = self.count_queries(
+                    f"{self.list_url}?page_size=12&expand={expand}"
+                )
+                self.assertEqual(small, large)
+
+        # The list's latest change and deletion for its ETag, the page, its
+        # projects and its skills, then the audit log insert wrapped in a
+        # savepoint
+        with self.assertNumQueries(8):
+            self.client.get(f"{self.list_url}?page_size=12&expand=skills,projects")
+
+    def test_unknown_expansion_is_rejected(self):
+        """Test that ?expand= only accepts known relations"""
+        response = self.client.get(f"{self.list_url}?expand=skills,secrets")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secrets", response.data["expand"])
+
+    def test_skills_are_still_written_as_primary_keys(self):
+        """Test that expanding on an update leaves skills writable by ID"""
+        python = Skill.objects.get(name="Python")
+
+        response = self.client.patch(
+            f"{reverse('cv-detail', kwargs={'pk': self.cv.pk})}?expand=skills",
+            {"skills": [python.pk]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["skills"], [{"id": python.pk, "name": "Python"}])
@@ -0,0 +1,102 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from main.models import CV, Skill
+from main.api.serializers import CVSerializer
+
+
+class CVSparseFieldsTestCase(APITestCase):
+    """Test cases for ?fields= and ?profile= on the CV API"""
+
+    def setUp(self):
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            location="New York, NY",
+            title="Software Developer",
+            bio="Experienced developer",
+            experience="5+ years of software development experience",
+            education="Bachelor's in Computer Science",
+        )
+        self.cv.skills.add(Skill.objects.create(name="Python"))
+        self.list_url = reverse("cv-list-create")
+        self.detail_url = reverse("cv-detail", kwargs={"pk": self.cv.pk})
+
+    def get_with_sql(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        page_queries = [
+            q["sql"] for q in queries if 'FROM "main_cv" ORDER BY' in q["sql"]
+        ]
+        return response, page_queries[0]
+
+    def test_list_defaults_to_compact_profile(self):
+        """Test that lists return and load only the compact fields"""
+        response, sql = self.get_with_sql(self.list_url)
+
+        self.assertEqual(
+            set(response.data["results"][0]), set(CVSerializer.PROFILES["compact"])
+        )
+        for column in ["bio", "experience", "education"]:
+            self.assertNotIn(f'"main_cv"."{column}"', sql)
+
+    def test_fields_restrict_output_and_columns(self):
+        """Test that ?fields= picks the fields returned and the columns loaded"""
+        response, sql = self.get_with_sql(f"{self.list_url}?fields=first_name,bio")
+
+        self.assertEqual(set(response.data["results"][0]), {"id", "first_name", "bio"})
+        self.assertIn('"main_cv"."bio"', sql)
+        self.assertNotIn('"main_cv"."experience"', sql)
+        self.assertNotIn('"main_cv"."email"', sql)
+
+    def test_full_profile_and_detail_return_every_field(self):
+        """Test that ?profile=full lists every field and details default to it"""
+        response = self.client.get(f"{self.list_url}?profile=full")
+        self.assertEqual(response.data["results"][0]["bio"], "Experienced developer")
+        self.assertEqual(len(response.data["results"][0]["skills"]), 1)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data["education"], "Bachelor's in Computer Science")
+
+        response = self.client.get(f"{self.detail_url}?profile=compact")
+        self.assertNotIn("education", response.data)
+
+    def test_expanded_relations_are_added_to_fields(self):
+        """Test that ?expand= adds its relations to a sparse fieldset"""
+        response = self.client.get(f"{self.list_url}?fields=title&expand=skills")
+
+        self.assertEqual(set(response.data["results"][0]), {"id", "title", "skills"})
+        self.assertEqual(response.data["results"][0]["skills"][0]["name"], "Python")
+
+    def test_unknown_fields_and_profiles_are_rejected(self):
+        """Test that unknown field and profile names return 400"""
+        response = self.client.get(f"{self.list_url}?fields=title,salary")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("salary", response.data["fields"])
+
+        response = self.client.get(f"{self.list_url}?profile=tiny")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_sparse_fields(self):
+        """Test that creating a CV validates and returns every field"""
+        response = self.client.post(
+            f"{self.list_url}?fields=title",
+            {
+                "first_name": "Jane",
+                "last_name": "Smith",
+                "email": "jane.smith@example.com",
+                "title": "UX Designer",
+                "bio": "Creative designer",
+                "experience": "3+ years in UX/UI design",
+                "education": "Master's in Design",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["bio"], "Creative designer")
@@ -0,0 +1,142 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.pagination import Cursor
+from rest_framework.test import APITestCase
+
+from main.api.pagination import CVCursorPagination
+from main.models import CV
+
+
+class CVPaginationTestCase(APITestCase):
+    """Test cases for cursor and page-number pagination of the CV list"""
+
+    def setUp(self):
+        self.cvs = [
+            CV.objects.create(
+                first_name="John",
+                last_name=f"Doe {i}",
+                email=f"john.doe{i}@example.com",
+                title="Software Developer",
+                bio="Experienced developer",
+                experience="5+ years of software development experience",
+                education="Bachelor's in Computer Science",
+            )
+            for i in range(7)
+        ]
+        self.list_url = reverse("cv-list-create")
+
+    def test_cursor_pages_walk_every_cv_once(self):
+        """Test that following next links returns each CV once, newest first"""
+        url = f"{self.list_url}?page_size=3"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            seen.extend(cv["id"] for cv in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(seen, [cv.pk for cv in reversed(self.cvs)])
+
+    def test_cursor_pages_split_cvs_with_one_timestamp(self):
+        """Test that CVs sharing updated_at are paged by id, both ways"""
+        # Bulk touches give many CVs the same timestamp
+        CV.objects.update(updated_at=self.cvs[0].updated_at)
+        by_id = [cv.pk for cv in self.cvs]
+
+        url = f"{self.list_url}?page_size=3"
+        pages = []
+        while url:
+            response = self.client.get(url)
+            pages.append([cv["id"] for cv in response.data["results"]])
+            url = response.data["next"]
+        self.assertEqual(pages, [by_id[0:3], by_id[3:6], by_id[6:]])
+
+        url = response.data["previous"]
+        previous = []
+        while url:
+            response = self.client.get(url)
+            previous.append([cv["id"] for cv in response.data["results"]])
+            url = response.data["previous"]
+        self.assertEqual(previous, [by_id[3:6], by_id[0:3]])
+
+    def test_cursor_page_runs_no_count_or_offset(self):
+        """Test that a deep cursor page filters on the index instead of counting"""
+        response = self.client.get(f"{self.list_url}?page_size=3")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(response.data["results"]), 3)
+        sql = " ".join(query["sql"] for query in queries).upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+    def test_page_number_mode_is_opt_in(self):
+        """Test that ?page= switches to page numbers with a count"""
+        response = self.client.get(f"{self.list_url}?page=2&page_size=3")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(
+            [cv["id"] for cv in response.data["results"]],
+            [cv.pk for cv in reversed(self.cvs)][3:6],
+        )
+
+    def test_invalid_cursor_is_not_found(self):
+        """Test that a garbled cursor returns 404"""
+        response = self.client.get(f"{self.list_url}?cursor=garbage")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        paginator = CVCursorPagination()
+        paginator.base_url = f"http://testserver{self.list_url}"
+        url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position="1:x"))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_benchmark_command_writes_results(self):
+        """Test the pagination benchmark on a small table"""
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        output = os.path.join(location, "results.json")
+
+        call_command(
+            "benchmark_api_pagination",
+            "--output",
+            output,
+            "--rows",
+            "50",
+            "--depths",
+            "0",
+            "25",
+            "100",
+            "--page-size",
+            "10",
+            "--repeat",
+            "1",
+            stdout=io.StringIO(),
+        )
+
+        with open(output) as results_file:
+            results = json.load(results_file)["results"]
+        self.assertEqual(
+            [result["case"] for result in results],
+            [
+                "cursor:rows=50:depth=0",
+                "page:rows=50:depth=0",
+                "cursor:rows=50:depth=25",
+                "page:rows=50:depth=25",
+            ],
+        )
+        self.assertTrue(all(result["status"] == 200 for result in results))
+        # Generated CVs are rolled back
+        self.assertEqual(CV.objects.count(), 7)
@@ -0,0 +1,72 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from main.models import CV
+
+
+class CVSearchAPITestCase(APITestCase):
+    """Test cases for GET /api/v1/cvs/search/"""
+
+    def setUp(self):
+        for i in range(3):
+            CV.objects.create(
+                first_name="John",
+                last_name=f"Doe {i}",
+                email=f"john.doe{i}@example.com",
+                title="Python Developer" if i else "Office Manager",
+                bio="Experienced professional",
+                experience="Writes Python every day" if i else "Runs the office",
+                education="Computer Science Degree",
+            )
+        self.url = reverse("cv-search")
+
+    def test_results_are_ranked_and_paginated(self):
+        """Test that matches come back compact, counted and paginated"""
+        response = self.client.get(self.url, {"q": "python", "page_size": 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotIn("bio", response.data["results"][0])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_query_is_required(self):
+        """Test that a missing or wordless query returns 400"""
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        response = self.client.get(self.url, {"q": "***"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_document_is_not_serialized(self):
+        """Test that the search vector column never appears in responses"""
+        cv = CV.objects.first()
+
+        response = self.client.get(reverse("cv-detail", kwargs={"pk": cv.pk}))
+
+        self.assertNotIn("search_vector", response.data)
+
+    def test_bulk_upserted_cvs_are_searchable(self):
+        """Test that CVs written by the bulk endpoint are indexed"""
+        self.client.post(
+            reverse("cv-bulk-upsert"),
+            [
+                {
+                    "first_name": "Ada",
+                    "last_name": "Lovelace",
+                    "email": "ada@example.com",
+                    "title": "Analyst",
+                    "bio": "Programs the analytical engine",
+                    "experience": "Notes on the engine",
+                    "education": "Private tutoring",
+                    "skills": ["Mathematics"],
+                }
+            ],
+            format="json",
+        )
+
+        response = self.client.get(self.url, {"q": "mathematics"})
+
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["email"], "ada@example.com")
@@ -1,8 +1,15 @@
 from django.urls import path
-from .views import CVListCreateAPIView, CVRetrieveUpdateDestroyAPIView
+from .views import (
+    CVBulkUpsertAPIView,
+    CVListCreateAPIView,
+    CVRetrieveUpdateDestroyAPIView,
+    CVSearchAPIView,
+)
 
 # API URLs
 urlpatterns = [
     path("cvs/", CVListCreateAPIView.as_view(), name="cv-list-create"),
+    path("cvs/search/", CVSearchAPIView.as_view(), name="cv-search"),
+    path("cvs/bulk/", CVBulkUpsertAPIView.as_view(), name="cv-bulk-upsert"),
     path("cvs/<int:pk>/", CVRetrieveUpdateDestroyAPIView.as_view(), name="cv-detail"),
 ]
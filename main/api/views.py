@@ -1,26 +1,225 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from main.conditional import (
+    conditional_response,
+    cv_list_validators,
+    cv_validators,
+    set_validators,
+)
 from main.models import CV
+from main.search import SearchError, search_cvs
+from main.signals import touch_related_changes
+from .bulk import upsert_cvs
+from .pagination import CVCursorPagination, CVPageNumberPagination
+from .parsers import NDJSONParser
 from .serializers import CVSerializer
 
 
+class CVQueryMixin:
+    """
+    ?expand=skills,projects nests related objects in the response and
+    prefetches them, so a page costs the same number of queries at any size.
+    ?fields= and ?profile= pick the fields to return, and only their
+    columns are loaded.
+    """
+
+    def get_expand(self):
+        if not hasattr(self, "_expand"):
+            requested = self.request.query_params.get("expand", "")
+            expand = {name.strip() for name in requested.split(",") if name.strip()}
+            unknown = expand - set(CVSerializer.EXPANDABLE)
+            if unknown:
+                raise ValidationError(
+                    {"expand": f"Cannot expand: {', '.join(sorted(unknown))}"}
+                )
+            self._expand = expand
+        return self._expand
+
+    # Field profile of read responses without ?fields= or ?profile=
+    default_profile = "full"
+
+    def get_sparse_fields(self):
+        """
+        Fields to return for ?fields=a,b or ?profile=compact|full, None for
+        every field. Writes always validate and return every field.
+        """
+        if self.request.method not in SAFE_METHODS:
+            return None
+        if not hasattr(self, "_sparse_fields"):
+            params = self.request.query_params
+            if "fields" in params:
+                fields = {
+                    name.strip() for name in params["fields"].split(",") if name.strip()
+                }
+                unknown = fields - set(CVSerializer().fields)
+                if unknown:
+                    raise ValidationError(
+                        {"fields": f"Unknown fields: {', '.join(sorted(unknown))}"}
+                    )
+            else:
+                profile = params.get("profile", self.default_profile)
+                if profile == "full":
+                    fields = None
+                elif profile in CVSerializer.PROFILES:
+                    fields = set(CVSerializer.PROFILES[profile])
+                else:
+                    raise ValidationError({"profile": f"Unknown profile: {profile}"})
+            if fields is not None:
+                fields |= {"id"} | self.get_expand()
+            self._sparse_fields = fields
+        return self._sparse_fields
+
+    def get_queryset(self):
+        queryset = CV.objects.defer("search_vector")
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # Only load the selected columns, plus the keyset ordering
+            columns = {
+                field.attname
+                for field in CV._meta.concrete_fields
+                if field.name in fields
+            }
+            queryset = queryset.only(*sorted(columns | {"id", "updated_at"}))
+
+        lookups = {CVSerializer.EXPANDABLE[name] for name in self.get_expand()}
+        if fields is None or "skills" in fields:
+            # Skill primary keys are listed even when not expanded
+            lookups.add("skills")
+        return queryset.prefetch_related(*sorted(lookups))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        context["fields"] = self.get_sparse_fields()
+        return context
+
+
 # API Views
-class CVListCreateAPIView(generics.ListCreateAPIView):
+class CVListCreateAPIView(CVQueryMixin, generics.ListCreateAPIView):
     """
-    GET: List all CVs
+    GET: List all CVs, a cursor page at a time (?page=N for page numbers),
+    in the compact profile unless ?fields= or ?profile= says otherwise
     POST: Create a new CV
     """
 
     queryset = CV.objects.all()
     serializer_class = CVSerializer
+    pagination_class = CVCursorPagination
+    default_profile = "compact"
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if CVPageNumberPagination.page_query_param in self.request.query_params:
+                self._paginator = CVPageNumberPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, cv_list_validators(), super().list, *args, **kwargs
+        )
 
 
-class CVRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CVRetrieveUpdateDestroyAPIView(
+    CVQueryMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
-    GET: Retrieve a specific CV
-    PUT/PATCH: Update a specific CV
+    GET: Retrieve a specific CV, or 304 for If-None-Match/If-Modified-Since
+    PUT/PATCH: Update a specific CV, or 412 when If-Match is out of date
     DELETE: Delete a specific CV
     """
 
     queryset = CV.objects.all()
     serializer_class = CVSerializer
     lookup_field = "pk"
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = cv_validators(kwargs[self.lookup_field])
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+        return conditional_response(
+            request, validators, super().retrieve, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        """Refuse the update with 412 when If-Match names an older version"""
+        pk = kwargs[self.lookup_field]
+        with transaction.atomic():
+            validators = cv_validators(pk, lock=True)
+            if validators is None:
+                return super().update(request, *args, **kwargs)
+
+            etag, last_modified = validators
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is not None:
+                response["ETag"] = etag
+                return response
+
+            response = super().update(request, *args, **kwargs)
+            if response.status_code == 200:
+                # Skill changes would otherwise move updated_at after commit
+                touch_related_changes([pk])
+                set_validators(response, *cv_validators(pk))
+            return response
+
+
+class CVSearchAPIView(CVQueryMixin, generics.ListAPIView):
+    """
+    GET: CVs matching every word of ?q= in their title, bio, experience,
+    education, skills or projects, best match first
+    """
+
+    serializer_class = CVSerializer
+    pagination_class = CVPageNumberPagination
+    default_profile = "compact"
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "")
+        try:
+            return search_cvs(super().get_queryset(), query)
+        except SearchError as e:
+            raise ValidationError({"q": str(e)})
+
+
+class CVBulkUpsertAPIView(APIView):
+    """
+    POST: Create or update many CVs, matched on email, from a JSON array or
+    NDJSON (application/x-ndjson). Returns a result per item.
+    """
+
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(
+                {"detail": "Expected a JSON array or NDJSON lines of CVs"}
+            )
+        if len(items) > settings.CV_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {"detail": f"At most {settings.CV_BULK_MAX_ITEMS} CVs per request"}
+            )
+
+        results = upsert_cvs(items, chunk_size=settings.CV_BULK_CHUNK_SIZE)
+        counts = {"created": 0, "updated": 0, "error": 0}
+        for result in results:
+            counts[result["status"]] += 1
+        return Response(
+            {
+                "created": counts["created"],
+                "updated": counts["updated"],
+                "failed": counts["error"],
+                "results": results,
+            }
+        )
@@ -0,0 +1,90 @@
+"""
+Validators for conditional requests on CVs. ETags and Last-Modified are
+derived from updated_at, which edits to a CV's projects and skills also
+touch (see signals), so 304 and 412 responses are answered with one small
+query, without loading or rendering the CV.
+"""
+
+import calendar
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import CV, CVDeletion
+
+
+def _timestamp(value):
+    return calendar.timegm(value.utctimetuple()) if value else None
+
+
+def cv_validators(pk, with_translations=False, lock=False):
+    """
+    (etag, last_modified) of a CV, or None if it does not exist. With
+    translations, stored translations of the CV count as changes too.
+    lock holds the row until the end of the transaction, so a checked
+    If-Match stays true until the update is saved.
+    """
+    queryset = CV.objects.filter(pk=pk)
+    if lock:
+        queryset = queryset.select_for_update()
+    elif with_translations:
+        row = (
+            queryset.annotate(
+                translations_count=Count("translations"),
+                translated_at=Max("translations__updated_at"),
+            )
+            .values_list("updated_at", "translations_count", "translated_at")
+            .first()
+        )
+        if row is None:
+            return None
+        updated_at, count, translated_at = row
+        latest = max(updated_at, translated_at or updated_at)
+        etag = f"cv-page-{pk}-{updated_at.timestamp():.6f}-{count}-{latest.timestamp():.6f}"
+        return quote_etag(etag), _timestamp(latest)
+
+    updated_at = queryset.values_list("updated_at", flat=True).first()
+    if updated_at is None:
+        return None
+    return quote_etag(f"cv-{pk}-{updated_at.timestamp():.6f}"), _timestamp(updated_at)
+
+
+def cv_list_validators():
+    """
+    (etag, last_modified) of the whole CV list: the latest CV change or
+    deletion. Both are read from the end of an index, unlike a COUNT(*),
+    so this stays cheap however many CVs there are.
+    """
+    changes = [
+        CV.objects.aggregate(latest=Max("updated_at"))["latest"],
+        CVDeletion.objects.aggregate(latest=Max("deleted_at"))["latest"],
+    ]
+    changed_at = max(
+        (change.timestamp() for change in changes if change is not None), default=0
+    )
+    etag = quote_etag(f"cvs-{changed_at:.6f}")
+    return etag, int(changed_at) if changed_at else None
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # Caches may keep the response but must revalidate it every time
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_response(request, validators, view, *args, **kwargs):
+    """
+    Answer 304 or 412 from the validators when the request's conditions
+    allow it, otherwise call the view for the full response
+    """
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+    return set_validators(response, etag, last_modified)
@@ -0,0 +1,79 @@
+"""
+Idempotency keys for Celery tasks: the first request for a key claims a
+task id in the cache, and repeats within the timeout get the same id back
+instead of enqueueing the task again. Used as a single-flight lock, the
+task releases the key when it finishes.
+"""
+
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+
+
+def make_key(namespace, *parts):
+    """Build a bounded-length cache key from arbitrary parts"""
+    digest = hashlib.sha256(
+        "\x1f".join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f"idempotency:{namespace}:{digest}"
+
+
+def payload_digest(payload):
+    """Hash a JSON-serializable request payload independently of key order"""
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def claim_payload(key, digest, timeout):
+    """
+    Bind a client-supplied key to the payload first sent with it. Returns
+    False when the key was already used with a different payload.
+    """
+    while True:
+        if cache.add(key, digest, timeout):
+            return True
+        existing = cache.get(key)
+        # Retry when the key expired between add() and get()
+        if existing is not None:
+            return existing == digest
+
+
+def claim_task_id(key, timeout):
+    """
+    Return (task_id, created). created is True when this caller claimed the
+    key and must enqueue the task under task_id; otherwise task_id belongs to
+    the task already enqueued for the key.
+    """
+    task_id = str(uuid.uuid4())
+    while True:
+        if cache.add(key, task_id, timeout):
+            return task_id, True
+        existing = cache.get(key)
+        # Retry when the key expired between add() and get()
+        if existing is not None:
+            return existing, False
+
+
+def release(key, task_id):
+    """Free a key so the next request enqueues again, if task_id still holds it"""
+    if cache.get(key) == task_id:
+        cache.delete(key)
+
+
+def claim_single_flight(key, timeout):
+    """
+    Like claim_task_id, for keys the task releases when it is done. A key
+    still held by a task that already finished, e.g. one killed by a time
+    limit before it could release it, is taken over. A task whose worker
+    died without a result holds the key until the timeout expires.
+    """
+    from celery.result import AsyncResult
+
+    task_id, created = claim_task_id(key, timeout)
+    if not created and AsyncResult(task_id).ready():
+        release(key, task_id)
+        task_id, created = claim_task_id(key, timeout)
+    return task_id, created
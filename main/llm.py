@@ -0,0 +1,554 @@
+"""
+Client layer for OpenAI: a pooled per-process client with retries and a
+circuit breaker, request metrics, and token buckets for requests and
+tokens per minute so concurrent translations stay within the account's
+rate limits instead of running into 429 responses.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+
+import httpx
+import openai
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text):
+    """
+    Rough token count of a text: about four characters per token for ASCII,
+    and a token per character for other scripts, which tokenize far worse
+    """
+    ascii_chars = sum(1 for char in text if char.isascii())
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+# Boundaries oversized text is split on, from the most to the least natural:
+# paragraphs, lines, then sentences
+SPLIT_PATTERNS = [r"\n\s*\n", r"\n", r"(?<=[.!?])\s+"]
+
+
+def split_text(text, max_tokens, patterns=SPLIT_PATTERNS):
+    """
+    Split text into chunks of at most about max_tokens tokens, at paragraph
+    boundaries where possible. Returns (chunk, separator) pairs; joining
+    each chunk followed by its separator gives back the text.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [(text, "")]
+    if not patterns:
+        return _cut_text(text, max_tokens)
+
+    pattern, *finer_patterns = patterns
+    pieces = re.split(f"({pattern})", text)
+    parts = list(zip(pieces[::2], pieces[1::2] + [""]))
+
+    chunks = []
+    current = current_separator = None
+    for part, separator in parts:
+        if estimate_tokens(part) > max_tokens:
+            if current is not None:
+                chunks.append((current, current_separator))
+                current = None
+            # Keep the separator after the last piece of the oversized part
+            split = split_text(part, max_tokens, finer_patterns)
+            chunks.extend(split[:-1])
+            chunks.append((split[-1][0], separator))
+        elif current is None:
+            current, current_separator = part, separator
+        elif estimate_tokens(current + current_separator + part) <= max_tokens:
+            current += current_separator + part
+            current_separator = separator
+        else:
+            chunks.append((current, current_separator))
+            current, current_separator = part, separator
+
+    if current is not None:
+        chunks.append((current, current_separator))
+    return chunks
+
+
+def _cut_text(text, max_tokens):
+    """Cut text without natural boundaries into pieces of max_tokens tokens"""
+    chunks = []
+    start = 0
+    cost = 0
+    for index, char in enumerate(text):
+        cost += 0.25 if char.isascii() else 1
+        if cost > max_tokens - 1 and index > start:
+            chunks.append((text[start:index], ""))
+            start = index
+            cost = 0.25 if char.isascii() else 1
+    chunks.append((text[start:], ""))
+    return chunks
+
+
+class TokenBucket:
+    """
+    Allows rate_per_minute units per minute, with bursts of up to one
+    minute's worth. A rate of 0 disables the limit. Buckets are thread safe
+    and not tied to an event loop, so one bucket serves a whole process.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate_per_minute / 60,
+        )
+        self.updated_at = now
+
+    def reserve(self, amount=1):
+        """
+        Take amount units and return the seconds to wait before using them.
+        The bucket goes into debt, so callers are served in arrival order.
+        """
+        if not self.rate_per_minute:
+            return 0
+        # A request larger than the bucket would never fit; let it drain the bucket
+        amount = min(amount, self.capacity)
+
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            return max(0, -self.tokens * 60 / self.rate_per_minute)
+
+    def acquire(self, amount=1):
+        """Wait until amount units are available and take them"""
+        time.sleep(self.reserve(amount))
+
+    async def aacquire(self, amount=1):
+        """Like acquire, without blocking the event loop"""
+        await asyncio.sleep(self.reserve(amount))
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one API"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def reserve(self, tokens):
+        """Take one request of about `tokens` tokens; return the seconds to wait"""
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def acquire(self, tokens):
+        """Wait until one more request of about `tokens` tokens is allowed"""
+        time.sleep(self.reserve(tokens))
+
+    async def aacquire(self, tokens):
+        """Like acquire, without blocking the event loop"""
+        await asyncio.sleep(self.reserve(tokens))
+
+
+class LLMError(Exception):
+    """Base class for failures of the LLM client layer"""
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the API while the provider is considered down"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive provider failures and fails
+    fast for reset_timeout seconds. Then a single trial request is let
+    through: success closes the circuit, failure or a rate limit opens it
+    again, and any other outcome ends the trial so the next request is one.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        """
+        Return (allowed, trial): whether a request may be sent now, and
+        whether it is the half-open trial, whose outcome must be recorded
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True, False
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True, True
+            return False, False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        """Count a provider failure; returns True when this opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            was_closed = self.opened_at is None
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+                return was_closed
+            return False
+
+    def record_rate_limited(self):
+        """A rate limited trial shows the provider is still not taking requests"""
+        with self._lock:
+            if self._trial_running:
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+    def end_trial(self):
+        """End a trial whose outcome says nothing about the provider"""
+        with self._lock:
+            self._trial_running = False
+
+
+# Upper bounds in seconds of the request latency histogram
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 30, 60]
+
+METRICS_PREFIX = "llm-metrics"
+
+ERROR_KINDS = ["rate_limited", "server_error", "timeout", "connection", "client_error"]
+
+
+def _incr(name, amount=1):
+    key = f"{METRICS_PREFIX}:{name}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # Evicted between add() and incr(); metrics are best effort
+        pass
+
+
+def record_request(latency, error=None, usage=None):
+    """Count one API request in the metrics shared by all processes"""
+    _incr("requests")
+    _incr("latency_ms_total", int(latency * 1000))
+    bucket = next((str(b) for b in LATENCY_BUCKETS if latency <= b), "inf")
+    _incr(f"latency_bucket:{bucket}")
+    if error is not None:
+        _incr(f"errors:{error}")
+    if usage is not None:
+        _incr("prompt_tokens", usage.prompt_tokens or 0)
+        _incr("completion_tokens", usage.completion_tokens or 0)
+
+
+def get_llm_metrics():
+    """Return request, error, retry, token and latency counters of the LLM client"""
+    buckets = [str(b) for b in LATENCY_BUCKETS] + ["inf"]
+    names = (
+        [
+            "requests",
+            "retries",
+            "circuit_opened",
+            "circuit_rejected",
+            "latency_ms_total",
+            "prompt_tokens",
+            "completion_tokens",
+        ]
+        + [f"errors:{kind}" for kind in ERROR_KINDS]
+        + [f"latency_bucket:{bucket}" for bucket in buckets]
+    )
+    values = cache.get_many([f"{METRICS_PREFIX}:{name}" for name in names])
+
+    def value(name):
+        return values.get(f"{METRICS_PREFIX}:{name}", 0)
+
+    requests = value("requests")
+    return {
+        "requests": requests,
+        "retries": value("retries"),
+        "circuit_opened": value("circuit_opened"),
+        "circuit_rejected": value("circuit_rejected"),
+        "errors": {kind: value(f"errors:{kind}") for kind in ERROR_KINDS},
+        "tokens": {
+            "prompt": value("prompt_tokens"),
+            "completion": value("completion_tokens"),
+        },
+        "latency": {
+            "average_ms": value("latency_ms_total") // requests if requests else None,
+            # Requests that took at most this many seconds, not cumulative
+            "buckets": {
+                bucket: value(f"latency_bucket:{bucket}") for bucket in buckets
+            },
+        },
+    }
+
+
+def _error_kind(exc):
+    if isinstance(exc, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(exc, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(exc, openai.APIConnectionError):
+        return "connection"
+    if isinstance(exc, openai.APIStatusError) and exc.status_code >= 500:
+        return "server_error"
+    return "client_error"
+
+
+class LLMClient:
+    """
+    OpenAI client shared by everything in one worker process. Connections
+    are kept alive between requests, every request has bounded timeouts and
+    waits for the process's requests and tokens per minute budget, rate
+    limits and provider errors are retried with exponential backoff, and a
+    circuit breaker fails fast while the provider is down.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url=None,
+        timeout=60,
+        connect_timeout=5,
+        max_retries=3,
+        backoff=0.5,
+        max_backoff=20,
+        max_connections=10,
+        failure_threshold=5,
+        reset_timeout=30,
+        requests_per_minute=0,
+        tokens_per_minute=0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _client_options(self):
+        return {
+            "api_key": self.api_key,
+            "base_url": self.base_url,
+            "timeout": self.timeout,
+            # Retries are handled here, so the circuit breaker sees them
+            "max_retries": 0,
+        }
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = openai.OpenAI(
+                    http_client=httpx.Client(limits=self.limits, timeout=self.timeout),
+                    **self._client_options(),
+                )
+            return self._client
+
+    def async_client(self):
+        """
+        Return a new AsyncOpenAI client for one batch of concurrent requests.
+        Async connections belong to an event loop, so they cannot be shared
+        with later batches.
+        """
+        return openai.AsyncOpenAI(
+            http_client=httpx.AsyncClient(limits=self.limits, timeout=self.timeout),
+            **self._client_options(),
+        )
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def chat(self, **params):
+        """Create a chat completion, retrying as configured"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(self._request_tokens(params))
+            trial = self._check_circuit()
+            started = time.monotonic()
+            try:
+                response = self.client.chat.completions.create(**params)
+            except openai.APIError as e:
+                delay = self._handle_error(
+                    e, attempt, time.monotonic() - started, trial
+                )
+            except BaseException:
+                self._abandon(trial)
+                raise
+            else:
+                self._handle_success(time.monotonic() - started, response)
+                return response
+            time.sleep(delay)
+
+    async def achat(self, client, **params):
+        """Create a chat completion with an async client, retrying as configured"""
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(self._request_tokens(params))
+            trial = self._check_circuit()
+            started = time.monotonic()
+            try:
+                response = await client.chat.completions.create(**params)
+            except openai.APIError as e:
+                delay = self._handle_error(
+                    e, attempt, time.monotonic() - started, trial
+                )
+            except BaseException:
+                # Includes cancellation of the batch the request belongs to
+                self._abandon(trial)
+                raise
+            else:
+                self._handle_success(time.monotonic() - started, response)
+                return response
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _request_tokens(params):
+        """Tokens a request counts against the limit: its prompt and reply budget"""
+        prompt = sum(
+            estimate_tokens(message["content"]) for message in params["messages"]
+        )
+        return prompt + params.get("max_tokens", 0)
+
+    def _check_circuit(self):
+        """Raise CircuitOpenError, or return whether the request is the trial"""
+        allowed, trial = self.breaker.allow()
+        if not allowed:
+            _incr("circuit_rejected")
+            raise CircuitOpenError("OpenAI is unavailable, not sending the request")
+        return trial
+
+    def _abandon(self, trial):
+        if trial:
+            self.breaker.end_trial()
+
+    def _handle_success(self, latency, response):
+        self.breaker.record_success()
+        usage = getattr(response, "usage", None)
+        record_request(latency, usage=usage)
+        if usage is not None:
+            logger.debug(
+                f"OpenAI request took {latency:.2f}s, {usage.prompt_tokens} prompt "
+                f"and {usage.completion_tokens} completion tokens"
+            )
+
+    def _handle_error(self, exc, attempt, latency, trial=False):
+        """Record a failed request; re-raise it, or return the delay before a retry"""
+        kind = _error_kind(exc)
+        # The breaker is updated first, so a trial always ends here
+        if kind == "client_error":
+            # The provider is up, the request is wrong; retrying will not help
+            self.breaker.record_success()
+        elif kind == "rate_limited":
+            if trial:
+                self.breaker.record_rate_limited()
+        elif self.breaker.record_failure():
+            logger.error("OpenAI circuit breaker opened")
+            _incr("circuit_opened")
+        record_request(latency, error=kind)
+
+        if kind == "client_error" or attempt >= self.max_retries:
+            raise exc
+
+        _incr("retries")
+        delay = min(self.backoff * 2**attempt, self.max_backoff)
+        retry_after = self._retry_after(exc)
+        if retry_after is not None:
+            delay = min(max(delay, retry_after), self.max_backoff)
+        logger.warning(f"OpenAI request failed ({kind}), retrying in {delay:.1f}s")
+        # Jitter keeps concurrent retries from arriving together
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def _retry_after(exc):
+        response = getattr(exc, "response", None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the per-process LLMClient configured by the OPENAI_* settings"""
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            config = settings.OPENAI_CLIENT
+            _llm_client = LLMClient(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=config["TIMEOUT"],
+                connect_timeout=config["CONNECT_TIMEOUT"],
+                max_retries=config["MAX_RETRIES"],
+                backoff=config["BACKOFF"],
+                max_backoff=config["MAX_BACKOFF"],
+                max_connections=config["MAX_CONNECTIONS"],
+                failure_threshold=config["CIRCUIT_FAILURE_THRESHOLD"],
+                reset_timeout=config["CIRCUIT_RESET_TIMEOUT"],
+                requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+                tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+            )
+        return _llm_client
+
+
+def reset_llm_client():
+    """Close the per-process client, so the next use builds a new one"""
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is not None:
+            _llm_client.close()
+        _llm_client = None
+
+
+@receiver(setting_changed)
+def _reset_llm_client(*, setting, **kwargs):
+    if setting in (
+        "OPENAI_API_KEY",
+        "OPENAI_BASE_URL",
+        "OPENAI_CLIENT",
+        "OPENAI_REQUESTS_PER_MINUTE",
+        "OPENAI_TOKENS_PER_MINUTE",
+    ):
+        reset_llm_client()
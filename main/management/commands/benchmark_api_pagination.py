@@ -0,0 +1,72 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.api.benchmark import DEFAULT_DEPTHS, DEFAULT_ROWS, MODES, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmark CV list API page latency by depth in cursor and page-number mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="api_pagination_benchmark.json",
+            help="Path of the JSON results file to write",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=DEFAULT_ROWS,
+            help="Generated CVs to page through",
+        )
+        parser.add_argument(
+            "--depths",
+            nargs="+",
+            type=int,
+            default=DEFAULT_DEPTHS,
+            help="Row offsets of the pages to time",
+        )
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed requests per case"
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1 or options["rows"] < 1:
+            raise CommandError("--rows and --repeat must be at least 1")
+
+        def progress(rows):
+            if rows % 100_000 == 0 or rows == options["rows"]:
+                self.stdout.write(f"Inserted {rows} CVs")
+
+        def report(result):
+            self.stdout.write(
+                f"{result['case']}: {result['wall_time']['median'] * 1000:.1f} ms"
+            )
+
+        results = run_benchmark(
+            rows=options["rows"],
+            depths=options["depths"],
+            modes=options["modes"],
+            page_size=options["page_size"],
+            repeat=options["repeat"],
+            on_result=report,
+            on_progress=progress,
+        )
+
+        with open(options["output"], "w") as output_file:
+            json.dump(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
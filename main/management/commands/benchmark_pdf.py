@@ -0,0 +1,120 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.pdf.benchmark import (
+    DEFAULT_PROJECT_COUNTS,
+    DEFAULT_SKILL_COUNTS,
+    DEFAULT_TEXT_SIZE,
+    ENGINES,
+    find_regressions,
+    run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark PDF rendering time, peak memory and output size by CV size"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="pdf_benchmark.json",
+            help="Path of the JSON results file to write",
+        )
+        parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+        parser.add_argument(
+            "--projects",
+            nargs="+",
+            type=int,
+            default=DEFAULT_PROJECT_COUNTS,
+            help="Project counts to benchmark",
+        )
+        parser.add_argument(
+            "--skills",
+            nargs="+",
+            type=int,
+            default=DEFAULT_SKILL_COUNTS,
+            help="Skill counts to benchmark",
+        )
+        parser.add_argument(
+            "--text-size",
+            type=int,
+            default=DEFAULT_TEXT_SIZE,
+            help="Length in characters of the bio and experience texts",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Timed renders per case"
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Results file of a previous run to check for regressions",
+        )
+        parser.add_argument(
+            "--max-time-regression",
+            type=float,
+            default=20,
+            help="Allowed increase of median wall time, in percent",
+        )
+        parser.add_argument(
+            "--max-memory-regression",
+            type=float,
+            default=10,
+            help="Allowed increase of peak RSS, in percent",
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as baseline_file:
+                    baseline = json.load(baseline_file)["results"]
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+
+        def report(result):
+            self.stdout.write(
+                f"{result['case']}: "
+                f"{result['wall_time']['median'] * 1000:.0f} ms, "
+                f"peak RSS {result['peak_rss_kb'] / 1024:.1f} MB, "
+                f"{result['size_bytes'] / 1024:.1f} KB"
+            )
+
+        results = run_benchmark(
+            engines=options["engines"],
+            project_counts=options["projects"],
+            skill_counts=options["skills"],
+            text_size=options["text_size"],
+            repeat=options["repeat"],
+            on_result=report,
+        )
+
+        with open(options["output"], "w") as output_file:
+            json.dump(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+        if baseline is not None:
+            regressions = find_regressions(
+                baseline,
+                results,
+                options["max_time_regression"],
+                options["max_memory_regression"],
+            )
+            if regressions:
+                raise CommandError(
+                    "PDF rendering regressed:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
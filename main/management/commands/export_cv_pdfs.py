@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.pdf.export import EXPORT_FILTERS, ExportError, select_cv_ids, write_cv_archive
+
+
+class Command(BaseCommand):
+    help = "Export the PDFs of selected CVs into a ZIP archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the ZIP archive to write")
+        parser.add_argument("--ids", nargs="+", type=int, help="CV ids to export")
+        for name, lookup in EXPORT_FILTERS.items():
+            parser.add_argument(f"--{name}", help=f"Filter CVs by {lookup}")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of PDFs rendered in parallel",
+        )
+
+    def handle(self, *args, **options):
+        filters = {
+            name: options[name] for name in EXPORT_FILTERS if options[name] is not None
+        }
+        try:
+            cv_ids = select_cv_ids(ids=options["ids"], filters=filters)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if not cv_ids:
+            raise CommandError("No CVs match the selection")
+
+        def report_progress(done, total):
+            self.stdout.write(f"\rExported {done}/{total}", ending="")
+            self.stdout.flush()
+
+        with open(options["output"], "wb") as archive_file:
+            failed = write_cv_archive(
+                cv_ids,
+                archive_file,
+                concurrency=options["concurrency"],
+                on_progress=report_progress,
+            )
+
+        self.stdout.write("")
+        if failed:
+            self.stderr.write(f"Failed CV ids: {', '.join(map(str, failed))}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(cv_ids) - len(failed)} PDFs to {options['output']}"
+            )
+        )
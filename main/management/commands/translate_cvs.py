@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import TranslationBatch
+from main.services import TranslationService
+from main.tasks import translate_cv_batch_task
+from main.translation_batch import (
+    BatchError,
+    start_translation_batch,
+    translate_next_chunk,
+)
+
+
+class Command(BaseCommand):
+    help = "Translate every CV into the given languages, skipping current translations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "languages",
+            nargs="*",
+            help="Target languages, or 'all' for every supported language",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50,
+            help="CVs loaded and translated per chunk",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Translation requests in flight"
+        )
+        parser.add_argument(
+            "--resume",
+            type=int,
+            metavar="BATCH_ID",
+            help="Continue an interrupted batch from its last finished chunk",
+        )
+        parser.add_argument(
+            "--queue",
+            action="store_true",
+            help="Run the chunks as chained Celery tasks instead of in this process",
+        )
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            try:
+                batch = TranslationBatch.objects.get(pk=options["resume"])
+            except TranslationBatch.DoesNotExist:
+                raise CommandError(f"Translation batch {options['resume']} not found")
+            if batch.finished_at:
+                raise CommandError(f"Translation batch {batch.pk} is already finished")
+        else:
+            languages = options["languages"]
+            if languages == ["all"]:
+                languages = list(TranslationService.SUPPORTED_LANGUAGES)
+            try:
+                batch = start_translation_batch(
+                    languages,
+                    chunk_size=options["chunk_size"],
+                    concurrency=options["concurrency"],
+                )
+            except BatchError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Translation batch {batch.pk} into {', '.join(batch.languages)}; "
+            f"resume with --resume {batch.pk}"
+        )
+
+        if options["queue"]:
+            translate_cv_batch_task.delay(batch.pk)
+            self.stdout.write(
+                self.style.SUCCESS(f"Queued translation batch {batch.pk}")
+            )
+            return
+
+        while translate_next_chunk(batch):
+            self.stdout.write(self.format_stats(batch.stats()))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Finished translation batch {batch.pk}: {self.format_stats(batch.stats())}"
+            )
+        )
+
+    @staticmethod
+    def format_stats(stats):
+        return (
+            f"{stats['cvs']} CVs up to ID {stats['last_cv_id']}, "
+            f"{stats['translated']} translated, {stats['skipped']} current, "
+            f"{stats['failed']} failed; "
+            f"{stats['rows_per_second']:.1f} CVs/s, "
+            f"{stats['tokens_per_second']:.0f} tokens/s, "
+            f"cache hit rate {stats['cache_hit_rate']:.0%}"
+        )
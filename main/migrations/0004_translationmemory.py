@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_alter_skill_unique_together_remove_skill_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64, verbose_name='Source Text Hash')),
+                ('language', models.CharField(max_length=50, verbose_name='Target Language')),
+                ('model', models.CharField(max_length=100, verbose_name='Translation Model')),
+                ('translated_text', models.TextField(verbose_name='Translated Text')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Translation Memory Entry',
+                'verbose_name_plural': 'Translation Memory',
+                'constraints': [models.UniqueConstraint(fields=('source_hash', 'language', 'model'), name='unique_translation_memory_entry')],
+            },
+        ),
+    ]
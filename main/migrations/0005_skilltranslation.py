@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0004_translationmemory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=50, verbose_name='Target Language')),
+                ('name', models.CharField(max_length=200, verbose_name='Translated Name')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='main.skill')),
+            ],
+            options={
+                'verbose_name': 'Skill Translation',
+                'verbose_name_plural': 'Skill Translations',
+                'constraints': [models.UniqueConstraint(fields=('skill', 'language'), name='unique_skill_translation')],
+            },
+        ),
+    ]
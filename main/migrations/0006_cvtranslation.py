@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_skilltranslation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=50, verbose_name='Target Language')),
+                ('source_version', models.CharField(max_length=64, verbose_name='Source Version')),
+                ('title', models.CharField(max_length=500, verbose_name='Professional Title')),
+                ('bio', models.TextField(verbose_name='Professional Summary')),
+                ('experience', models.TextField(verbose_name='Work Experience')),
+                ('education', models.TextField(verbose_name='Education')),
+                ('skills', models.JSONField(default=list, verbose_name='Skills')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cv', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='main.cv')),
+            ],
+            options={
+                'verbose_name': 'CV Translation',
+                'verbose_name_plural': 'CV Translations',
+                'constraints': [models.UniqueConstraint(fields=('cv', 'language', 'source_version'), name='unique_cv_translation_version')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_cvtranslation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('languages', models.JSONField(verbose_name='Target Languages')),
+                ('chunk_size', models.PositiveIntegerField(default=50)),
+                ('concurrency', models.PositiveIntegerField(default=4)),
+                ('last_cv_id', models.PositiveIntegerField(default=0)),
+                ('cvs', models.PositiveIntegerField(default=0, verbose_name='CVs Processed')),
+                ('translated', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Already Current')),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('tokens', models.PositiveBigIntegerField(default=0)),
+                ('cached_sections', models.PositiveIntegerField(default=0)),
+                ('sections', models.PositiveIntegerField(default=0)),
+                ('elapsed', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Translation Batch',
+                'verbose_name_plural': 'Translation Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_translationbatch'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='cv',
+            options={'ordering': ['-updated_at', 'id'], 'verbose_name': 'CV', 'verbose_name_plural': 'CVs'},
+        ),
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['-updated_at', 'id'], name='cv_updated_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:52
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# The index layout of main.search when this migration was written
+
+SKILLS_SQL = """
+    SELECT {agg}(main_skill.name, ' ')
+    FROM main_cv_skills
+    JOIN main_skill ON main_skill.id = main_cv_skills.skill_id
+    WHERE main_cv_skills.cv_id = main_cv.id
+"""
+
+PROJECTS_SQL = """
+    SELECT {agg}(
+        main_project.title || ' ' || main_project.technologies
+        || ' ' || main_project.description,
+        ' '
+    )
+    FROM main_project
+    WHERE main_project.cv_id = main_cv.id
+"""
+
+POSTGRESQL_BACKFILL = f"""
+UPDATE main_cv SET search_vector =
+    setweight(to_tsvector(%(config)s::regconfig, title), 'A')
+    || setweight(to_tsvector(
+        %(config)s::regconfig, coalesce(({SKILLS_SQL.format(agg="string_agg")}), '')
+    ), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, bio), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, experience), 'C')
+    || setweight(to_tsvector(
+        %(config)s::regconfig, coalesce(({PROJECTS_SQL.format(agg="string_agg")}), '')
+    ), 'C')
+    || setweight(to_tsvector(%(config)s::regconfig, education), 'D')
+"""
+
+SQLITE_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS main_cv_search
+USING fts5(title, skills, bio, experience, projects, education,
+           tokenize='porter unicode61')
+"""
+
+SQLITE_BACKFILL = f"""
+INSERT INTO main_cv_search (rowid, title, skills, bio, experience, projects, education)
+SELECT
+    id,
+    title,
+    coalesce(({SKILLS_SQL.format(agg="group_concat")}), ''),
+    bio,
+    experience,
+    coalesce(({PROJECTS_SQL.format(agg="group_concat")}), ''),
+    education
+FROM main_cv
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX cv_search_vector_idx ON main_cv USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            POSTGRESQL_BACKFILL, {"config": getattr(settings, "SEARCH_CONFIG", "english")}
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(SQLITE_TABLE)
+        schema_editor.execute(SQLITE_BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS cv_search_vector_idx")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS main_cv_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_cv_updated_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_cv_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cv_id', models.PositiveIntegerField(verbose_name='Deleted CV ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'CV Deletion',
+                'verbose_name_plural': 'CV Deletions',
+            },
+        ),
+    ]
@@ -1,3 +1,7 @@
+import hashlib
+import json
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import URLValidator
 from django.urls import reverse
@@ -35,10 +39,17 @@ class CV(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document on PostgreSQL, written by main.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         verbose_name = "CV"
         verbose_name_plural = "CVs"
-        ordering = ["-updated_at"]
+        ordering = ["-updated_at", "id"]
+        indexes = [
+            # Keyset pagination of the CV API walks this index
+            models.Index(fields=["-updated_at", "id"], name="cv_updated_at_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.title}"
@@ -51,6 +62,23 @@ class CV(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class CVDeletion(models.Model):
+    """
+    A deleted CV. No remaining updated_at reflects a deletion, so the CV
+    list validators read the latest of these as well.
+    """
+
+    cv_id = models.PositiveIntegerField(verbose_name="Deleted CV ID")
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "CV Deletion"
+        verbose_name_plural = "CV Deletions"
+
+    def __str__(self):
+        return f"CV {self.cv_id} deleted at {self.deleted_at}"
+
+
 class Skill(models.Model):
     """Separate model for skills to allow for better organization"""
 
@@ -79,3 +107,158 @@ class Project(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class CVTranslation(models.Model):
+    """A CV's translated content, tied to the version of the CV it was made from"""
+
+    cv = models.ForeignKey(CV, on_delete=models.CASCADE, related_name="translations")
+    language = models.CharField(max_length=50, verbose_name="Target Language")
+    source_version = models.CharField(max_length=64, verbose_name="Source Version")
+    title = models.CharField(max_length=500, verbose_name="Professional Title")
+    bio = models.TextField(verbose_name="Professional Summary")
+    experience = models.TextField(verbose_name="Work Experience")
+    education = models.TextField(verbose_name="Education")
+    skills = models.JSONField(default=list, verbose_name="Skills")
+
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "CV Translation"
+        verbose_name_plural = "CV Translations"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cv", "language", "source_version"],
+                name="unique_cv_translation_version",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.cv} ({self.language})"
+
+    @staticmethod
+    def version_for(cv):
+        """Hash the translated fields of a CV (with skills prefetched)"""
+        source = {
+            "title": cv.title,
+            "bio": cv.bio,
+            "experience": cv.experience,
+            "education": cv.education,
+            "skills": [skill.name for skill in cv.skills.all()],
+        }
+        raw = json.dumps(source, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def apply(self, cv):
+        """
+        Put the translated content on a CV instance (with skills prefetched)
+        for rendering. The instances are changed in memory only.
+        """
+        cv.title = self.title
+        cv.bio = self.bio
+        cv.experience = self.experience
+        cv.education = self.education
+        # Skills are stored in the order of cv.skills at translation time
+        for skill, name in zip(cv.skills.all(), self.skills):
+            skill.name = name
+        return cv
+
+
+class SkillTranslation(models.Model):
+    """Translated skill names shared by every CV with the skill"""
+
+    skill = models.ForeignKey(
+        Skill, on_delete=models.CASCADE, related_name="translations"
+    )
+    language = models.CharField(max_length=50, verbose_name="Target Language")
+    name = models.CharField(max_length=200, verbose_name="Translated Name")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Skill Translation"
+        verbose_name_plural = "Skill Translations"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["skill", "language"], name="unique_skill_translation"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.skill.name} ({self.language}): {self.name}"
+
+
+class TranslationMemory(models.Model):
+    """Translated texts reused for identical source texts"""
+
+    source_hash = models.CharField(max_length=64, verbose_name="Source Text Hash")
+    language = models.CharField(max_length=50, verbose_name="Target Language")
+    model = models.CharField(max_length=100, verbose_name="Translation Model")
+    translated_text = models.TextField(verbose_name="Translated Text")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Translation Memory Entry"
+        verbose_name_plural = "Translation Memory"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_hash", "language", "model"],
+                name="unique_translation_memory_entry",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.language} ({self.model}) - {self.source_hash[:12]}"
+
+
+class TranslationBatch(models.Model):
+    """Progress of translating every CV into a set of languages"""
+
+    languages = models.JSONField(verbose_name="Target Languages")
+    chunk_size = models.PositiveIntegerField(default=50)
+    concurrency = models.PositiveIntegerField(default=4)
+
+    # Keyset checkpoint: every CV up to this id is done
+    last_cv_id = models.PositiveIntegerField(default=0)
+
+    # Counters; "sections" are the four text fields and the skills of a CV
+    cvs = models.PositiveIntegerField(default=0, verbose_name="CVs Processed")
+    translated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0, verbose_name="Already Current")
+    failed = models.PositiveIntegerField(default=0)
+    tokens = models.PositiveBigIntegerField(default=0)
+    cached_sections = models.PositiveIntegerField(default=0)
+    sections = models.PositiveIntegerField(default=0)
+    # Seconds spent working, without the time between a crash and resuming
+    elapsed = models.FloatField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Translation Batch"
+        verbose_name_plural = "Translation Batches"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Translation batch {self.pk} ({', '.join(self.languages)})"
+
+    def stats(self):
+        """Throughput and cache hit rate of the batch so far"""
+        return {
+            "batch_id": self.pk,
+            "cvs": self.cvs,
+            "translated": self.translated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "last_cv_id": self.last_cv_id,
+            "finished": self.finished_at is not None,
+            "rows_per_second": self.cvs / self.elapsed if self.elapsed else 0,
+            "tokens_per_second": self.tokens / self.elapsed if self.elapsed else 0,
+            # Share of sections that needed no request, current translations included
+            "cache_hit_rate": (
+                self.cached_sections / self.sections if self.sections else 0
+            ),
+        }
@@ -0,0 +1,218 @@
+"""
+Benchmark the PDF backends against generated CVs of increasing size.
+Every measurement runs in a freshly spawned process, so peak RSS reflects
+that render alone and not whatever the calling process already holds.
+Spawned processes import this module before Django is set up, so models
+and renderers are imported where they are used.
+"""
+
+import multiprocessing
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+from django.template.loader import get_template, render_to_string
+
+from .pool import render_pdf
+
+ENGINES = ["weasyprint", "reportlab"]
+
+# Benchmark grid used when none is given on the command line
+DEFAULT_PROJECT_COUNTS = [0, 10, 50, 200]
+DEFAULT_SKILL_COUNTS = [0, 50, 500]
+DEFAULT_TEXT_SIZE = 20000
+
+LOREM = (
+    "Designed, built and operated backend services handling millions of "
+    "requests per day, mentored engineers and led migrations between "
+    "storage systems without downtime. "
+)
+
+
+def generate_text(size):
+    """Return roughly size characters of paragraph-broken filler text"""
+    paragraph = LOREM * 5
+    text = "\n\n".join([paragraph] * (size // len(paragraph) + 1))
+    return text[:size]
+
+
+def create_benchmark_cv(projects, skills, text_size, index=0):
+    """Create a CV with the given number of projects and skills"""
+    from main.models import CV, Project, Skill
+
+    cv = CV.objects.create(
+        first_name="Benchmark",
+        last_name=f"Candidate {index}",
+        email=f"benchmark-{index}@example.com",
+        phone="+1 555 0100",
+        location="New York, NY",
+        title="Staff Software Engineer",
+        bio=generate_text(text_size),
+        experience=generate_text(text_size),
+        education=generate_text(text_size // 10),
+        portfolio_url="https://example.com",
+        github_url="https://github.com/example",
+    )
+    skill_objects = Skill.objects.bulk_create(
+        [Skill(name=f"Benchmark skill {index}-{i}") for i in range(skills)]
+    )
+    cv.skills.add(*skill_objects)
+    Project.objects.bulk_create(
+        [
+            Project(
+                cv=cv,
+                title=f"Project {i}",
+                description=generate_text(400),
+                technologies="Python, Django, PostgreSQL, Redis",
+                url="https://example.com/project",
+            )
+            for i in range(projects)
+        ]
+    )
+    return (
+        CV.objects.defer("search_vector")
+        .prefetch_related("skills", "project_set")
+        .get(pk=cv.pk)
+    )
+
+
+def _setup_django():
+    import django
+
+    django.setup()
+
+
+def _peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _render(engine, cv):
+    from .renderers import ReportLabRenderer, WeasyPrintRenderer
+
+    if engine == "reportlab":
+        return ReportLabRenderer().render(cv)
+
+    # Measure WeasyPrint itself, without the render pool and PDF cache
+    renderer = WeasyPrintRenderer()
+    html_string = render_to_string(renderer.template_name, {"cv": cv})
+    stylesheet_paths = [
+        get_template(name).origin.name for name in renderer.stylesheet_names
+    ]
+    return render_pdf(html_string, stylesheet_paths)
+
+
+def _measure(engine, cv, repeat):
+    """Runs in the spawned process: warm up, then time repeated renders"""
+    # The first render loads fonts and parses stylesheets once per process
+    _render(engine, cv)
+    baseline_rss = _peak_rss_kb()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = _render(engine, cv)
+        timings.append(time.perf_counter() - started)
+
+    peak_rss = _peak_rss_kb()
+    return {
+        "wall_time": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "max": max(timings),
+        },
+        "peak_rss_kb": peak_rss,
+        "rss_delta_kb": peak_rss - baseline_rss,
+        "size_bytes": len(content),
+    }
+
+
+def measure_render(engine, cv, repeat=3):
+    """Render a prefetched CV with an engine in a fresh process"""
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_setup_django,
+    ) as executor:
+        return executor.submit(_measure, engine, cv, repeat).result()
+
+
+def run_benchmark(
+    engines=ENGINES,
+    project_counts=DEFAULT_PROJECT_COUNTS,
+    skill_counts=DEFAULT_SKILL_COUNTS,
+    text_size=DEFAULT_TEXT_SIZE,
+    repeat=3,
+    on_result=None,
+):
+    """
+    Measure every engine on every (projects, skills) combination. The
+    generated CVs are rolled back afterwards, so the database is untouched.
+    """
+    results = []
+    with transaction.atomic():
+        cases = [
+            (projects, skills) for projects in project_counts for skills in skill_counts
+        ]
+        for index, (projects, skills) in enumerate(cases):
+            cv = create_benchmark_cv(projects, skills, text_size, index=index)
+            for engine in engines:
+                result = {
+                    "case": case_name(engine, projects, skills, text_size),
+                    "engine": engine,
+                    "projects": projects,
+                    "skills": skills,
+                    "text_size": text_size,
+                    **measure_render(engine, cv, repeat),
+                }
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+        transaction.set_rollback(True)
+
+    return results
+
+
+def case_name(engine, projects, skills, text_size):
+    return f"{engine}:projects={projects}:skills={skills}:text={text_size}"
+
+
+def find_regressions(baseline, results, max_time_regression, max_memory_regression):
+    """
+    Compare results to a previous run case by case. Returns a message for
+    every case whose median wall time or peak RSS grew by more than the
+    given percentage. Cases missing from the baseline are not compared.
+    """
+    previous = {result["case"]: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        before = previous.get(result["case"])
+        if before is None:
+            continue
+
+        checks = [
+            (
+                "median wall time",
+                before["wall_time"]["median"],
+                result["wall_time"]["median"],
+                max_time_regression,
+            ),
+            (
+                "peak RSS",
+                before["peak_rss_kb"],
+                result["peak_rss_kb"],
+                max_memory_regression,
+            ),
+        ]
+        for label, old, new, threshold in checks:
+            if old and (new - old) / old * 100 > threshold:
+                regressions.append(
+                    f"{result['case']}: {label} {old:g} -> {new:g} "
+                    f"(+{(new - old) / old * 100:.1f}%, limit {threshold:g}%)"
+                )
+
+    return regressions
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedPdf:
+    """A rendered PDF together with its content key and render time"""
+
+    key: str
+    content: bytes
+    rendered_at: datetime
+
+
+class BasePdfStorage:
+    """Interface for rendered-PDF storage backends"""
+
+    def get(self, key):
+        """Return the CachedPdf stored under key, or None"""
+        raise NotImplementedError
+
+    def set(self, key, content):
+        """Store content under key and return the CachedPdf"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove the entry stored under key, if any"""
+        raise NotImplementedError
+
+
+class FileSystemPdfStorage(BasePdfStorage):
+    """
+    Stores PDFs on the local filesystem with size-bounded LRU eviction.
+    The file mtime is the render time and the atime is bumped on every read,
+    so eviction drops the least recently served files first.
+    """
+
+    def __init__(self, location, max_size=None):
+        self.location = Path(location)
+        self.max_size = max_size
+
+    def _path(self, key):
+        return self.location / key[:2] / f"{key}.pdf"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as pdf_file:
+                content = pdf_file.read()
+            stat = os.stat(path)
+            # Set atime explicitly so LRU works on noatime mounts as well
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None
+
+        rendered_at = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        return CachedPdf(key=key, content=content, rendered_at=rendered_at)
+
+    def set(self, key, content):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a sibling file first so readers never see a partial PDF
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        rendered_at = datetime.fromtimestamp(os.stat(path).st_mtime, tz=timezone.utc)
+        self.evict()
+
+        return CachedPdf(key=key, content=content, rendered_at=rendered_at)
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def evict(self):
+        """Delete least recently used files until the cache fits max_size"""
+        if not self.max_size:
+            return
+
+        entries = []
+        total_size = 0
+        for path in self.location.glob("*/*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            logger.debug(f"Evicted cached PDF {path.name}")
+
+
+class PdfCache:
+    """Content-addressed cache of rendered CV PDFs"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def key_for(self, cv, renderer):
+        """
+        Build the content key for a CV rendered by a PdfRenderer. The CV
+        should come with skills and project_set prefetched.
+        """
+        payload = {
+            "cv": _field_values(cv),
+            "skills": sorted(skill.name for skill in cv.skills.all()),
+            "projects": [_field_values(project) for project in cv.project_set.all()],
+            "renderer": renderer.name,
+            "layout": renderer.fingerprint(),
+        }
+        raw = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_or_render(self, cv, renderer, key=None):
+        """Return the cached PDF for a CV, rendering it on a miss"""
+        key = key or self.key_for(cv, renderer)
+
+        cached = self.storage.get(key)
+        if cached is not None:
+            return cached
+
+        logger.info(f"PDF cache miss for CV ID: {cv.pk} ({renderer.name})")
+        return self.storage.set(key, renderer.render(cv))
+
+
+# Columns that do not show in the PDF and are usually not loaded
+KEY_EXCLUDED_FIELDS = {"search_vector"}
+
+
+def _field_values(instance):
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if field.attname not in KEY_EXCLUDED_FIELDS
+    }
+
+
+_template_fingerprints = {}
+
+
+def template_fingerprint(template_name):
+    """Return a hash of a template's source, recomputed when the file changes"""
+    path = get_template(template_name).origin.name
+    mtime = os.stat(path).st_mtime_ns
+
+    cached = _template_fingerprints.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "rb") as template_file:
+        digest = hashlib.sha256(template_file.read()).hexdigest()
+    _template_fingerprints[path] = (mtime, digest)
+    return digest
+
+
+_pdf_cache = None
+
+
+def get_pdf_cache():
+    """Return the process-wide PdfCache configured by settings.PDF_CACHE"""
+    global _pdf_cache
+    if _pdf_cache is None:
+        config = settings.PDF_CACHE
+        storage_class = import_string(config["STORAGE"])
+        _pdf_cache = PdfCache(storage_class(**config.get("OPTIONS", {})))
+    return _pdf_cache
+
+
+@receiver(setting_changed)
+def _reset_pdf_cache(*, setting, **kwargs):
+    global _pdf_cache
+    if setting == "PDF_CACHE":
+        _pdf_cache = None
@@ -0,0 +1,242 @@
+import logging
+import os
+import shutil
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import get_valid_filename
+
+from main.models import CV
+from .renderers import render_cv_pdf
+
+logger = logging.getLogger(__name__)
+
+# Query parameters accepted for selecting CVs, mapped to queryset lookups
+EXPORT_FILTERS = {
+    "title": "title__icontains",
+    "location": "location__icontains",
+    "skill": "skills__name__iexact",
+}
+
+
+# How long export progress counters are kept
+EXPORT_PROGRESS_TTL = 24 * 60 * 60
+
+
+class ExportError(Exception):
+    """Raised when an export selection is invalid"""
+
+
+def select_cv_ids(ids=None, filters=None):
+    """Resolve an explicit id list and/or EXPORT_FILTERS to a sorted list of CV ids"""
+    queryset = CV.objects.all()
+
+    if ids is not None:
+        try:
+            queryset = queryset.filter(pk__in=[int(pk) for pk in ids])
+        except (TypeError, ValueError):
+            raise ExportError("CV ids must be integers")
+
+    for name, value in (filters or {}).items():
+        if name not in EXPORT_FILTERS:
+            raise ExportError(f"Unsupported filter '{name}'")
+        queryset = queryset.filter(**{EXPORT_FILTERS[name]: value})
+
+    return list(queryset.order_by("pk").values_list("pk", flat=True).distinct())
+
+
+def write_cv_archive(cv_ids, fileobj, purpose="bulk", concurrency=4, on_progress=None):
+    """
+    Render the PDFs of the given CVs in parallel and write them into a ZIP
+    archive. CVs are loaded in chunks and at most `concurrency` PDFs are
+    held in memory at once; each one is written as soon as it is ready.
+    Returns the list of CV ids that could not be exported.
+    """
+    total = len(cv_ids)
+    done = 0
+    exported = set()
+    failed = []
+
+    cvs = (
+        CV.objects.filter(pk__in=cv_ids)
+        .defer("search_vector")
+        .prefetch_related("skills", "project_set")
+        .order_by("pk")
+        .iterator(chunk_size=100)
+    )
+
+    def write(future, cv):
+        nonlocal done
+        try:
+            pdf = future.result()
+            archive.writestr(archive_filename(cv), pdf.content)
+            exported.add(cv.pk)
+        except Exception as e:
+            logger.error(f"Error exporting PDF for CV ID {cv.pk}: {e}")
+            failed.append(cv.pk)
+
+        done += 1
+        if on_progress:
+            on_progress(done, total)
+
+    # PDFs are already compressed, so store them as they are
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = {}
+            for cv in cvs:
+                if len(in_flight) >= concurrency:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future, in_flight.pop(future))
+                in_flight[executor.submit(render_cv_pdf, cv, purpose)] = cv
+
+            for future in list(in_flight):
+                write(future, in_flight.pop(future))
+
+    # CVs deleted since the selection was made
+    failed.extend(pk for pk in cv_ids if pk not in exported and pk not in failed)
+    return failed
+
+
+def archive_filename(cv):
+    """Name of a CV's PDF inside an export archive"""
+    return get_valid_filename(f"{cv.pk}_{cv.full_name}_CV.pdf")
+
+
+def start_cv_export(cv_ids, chunk_size=None):
+    """
+    Render the CVs in parallel Celery tasks, then build the ZIP archive in a
+    chord callback. Returns the export id, which is also the callback task id.
+    """
+    from celery import chord
+
+    from main.tasks import build_cv_archive_task, render_cv_pdfs_task
+
+    chunk_size = chunk_size or settings.PDF_EXPORT_CHUNK_SIZE
+    export_id = str(uuid.uuid4())
+    cache.set(_progress_key(export_id), 0, EXPORT_PROGRESS_TTL)
+    cache.set(_total_key(export_id), len(cv_ids), EXPORT_PROGRESS_TTL)
+
+    header = [
+        render_cv_pdfs_task.s(cv_ids[i : i + chunk_size], export_id)
+        for i in range(0, len(cv_ids), chunk_size)
+    ]
+    callback = build_cv_archive_task.s(cv_ids).set(task_id=export_id)
+    chord(header)(callback)
+
+    return export_id
+
+
+def record_export_progress(export_id, count=1):
+    """Count rendered CVs of an export"""
+    try:
+        cache.incr(_progress_key(export_id), count)
+    except ValueError:
+        # The counter expired; progress is informational only
+        pass
+
+
+def get_export_progress(export_id):
+    """Return (rendered, total) for an export, or None when unknown"""
+    total = cache.get(_total_key(export_id))
+    if total is None:
+        return None
+    return cache.get(_progress_key(export_id), 0), total
+
+
+def export_archive_path(export_id):
+    """Return the path of the ZIP archive of an export"""
+    return os.path.join(settings.PDF_EXPORT_DIR, f"{uuid.UUID(str(export_id))}.zip")
+
+
+def export_parts_dir(export_id):
+    """Return the directory the PDFs of an export are rendered into"""
+    return os.path.join(settings.PDF_EXPORT_DIR, f"{uuid.UUID(str(export_id))}.parts")
+
+
+def render_export_parts(cvs, export_id, purpose="bulk"):
+    """
+    Render CVs into the parts directory of an export. The size bounded PDF
+    cache may evict them before the archive is built, so the export keeps
+    its own copy. Returns ([(cv id, archive filename)], [failed cv ids]).
+    """
+    parts_dir = export_parts_dir(export_id)
+    os.makedirs(parts_dir, exist_ok=True)
+    parts = []
+    failed = []
+    for cv in cvs:
+        try:
+            pdf = render_cv_pdf(cv, purpose)
+            with open(os.path.join(parts_dir, f"{cv.pk}.pdf"), "wb") as part:
+                part.write(pdf.content)
+            parts.append((cv.pk, archive_filename(cv)))
+        except Exception as e:
+            logger.error(f"Error rendering PDF for CV ID {cv.pk}: {str(e)}")
+            failed.append(cv.pk)
+        record_export_progress(export_id)
+    return parts, failed
+
+
+def write_export_archive(export_id, parts, fileobj, on_progress=None):
+    """
+    Write the rendered parts of an export into a ZIP archive, one file at a
+    time. Returns the ids of CVs whose part is missing.
+    """
+    parts_dir = export_parts_dir(export_id)
+    missing = []
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        for done, (cv_id, filename) in enumerate(sorted(parts), 1):
+            try:
+                archive.write(os.path.join(parts_dir, f"{cv_id}.pdf"), filename)
+            except FileNotFoundError:
+                logger.error(f"Rendered PDF of CV ID {cv_id} is missing from export")
+                missing.append(cv_id)
+            if on_progress:
+                on_progress(done, len(parts))
+    return missing
+
+
+def remove_export_parts(export_id):
+    shutil.rmtree(export_parts_dir(export_id), ignore_errors=True)
+
+
+def remove_expired_exports(max_age=None):
+    """
+    Delete export archives, and parts of exports that never finished, last
+    written more than max_age seconds ago (PDF_EXPORT_RETENTION by default).
+    Returns the number of removed archives and parts directories.
+    """
+    max_age = settings.PDF_EXPORT_RETENTION if max_age is None else max_age
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(settings.PDF_EXPORT_DIR))
+    except FileNotFoundError:
+        return 0
+
+    for entry in entries:
+        if not entry.name.endswith((".zip", ".parts")):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            # Removed by a concurrent cleanup
+            pass
+    return removed
+
+
+def _progress_key(export_id):
+    return f"pdf-export:{export_id}:rendered"
+
+
+def _total_key(export_id):
+    return f"pdf-export:{export_id}:total"
@@ -0,0 +1,190 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import styles
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPoolError(Exception):
+    """Base class for render pool failures"""
+
+
+class RenderPoolSaturated(RenderPoolError):
+    """Raised when every render process and queue slot is busy"""
+
+
+class RenderTimeout(RenderPoolError):
+    """Raised when a render does not finish in time"""
+
+
+def _warm_up():
+    """Load WeasyPrint and the system fonts once per render process"""
+    from weasyprint import HTML
+
+    HTML(string="<p>warm-up</p>").write_pdf(font_config=styles.get_font_config())
+
+
+def render_pdf(html_string, stylesheet_paths=()):
+    """
+    Render an HTML document to PDF bytes without touching the disk, reusing
+    the parsed stylesheets and font configuration of this process
+    """
+    from weasyprint import HTML
+
+    font_config = styles.get_font_config()
+    stylesheets = [
+        styles.get_stylesheet(path, font_config) for path in stylesheet_paths
+    ]
+    return HTML(string=html_string).write_pdf(
+        stylesheets=stylesheets, font_config=font_config
+    )
+
+
+def _render_in_worker(html_string, stylesheet_paths):
+    """Render in a pool process and report that process's cache counters"""
+    content = render_pdf(html_string, stylesheet_paths)
+    return os.getpid(), content, styles.cache_info()
+
+
+class RenderPool:
+    """
+    Pool of long-lived WeasyPrint processes with a bounded queue.
+    At most workers + queue_size renders are admitted at once; further
+    requests fail fast with RenderPoolSaturated instead of piling up.
+    With workers=0 documents are rendered inline in the calling process.
+    """
+
+    def __init__(self, workers, queue_size=0, timeout=None, start_method="spawn"):
+        self.workers = workers
+        self.timeout = timeout
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(max(workers + queue_size, 1))
+        self._executor = None
+        self._lock = threading.Lock()
+        self._worker_stats = {}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_warm_up,
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _recycle_executor(self, executor, future):
+        """
+        Terminate the processes of an executor with a stuck render and start
+        afresh. Renders still running on it fail with BrokenProcessPool.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        for process in list(executor._processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        # The future fails once the executor notices its dead process,
+        # which frees the slot before the caller sees the timeout
+        wait([future], timeout=5)
+
+    def start(self):
+        """Spawn and warm up every render process ahead of the first request"""
+        if not self.workers:
+            return
+        executor = self._get_executor()
+        for future in [executor.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def stats(self):
+        """Return the latest stylesheet and font cache counters per render process"""
+        if not self.workers:
+            return {os.getpid(): styles.cache_info()}
+        return dict(self._worker_stats)
+
+    def render(self, html_string, stylesheet_paths=(), block=False):
+        """
+        Render HTML to PDF bytes. When block is False a saturated pool raises
+        RenderPoolSaturated immediately, otherwise the caller waits up to
+        the pool timeout for a free slot.
+        """
+        stylesheet_paths = tuple(stylesheet_paths)
+        if not self.workers:
+            return render_pdf(html_string, stylesheet_paths)
+
+        if block:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            raise RenderPoolSaturated("PDF render pool is saturated")
+
+        try:
+            executor = self._get_executor()
+            future = executor.submit(_render_in_worker, html_string, stylesheet_paths)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            pid, content, cache_info = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A stuck process would hold its slot for good, so it is killed
+            logger.error(
+                f"PDF render timed out after {self.timeout}s, restarting the pool"
+            )
+            self._recycle_executor(executor, future)
+            raise RenderTimeout(f"PDF render timed out after {self.timeout}s")
+        except BrokenProcessPool as e:
+            logger.error("PDF render process died, restarting the pool")
+            self._reset_executor()
+            raise RenderPoolError("PDF render process died") from e
+
+        self._worker_stats[pid] = cache_info
+        return content
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Return the per-process RenderPool configured by settings.PDF_RENDER_POOL"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            config = settings.PDF_RENDER_POOL
+            _render_pool = RenderPool(
+                workers=config["WORKERS"],
+                queue_size=config.get("QUEUE_SIZE", 0),
+                timeout=config.get("TIMEOUT"),
+            )
+        return _render_pool
+
+
+@receiver(setting_changed)
+def _reset_render_pool(*, setting, **kwargs):
+    global _render_pool
+    if setting == "PDF_RENDER_POOL":
+        with _render_pool_lock:
+            if _render_pool is not None:
+                _render_pool._reset_executor()
+            _render_pool = None
@@ -0,0 +1,201 @@
+import io
+import logging
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+from django.utils.module_loading import import_string
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from .cache import get_pdf_cache, template_fingerprint
+from .pool import get_render_pool
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderer:
+    """Base class for CV PDF rendering backends"""
+
+    name = None
+
+    def fingerprint(self):
+        """Identify the current layout so cached PDFs change along with it"""
+        raise NotImplementedError
+
+    def render(self, cv):
+        """Render a CV (with skills and project_set prefetched) to PDF bytes"""
+        raise NotImplementedError
+
+
+class WeasyPrintRenderer(PdfRenderer):
+    """
+    Renders the main/pdf/cv.html template in the WeasyPrint render pool.
+    With block=True the caller waits for a free slot instead of failing fast,
+    which suits background tasks.
+    """
+
+    name = "weasyprint"
+    template_name = "main/pdf/cv.html"
+    stylesheet_names = ["main/pdf/cv.css"]
+
+    def __init__(self, block=False):
+        self.block = block
+
+    def fingerprint(self):
+        return "-".join(
+            template_fingerprint(name)
+            for name in [self.template_name, *self.stylesheet_names]
+        )
+
+    def render(self, cv):
+        html_string = render_to_string(self.template_name, {"cv": cv})
+        # Render processes parse each stylesheet file once and reuse it
+        stylesheet_paths = [
+            get_template(name).origin.name for name in self.stylesheet_names
+        ]
+        return get_render_pool().render(html_string, stylesheet_paths, block=self.block)
+
+
+class ReportLabRenderer(PdfRenderer):
+    """Builds the PDF directly with ReportLab, much cheaper than WeasyPrint"""
+
+    name = "reportlab"
+
+    # Bump when the story below changes so cached PDFs are re-rendered
+    layout_version = "1"
+
+    def fingerprint(self):
+        return self.layout_version
+
+    def render(self, cv):
+        buffer = io.BytesIO()
+
+        # Create the PDF object
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+
+        # Title
+        title = Paragraph(f"<b>{cv.full_name}</b>", styles["Title"])
+        story.append(title)
+        story.append(Spacer(1, 12))
+
+        # Professional Title
+        if cv.title:
+            prof_title = Paragraph(f"<b>{cv.title}</b>", styles["Heading2"])
+            story.append(prof_title)
+            story.append(Spacer(1, 12))
+
+        # Contact Information
+        contact_info = f"""
+        <b>Email:</b> {cv.email}<br/>
+        <b>Phone:</b> {cv.phone or 'Not provided'}<br/>
+        <b>Location:</b> {cv.location or 'Not provided'}
+        """
+        contact_para = Paragraph(contact_info, styles["Normal"])
+        story.append(contact_para)
+        story.append(Spacer(1, 12))
+
+        # Professional Summary
+        if cv.bio:
+            bio_title = Paragraph("<b>Professional Summary</b>", styles["Heading3"])
+            story.append(bio_title)
+            bio_para = Paragraph(cv.bio, styles["Normal"])
+            story.append(bio_para)
+            story.append(Spacer(1, 12))
+
+        # Experience
+        if cv.experience:
+            exp_title = Paragraph("<b>Work Experience</b>", styles["Heading3"])
+            story.append(exp_title)
+            exp_para = Paragraph(cv.experience, styles["Normal"])
+            story.append(exp_para)
+            story.append(Spacer(1, 12))
+
+        # Education
+        if cv.education:
+            edu_title = Paragraph("<b>Education</b>", styles["Heading3"])
+            story.append(edu_title)
+            edu_para = Paragraph(cv.education, styles["Normal"])
+            story.append(edu_para)
+            story.append(Spacer(1, 12))
+
+        # Skills
+        skills = list(cv.skills.all())
+        if skills:
+            skills_title = Paragraph("<b>Skills</b>", styles["Heading3"])
+            story.append(skills_title)
+            skills_list = ", ".join([skill.name for skill in skills])
+            skills_para = Paragraph(skills_list, styles["Normal"])
+            story.append(skills_para)
+            story.append(Spacer(1, 12))
+
+        # Projects
+        projects = list(cv.project_set.all())
+        if projects:
+            projects_title = Paragraph("<b>Projects</b>", styles["Heading3"])
+            story.append(projects_title)
+            for project in projects:
+                story.append(Paragraph(f"<b>{project.title}</b>", styles["Normal"]))
+                dates = _format_project_dates(project)
+                if dates:
+                    story.append(Paragraph(dates, styles["Italic"]))
+                story.append(Paragraph(project.description, styles["Normal"]))
+                if project.technologies:
+                    story.append(
+                        Paragraph(
+                            f"<b>Technologies:</b> {project.technologies}",
+                            styles["Normal"],
+                        )
+                    )
+                if project.url:
+                    story.append(Paragraph(project.url, styles["Normal"]))
+                story.append(Spacer(1, 8))
+            story.append(Spacer(1, 4))
+
+        # URLs
+        urls = []
+        if cv.portfolio_url:
+            urls.append(f"Portfolio: {cv.portfolio_url}")
+        if cv.linkedin_url:
+            urls.append(f"LinkedIn: {cv.linkedin_url}")
+        if cv.github_url:
+            urls.append(f"GitHub: {cv.github_url}")
+
+        if urls:
+            urls_title = Paragraph("<b>Links</b>", styles["Heading3"])
+            story.append(urls_title)
+            urls_para = Paragraph("<br/>".join(urls), styles["Normal"])
+            story.append(urls_para)
+
+        # Build PDF
+        doc.build(story)
+
+        return buffer.getvalue()
+
+
+def _format_project_dates(project):
+    """Format project dates the same way as the HTML templates"""
+    if project.start_date and project.end_date:
+        return f"{project.start_date:%b %Y} - {project.end_date:%b %Y}"
+    if project.start_date:
+        return f"{project.start_date:%b %Y} - Present"
+    if project.end_date:
+        return f"- {project.end_date:%b %Y}"
+    return ""
+
+
+def get_renderer(purpose):
+    """Return the renderer configured in settings.PDF_RENDERERS for a call site"""
+    config = settings.PDF_RENDERERS[purpose]
+    renderer_class = import_string(config["BACKEND"])
+    return renderer_class(**config.get("OPTIONS", {}))
+
+
+def render_cv_pdf(cv, purpose):
+    """
+    Return the CachedPdf for a CV, rendered by the backend configured for
+    purpose. Call sites sharing a backend share the cached output.
+    """
+    return get_pdf_cache().get_or_render(cv, get_renderer(purpose))
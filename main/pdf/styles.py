@@ -0,0 +1,55 @@
+"""
+Per-process cache of parsed WeasyPrint stylesheets and font configuration.
+This module runs inside the render processes, so it must not touch Django.
+"""
+
+import os
+import threading
+
+_lock = threading.Lock()
+_font_config = None
+_stylesheets = {}
+_counters = {
+    "stylesheet_hits": 0,
+    "stylesheet_misses": 0,
+    "font_config_hits": 0,
+    "font_config_misses": 0,
+}
+
+
+def get_font_config():
+    """Return the FontConfiguration shared by every render in this process"""
+    global _font_config
+    from weasyprint.text.fonts import FontConfiguration
+
+    with _lock:
+        if _font_config is None:
+            _counters["font_config_misses"] += 1
+            _font_config = FontConfiguration()
+        else:
+            _counters["font_config_hits"] += 1
+        return _font_config
+
+
+def get_stylesheet(path, font_config):
+    """Return the parsed CSS for a file, re-parsed only when the file changes"""
+    from weasyprint import CSS
+
+    mtime = os.stat(path).st_mtime_ns
+
+    with _lock:
+        cached = _stylesheets.get(path)
+        if cached and cached[0] == mtime:
+            _counters["stylesheet_hits"] += 1
+            return cached[1]
+
+        _counters["stylesheet_misses"] += 1
+        stylesheet = CSS(filename=path, font_config=font_config)
+        _stylesheets[path] = (mtime, stylesheet)
+        return stylesheet
+
+
+def cache_info():
+    """Return the hit/miss counters of this process"""
+    with _lock:
+        return dict(_counters, stylesheets=len(_stylesheets))
@@ -0,0 +1,173 @@
+"""
+Full-text search over CVs. Each CV's searchable text (title, skills, bio,
+experience, projects and education) is indexed when it is written:
+PostgreSQL keeps a weighted tsvector in CV.search_vector behind a GIN
+index, SQLite keeps an FTS5 shadow table keyed on the CV id. Queries are
+ranked by the database (ts_rank / bm25) and only touch matching rows.
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "main_cv_search"
+
+# Searchable columns in rank weight order, with their PostgreSQL weight and
+# SQLite bm25 weight
+COLUMNS = [
+    ("title", "A", 10.0),
+    ("skills", "A", 8.0),
+    ("bio", "B", 4.0),
+    ("experience", "C", 2.0),
+    ("projects", "C", 2.0),
+    ("education", "D", 1.0),
+]
+
+
+class SearchError(Exception):
+    """Raised for queries without any searchable term"""
+
+
+def search_document(cv):
+    """Searchable text per column of a CV with skills and projects prefetched"""
+    return {
+        "title": cv.title,
+        "skills": " ".join(skill.name for skill in cv.skills.all()),
+        "bio": cv.bio,
+        "experience": cv.experience,
+        "projects": " ".join(
+            f"{project.title} {project.technologies} {project.description}"
+            for project in cv.project_set.all()
+        ),
+        "education": cv.education,
+    }
+
+
+def _search_vector(document):
+    vector = None
+    for name, weight, _ in COLUMNS:
+        part = SearchVector(
+            Value(document[name]), weight=weight, config=settings.SEARCH_CONFIG
+        )
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def index_cvs(cvs, db=None):
+    """
+    Write the search index entries of CVs with skills and projects
+    prefetched, in a fixed number of queries
+    """
+    db = db or connection
+    cvs = list(cvs)
+    if not cvs:
+        return
+
+    names = [name for name, _, _ in COLUMNS]
+    if db.vendor == "postgresql":
+        for cv in cvs:
+            cv.search_vector = _search_vector(search_document(cv))
+        type(cvs[0])._default_manager.using(db.alias).bulk_update(
+            cvs, ["search_vector"]
+        )
+    elif db.vendor == "sqlite":
+        pks = [cv.pk for cv in cvs]
+        placeholders = ", ".join(["%s"] * len(pks))
+        rows = []
+        for cv in cvs:
+            document = search_document(cv)
+            rows.append([cv.pk, *(document[name] for name in names)])
+        with db.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", pks
+            )
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(names)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(names))})",
+                rows,
+            )
+
+
+def reindex_cvs(cv_ids):
+    """Load the given CVs and rewrite their search index entries"""
+    from .models import CV
+
+    if cv_ids:
+        index_cvs(
+            CV.objects.filter(pk__in=cv_ids).prefetch_related("skills", "project_set")
+        )
+
+
+def remove_from_index(cv_id):
+    # The PostgreSQL vector goes with the CV row
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [cv_id])
+
+
+def search_terms(query):
+    """Words of a free-text query, without search syntax"""
+    return re.findall(r"\w+", query)
+
+
+def search_cvs(queryset, query):
+    """
+    Filter a CV queryset to the CVs matching every word of the query,
+    best match first, with the score in a "rank" annotation
+    """
+    terms = search_terms(query)
+    if not terms:
+        raise SearchError("The search query has no words to search for")
+
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(
+            " ".join(terms), search_type="plain", config=settings.SEARCH_CONFIG
+        )
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-updated_at", "id")
+        )
+
+    if connection.vendor == "sqlite":
+        # Quoted terms are matched as plain words, never as FTS5 syntax
+        match = " ".join('"{}"'.format(term.replace('"', "")) for term in terms)
+        weights = ", ".join(str(weight) for _, _, weight in COLUMNS)
+        table = queryset.model._meta.db_table
+        matching = RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        )
+        # bm25 is lower for better matches
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+            [match],
+        )
+        return (
+            queryset.filter(pk__in=matching)
+            .annotate(rank=rank)
+            .order_by("-rank", "-updated_at", "id")
+        )
+
+    # Other backends have no index to use and fall back to substring scans
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(title__icontains=term)
+            | Q(bio__icontains=term)
+            | Q(experience__icontains=term)
+            | Q(education__icontains=term)
+            | Q(skills__name__icontains=term)
+            | Q(project_set__title__icontains=term)
+            | Q(project_set__technologies__icontains=term)
+            | Q(project_set__description__icontains=term)
+        )
+    return (
+        queryset.filter(pk__in=queryset.model.objects.filter(condition).values("pk"))
+        .annotate(rank=Value(0.0))
+        .order_by("-updated_at", "id")
+    )
@@ -1,10 +1,44 @@
-import openai
+import asyncio
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 import logging
+from .llm import estimate_tokens, get_llm_client, split_text
+from .models import CVTranslation, SkillTranslation, TranslationMemory
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TranslationJob:
+    """What one CV translation already has, and the prompts for the rest"""
+
+    target_language: str
+    language_name: str
+    skills: list
+    translated_content: dict
+    # Prompt kind -> {field: text} of whole fields sent in one request
+    field_groups: dict
+    # Field -> [(text, separator, translation or None)] of oversized fields
+    chunks: dict
+    skill_names: dict
+    # Prompt kind -> {skill name: skill} of skills sent in one request
+    skill_groups: dict
+    prompts: dict
+    # Prompt kind -> keys the JSON reply must have
+    reply_keys: dict
+
+
+class InvalidReply(Exception):
+    """
+    Raised when an OpenAI reply is not the JSON object asked for: an object
+    with exactly the requested keys, each a non-empty string
+    """
+
+
 class TranslationService:
     """Service for translating CV content using OpenAI"""
 
@@ -30,110 +64,602 @@ class TranslationService:
     }
 
     def __init__(self):
-        if settings.OPENAI_API_KEY:
-            openai.api_key = settings.OPENAI_API_KEY
-        else:
+        if not settings.OPENAI_API_KEY:
             logger.warning("OpenAI API key not configured")
 
-    def translate_cv_content(self, cv, target_language):
+    # CV fields sent for translation, in the order they are returned
+    TRANSLATED_FIELDS = ["title", "bio", "experience", "education"]
+
+    def translate_cv_content(self, cv, target_language, on_partial=None):
         """
-        Translate CV content to target language using OpenAI
+        Translate CV content to target language using OpenAI. Fields whose
+        text was translated before are taken from the translation memory,
+        so only new or changed fields are sent to the API. Skills come from
+        the shared skill translation dictionary. Sections longer than the
+        model's chunk budget are split at paragraphs and translated in
+        parallel. on_partial, if given, gets the already translated fields
+        before the API is called.
         """
-        if not settings.OPENAI_API_KEY:
+        job = self._start_translation(cv, target_language)
+
+        if job.prompts and not settings.OPENAI_API_KEY:
             raise Exception("OpenAI API key not configured")
 
+        if on_partial and job.prompts:
+            partial = dict(job.translated_content)
+            if not job.skill_groups:
+                partial["skills"] = [job.skill_names[skill.pk] for skill in job.skills]
+            on_partial(partial)
+
+        try:
+            # Call OpenAI API
+            replies = self._chat_all(job.language_name, job.prompts, job.reply_keys)
+            return self._finish_translation(job, replies)
+
+        except Exception as e:
+            logger.error(f"Translation error: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "target_language": job.language_name,
+            }
+
+    def translate_cv_languages(self, cv, target_languages, on_progress=None):
+        """
+        Translate a CV into several languages concurrently, at most
+        OPENAI_CONCURRENCY requests at a time and within the requests and
+        tokens per minute limits. on_progress(language, status, result) is
+        called as each language starts and finishes. Returns {language: result}.
+        """
+
+        def report_progress(cv, language, status, result=None):
+            on_progress(language, status, result)
+
+        results = self.translate_many(
+            [(cv, language) for language in target_languages],
+            report_progress if on_progress else None,
+        )
+        return {language: result for _, language, result in results}
+
+    def translate_many(self, pairs, on_progress=None, concurrency=None):
+        """
+        Translate (cv, language) pairs concurrently, with the requests of all
+        pairs sharing the concurrency (OPENAI_CONCURRENCY by default) and rate
+        limits. on_progress(cv, language, status, result) is called as each
+        pair starts and finishes. Returns [(cv, language, result)] in order.
+        """
+        for _, target_language in pairs:
+            if target_language not in self.SUPPORTED_LANGUAGES:
+                raise Exception(f"Language '{target_language}' not supported")
+
+        # Database work runs back in this thread, so it shares its connection
+        return async_to_sync(self._translate_all)(
+            pairs, on_progress, concurrency or settings.OPENAI_CONCURRENCY
+        )
+
+    async def _translate_all(self, pairs, on_progress, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        start_translation = sync_to_async(self._start_translation)
+        finish_translation = sync_to_async(self._finish_translation)
+        report_progress = sync_to_async(
+            on_progress or (lambda cv, language, status, result=None: None)
+        )
+
+        async def request(client, language_name, kind, prompt, keys):
+            system_prompt = self._system_prompt(language_name)
+            # A reply that is not the JSON object asked for is asked for once more
+            for attempt in range(2):
+                async with semaphore:
+                    reply = await self._achat(client, system_prompt, prompt, keys)
+                try:
+                    return kind, self._parse_reply(reply, keys)
+                except InvalidReply as e:
+                    error = e
+            raise error
+
+        async def translate(client, cv, target_language):
+            await report_progress(cv, target_language, "running")
+            language_name = self.SUPPORTED_LANGUAGES[target_language]
+            try:
+                job = await start_translation(cv, target_language)
+                if job.prompts and not settings.OPENAI_API_KEY:
+                    raise Exception("OpenAI API key not configured")
+
+                replies = await asyncio.gather(
+                    *(
+                        request(
+                            client, language_name, kind, prompt, job.reply_keys[kind]
+                        )
+                        for kind, prompt in job.prompts.items()
+                    )
+                )
+                result = await finish_translation(job, dict(replies))
+
+            except Exception as e:
+                logger.error(
+                    f"Translation error (CV {cv.pk}, {target_language}): {str(e)}"
+                )
+                result = {
+                    "success": False,
+                    "error": str(e),
+                    "target_language": language_name,
+                }
+
+            await report_progress(
+                cv,
+                target_language,
+                "completed" if result["success"] else "failed",
+                result,
+            )
+            return cv, target_language, result
+
+        async with get_llm_client().async_client() as client:
+            return await asyncio.gather(
+                *(translate(client, cv, language) for cv, language in pairs)
+            )
+
+    def save_translation(self, cv, target_language, translated_content):
+        """
+        Store translated content for the current version of a CV, replacing
+        translations of earlier versions into the same language
+        """
+        source_version = CVTranslation.version_for(cv)
+        translation, _ = CVTranslation.objects.update_or_create(
+            cv=cv,
+            language=target_language,
+            source_version=source_version,
+            defaults={
+                field: translated_content[field]
+                for field in [*self.TRANSLATED_FIELDS, "skills"]
+            },
+        )
+        CVTranslation.objects.filter(cv=cv, language=target_language).exclude(
+            source_version=source_version
+        ).delete()
+        return translation
+
+    def get_translation(self, cv, target_language):
+        """Return the stored translation of the current version of a CV, if any"""
+        return CVTranslation.objects.filter(
+            cv=cv,
+            language=target_language,
+            source_version=CVTranslation.version_for(cv),
+        ).first()
+
+    def translate_skills(self, skills, target_language):
+        """
+        Return {skill id: translated name} for the given skills, translating
+        the skills missing from the dictionary in as few requests as the
+        chunk budget allows
+        """
+        language_name = self.SUPPORTED_LANGUAGES[target_language]
+        skill_names = self._get_skill_translations(skills, target_language)
+
+        skill_groups = self._group_skills(self._missing_skills(skills, skill_names))
+        replies = self._chat_all(
+            language_name,
+            {
+                kind: self._create_skills_prompt(missing, language_name)
+                for kind, missing in skill_groups.items()
+            },
+            {kind: list(missing) for kind, missing in skill_groups.items()},
+        )
+        for kind, missing in skill_groups.items():
+            skill_names.update(
+                self._apply_skills_reply(missing, replies[kind], target_language)
+            )
+        return skill_names
+
+    def _start_translation(self, cv, target_language):
+        """
+        Collect what is already translated and the prompts for the rest
+        """
         if target_language not in self.SUPPORTED_LANGUAGES:
             raise Exception(f"Language '{target_language}' not supported")
 
         language_name = self.SUPPORTED_LANGUAGES[target_language]
 
         # Prepare content to translate
-        content_to_translate = {
+        content = {
             "title": cv.title,
             "bio": cv.bio,
             "experience": cv.experience,
             "education": cv.education,
-            "skills": [skill.name for skill in cv.skills.all()],
         }
+        skills = list(cv.skills.all())
 
-        # Create translation prompt
-        prompt = self._create_translation_prompt(content_to_translate, language_name)
+        chunk_tokens = self._budget()["CHUNK_TOKENS"]
+        translated_content = self._get_remembered_translations(content, target_language)
 
-        try:
-            # Call OpenAI API
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a professional translator specializing in translating CVs and professional documents to {language_name}. Maintain professional tone and accuracy.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=2000,
-                temperature=0.3,
+        # Short fields are sent together, longer ones in paragraph chunks
+        short_fields = {}
+        chunks = {}
+        for field, value in content.items():
+            if field in translated_content:
+                continue
+            if estimate_tokens(value) <= chunk_tokens:
+                short_fields[field] = value
+                continue
+            pieces = self._split_field(value, chunk_tokens, target_language)
+            if all(translation is not None for _, _, translation in pieces):
+                translated_content[field] = self._join_chunks(pieces)
+            else:
+                chunks[field] = pieces
+
+        field_groups = {
+            f"fields:{index}": group
+            for index, group in enumerate(
+                self._pack(short_fields, estimate_tokens, chunk_tokens)
             )
+        }
+        skill_names = self._get_skill_translations(skills, target_language)
+        skill_groups = self._group_skills(self._missing_skills(skills, skill_names))
+
+        prompts = {}
+        reply_keys = {}
+        for kind, group in field_groups.items():
+            prompts[kind] = self._create_translation_prompt(group, language_name)
+            reply_keys[kind] = list(group)
+        for field, pieces in chunks.items():
+            for index, (text, _, translation) in enumerate(pieces):
+                if translation is None:
+                    kind = f"chunk:{field}:{index}"
+                    prompts[kind] = self._create_chunk_prompt(
+                        text, field, language_name
+                    )
+                    reply_keys[kind] = ["text"]
+        for kind, missing in skill_groups.items():
+            prompts[kind] = self._create_skills_prompt(missing, language_name)
+            reply_keys[kind] = list(missing)
+
+        return TranslationJob(
+            target_language=target_language,
+            language_name=language_name,
+            skills=skills,
+            translated_content=translated_content,
+            field_groups=field_groups,
+            chunks=chunks,
+            skill_names=skill_names,
+            skill_groups=skill_groups,
+            prompts=prompts,
+            reply_keys=reply_keys,
+        )
+
+    def _finish_translation(self, job, replies):
+        """Merge the OpenAI replies for a job with what was already translated"""
+        translated_content = dict(job.translated_content)
+        skill_names = dict(job.skill_names)
 
-            # Parse response
-            translated_content = self._parse_translation_response(
-                response.choices[0].message.content
+        for kind, group in job.field_groups.items():
+            translated_content.update(
+                self._apply_fields_reply(group, replies[kind], job.target_language)
             )
+        for field, pieces in job.chunks.items():
+            # Reassemble the chunks in their original order
+            translated_content[field] = self._join_chunks(
+                [
+                    (
+                        text,
+                        separator,
+                        (
+                            translation
+                            if translation is not None
+                            else self._apply_fields_reply(
+                                {"text": text},
+                                replies[f"chunk:{field}:{index}"],
+                                job.target_language,
+                            )["text"]
+                        ),
+                    )
+                    for index, (text, separator, translation) in enumerate(pieces)
+                ]
+            )
+        for kind, missing in job.skill_groups.items():
+            skill_names.update(
+                self._apply_skills_reply(missing, replies[kind], job.target_language)
+            )
+
+        cached_fields = [
+            field for field in self.TRANSLATED_FIELDS if field in job.translated_content
+        ]
+        if not job.skill_groups:
+            cached_fields.append("skills")
+
+        translated_content = {
+            field: translated_content[field] for field in self.TRANSLATED_FIELDS
+        }
+        translated_content["skills"] = [
+            skill_names.get(skill.pk, skill.name) for skill in job.skills
+        ]
+
+        return {
+            "success": True,
+            "translated_content": translated_content,
+            "target_language": job.language_name,
+            "cached_fields": cached_fields,
+            # Estimated tokens sent and received for this translation
+            "tokens": sum(map(estimate_tokens, job.prompts.values()))
+            + sum(
+                estimate_tokens(json.dumps(reply, ensure_ascii=False))
+                for reply in replies.values()
+            ),
+        }
+
+    def _budget(self):
+        """Chunk size and reply limit of translation requests for the model"""
+        budgets = settings.OPENAI_TRANSLATION_BUDGETS
+        return budgets.get(settings.OPENAI_MODEL, budgets["default"])
+
+    def _split_field(self, value, chunk_tokens, target_language):
+        """
+        Split a long field into (text, separator, translation) chunks, with
+        the translation of chunks found in the translation memory
+        """
+        pieces = split_text(value, chunk_tokens)
+        remembered = self._get_remembered_translations(
+            {str(index): text for index, (text, _) in enumerate(pieces)},
+            target_language,
+        )
+        return [
+            (text, separator, text if not text.strip() else remembered.get(str(index)))
+            for index, (text, separator) in enumerate(pieces)
+        ]
+
+    @staticmethod
+    def _join_chunks(pieces):
+        return "".join(translation + separator for _, separator, translation in pieces)
+
+    @staticmethod
+    def _pack(items, estimate, max_tokens):
+        """Group {key: value} items into dicts of at most about max_tokens tokens"""
+        groups = []
+        group = {}
+        group_tokens = 0
+        for key, value in items.items():
+            tokens = estimate(value)
+            if group and group_tokens + tokens > max_tokens:
+                groups.append(group)
+                group = {}
+                group_tokens = 0
+            group[key] = value
+            group_tokens += tokens
+        if group:
+            groups.append(group)
+        return groups
 
+    def _group_skills(self, missing):
+        """Split missing skills into the groups sent in one request each"""
+        groups = self._pack(
+            missing,
+            lambda skill: estimate_tokens(skill.name),
+            self._budget()["CHUNK_TOKENS"],
+        )
+        return {f"skills:{index}": group for index, group in enumerate(groups)}
+
+    def _system_prompt(self, language_name):
+        return f"You are a professional translator specializing in translating CVs and professional documents to {language_name}. Maintain professional tone and accuracy."
+
+    def _chat_params(self, system_prompt, prompt, keys):
+        params = {
+            "model": settings.OPENAI_MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": self._budget()["MAX_TOKENS"],
+            "temperature": 0.3,
+        }
+        response_format = self._response_format(keys)
+        if response_format:
+            params["response_format"] = response_format
+        return params
+
+    def _response_format(self, keys):
+        """The structured output mode OPENAI_RESPONSE_FORMATS sets for the model"""
+        formats = settings.OPENAI_RESPONSE_FORMATS
+        mode = formats.get(settings.OPENAI_MODEL, formats["default"])
+        if mode == "json_schema":
             return {
-                "success": True,
-                "translated_content": translated_content,
-                "target_language": language_name,
-                "original_cv": cv,
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "translation",
+                    "strict": True,
+                    "schema": self._reply_schema(keys),
+                },
             }
+        if mode == "json_object":
+            return {"type": "json_object"}
+        return None
 
-        except Exception as e:
-            logger.error(f"Translation error: {str(e)}")
-            return {"success": False, "error": str(e), "target_language": language_name}
+    @staticmethod
+    def _reply_schema(keys):
+        """JSON schema of a reply: an object with a translated string per key"""
+        return {
+            "type": "object",
+            "properties": {key: {"type": "string"} for key in keys},
+            "required": list(keys),
+            "additionalProperties": False,
+        }
+
+    def _chat_all(self, language_name, prompts, reply_keys):
+        """
+        Send {kind: prompt} requests in parallel and return {kind: reply}
+        with each reply parsed into a JSON object with the kind's reply keys
+        """
+        if not prompts:
+            return {}
+        system_prompt = self._system_prompt(language_name)
+        with ThreadPoolExecutor(
+            max_workers=min(len(prompts), settings.OPENAI_CONCURRENCY)
+        ) as executor:
+            futures = {
+                kind: executor.submit(
+                    self._chat_json, system_prompt, prompt, reply_keys[kind]
+                )
+                for kind, prompt in prompts.items()
+            }
+            return {kind: future.result() for kind, future in futures.items()}
+
+    def _chat_json(self, system_prompt, prompt, keys):
+        """Send one request, asking once more if the reply is not as asked for"""
+        for attempt in range(2):
+            try:
+                return self._parse_reply(self._chat(system_prompt, prompt, keys), keys)
+            except InvalidReply as e:
+                error = e
+        raise error
+
+    def _chat(self, system_prompt, prompt, keys):
+        """Send one chat completion request and return the reply text"""
+        response = get_llm_client().chat(
+            **self._chat_params(system_prompt, prompt, keys)
+        )
+        return response.choices[0].message.content
+
+    async def _achat(self, client, system_prompt, prompt, keys):
+        """Send one chat completion request with an async client"""
+        response = await get_llm_client().achat(
+            client, **self._chat_params(system_prompt, prompt, keys)
+        )
+        return response.choices[0].message.content
+
+    def _apply_fields_reply(self, content, reply, target_language):
+        """Take translated fields from a parsed reply and remember them"""
+        translated = {field: reply[field] for field in content}
+        self._remember_translations(content, translated, target_language)
+        return translated
+
+    def _apply_skills_reply(self, missing, translations, target_language):
+        """Add translated skill names from a parsed reply to the dictionary"""
+        new_translations = [
+            SkillTranslation(
+                skill=skill, language=target_language, name=translations[name][:200]
+            )
+            for name, skill in missing.items()
+        ]
+        SkillTranslation.objects.bulk_create(new_translations, ignore_conflicts=True)
+
+        return {
+            translation.skill_id: translation.name for translation in new_translations
+        }
+
+    @staticmethod
+    def _missing_skills(skills, skill_names):
+        """Map names of skills without a translation to the skill"""
+        # Distinct names, since the same name may be passed more than once
+        return {skill.name: skill for skill in skills if skill.pk not in skill_names}
+
+    def _get_skill_translations(self, skills, target_language):
+        """Return {skill id: translated name} for the skills in the dictionary"""
+        if not skills:
+            return {}
+        return dict(
+            SkillTranslation.objects.filter(
+                language=target_language, skill__in=skills
+            ).values_list("skill_id", "name")
+        )
+
+    def _get_remembered_translations(self, content, target_language):
+        """Return the fields of content found in the translation memory"""
+        hashes = {field: self._source_hash(value) for field, value in content.items()}
+        entries = TranslationMemory.objects.filter(
+            language=target_language,
+            model=settings.OPENAI_MODEL,
+            source_hash__in=set(hashes.values()),
+        )
+        remembered = {entry.source_hash: entry.translated_text for entry in entries}
+
+        translations = {}
+        for field, value in content.items():
+            if not value:
+                # Nothing to translate
+                translations[field] = value
+            elif hashes[field] in remembered:
+                translations[field] = remembered[hashes[field]]
+        return translations
+
+    def _remember_translations(self, content, translations, target_language):
+        """Store translated fields in the translation memory"""
+        TranslationMemory.objects.bulk_create(
+            [
+                TranslationMemory(
+                    source_hash=self._source_hash(content[field]),
+                    language=target_language,
+                    model=settings.OPENAI_MODEL,
+                    translated_text=value,
+                )
+                for field, value in translations.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def _source_hash(value):
+        """Hash a source text"""
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    # Prompts end with their payload as compact JSON on the last line
+
+    def _create_skills_prompt(self, missing, target_language):
+        """Create prompt for translating skill names"""
+        return (
+            f"Translate these CV skill names to {target_language}, keeping names of "
+            "technologies, products and programming languages. Reply with a JSON "
+            "object mapping each name to its translation.\n"
+            + self._compact_json(list(missing))
+        )
 
     def _create_translation_prompt(self, content, target_language):
         """Create prompt for OpenAI translation"""
-        return f"""
-            Please translate the following CV content to {target_language}. 
-            Maintain professional terminology and preserve the structure.
-            Return the translation in the same JSON format:
-
-            {content}
-
-            Please respond with a JSON object containing the translated fields:
-            {{
-                "title": "translated title",
-                "bio": "translated bio",
-                "experience": "translated experience", 
-                "education": "translated education",
-                "skills": ["translated", "skill", "names"]
-            }}
-            """
-
-    def _parse_translation_response(self, response_content):
-        """Parse OpenAI response and extract translated content"""
-        import json
+        return (
+            f"Translate the values of this JSON object of CV fields to {target_language}, "
+            "keeping professional terminology and line breaks. Reply with a JSON "
+            "object with the same keys.\n" + self._compact_json(content)
+        )
+
+    def _create_chunk_prompt(self, text, field, target_language):
+        """Create prompt for translating one part of a long CV section"""
+        return (
+            f'Translate "text", part of the {field} section of a CV, to {target_language}, '
+            "keeping professional terminology, paragraphs and line breaks. Reply with "
+            'a JSON object with the key "text".\n' + self._compact_json({"text": text})
+        )
+
+    @staticmethod
+    def _compact_json(value):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
 
+    def _parse_reply(self, response_content, keys):
+        """
+        Parse a reply into a JSON object with exactly the given keys, each a
+        non-empty string, raising InvalidReply otherwise
+        """
         try:
-            # Try to extract JSON from response
-            start_idx = response_content.find("{")
-            end_idx = response_content.rfind("}") + 1
+            reply = json.loads(response_content)
+        except (TypeError, json.JSONDecodeError):
+            # Without a JSON output mode the object may come wrapped in prose
+            start_idx = (response_content or "").find("{")
+            end_idx = (response_content or "").rfind("}") + 1
+            try:
+                reply = json.loads(response_content[start_idx:end_idx])
+            except (TypeError, json.JSONDecodeError):
+                reply = None
 
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response_content[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                raise Exception("Could not parse translation response")
+        if not isinstance(reply, dict):
+            logger.warning("Translation response is not a JSON object")
+            raise InvalidReply("Could not parse translation response")
 
-        except json.JSONDecodeError:
-            # Fallback: return original structure with response as bio
-            return {
-                "title": "Translation Error",
-                "bio": response_content,
-                "experience": "Translation Error",
-                "education": "Translation Error",
-                "skills": ["Translation Error"],
-            }
+        missing = [
+            key for key in keys if not isinstance(reply.get(key), str) or not reply[key]
+        ]
+        unexpected = set(reply) - set(keys)
+        if missing or unexpected:
+            logger.warning(
+                f"Translation response has missing or empty keys {missing} "
+                f"and unexpected keys {sorted(unexpected)}"
+            )
+            raise InvalidReply("Translation response does not have the requested keys")
+        return reply
 
     @classmethod
     def get_supported_languages(cls):
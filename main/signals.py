@@ -0,0 +1,188 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import CV, CVDeletion, Project, Skill
+from .search import reindex_cvs, remove_from_index
+
+logger = logging.getLogger(__name__)
+
+
+# The task clears its debounce lock when it starts. The lock outlives the
+# countdown by this much so a task waiting in the queue is not doubled; it
+# only expires on its own if the task is lost.
+PRERENDER_LOCK_GRACE = 300
+
+
+def prerender_key(cv_id):
+    return f"pdf-prerender:{cv_id}"
+
+
+def schedule_pdf_prerender(cv_id):
+    """
+    Queue one background PDF render for a CV once the transaction commits.
+    Further edits until the render starts are folded into it.
+    """
+    config = settings.PDF_PRERENDER
+    if not config["ENABLED"]:
+        return
+
+    def enqueue():
+        from .tasks import prerender_cv_pdf_task
+
+        debounce = config["DEBOUNCE"]
+        lock_timeout = debounce + PRERENDER_LOCK_GRACE
+        if cache.add(prerender_key(cv_id), True, timeout=lock_timeout):
+            prerender_cv_pdf_task.apply_async((cv_id,), countdown=debounce)
+            logger.debug(f"Scheduled PDF pre-render for CV ID: {cv_id}")
+
+    # A broker outage must not fail the request that saved the CV
+    transaction.on_commit(enqueue, robust=True)
+
+
+def touch_cvs(cv_ids):
+    """
+    Move updated_at of CVs whose projects or skills changed, so their
+    ETags and Last-Modified change with them
+    """
+    CV.objects.filter(pk__in=cv_ids).update(updated_at=timezone.now())
+
+
+def schedule_reindex(cv_ids):
+    """
+    Touch and reindex CVs in background tasks of SEARCH_REINDEX_BATCH_SIZE
+    CVs each, once the transaction commits. For changes that can reach a
+    large part of the table, like renaming a common skill.
+    """
+    cv_ids = list(cv_ids)
+    if not cv_ids:
+        return
+
+    def enqueue():
+        from .tasks import reindex_cvs_task
+
+        batch_size = settings.SEARCH_REINDEX_BATCH_SIZE
+        for start in range(0, len(cv_ids), batch_size):
+            reindex_cvs_task.delay(cv_ids[start : start + batch_size])
+
+    # A broker outage must not fail the request that made the change
+    transaction.on_commit(enqueue, robust=True)
+
+
+class RelatedChanges:
+    """
+    CVs whose projects or skills changed in the current transaction. They
+    are touched, reindexed and pre-rendered once, when it commits.
+    """
+
+    def __init__(self, cv_ids):
+        self.cv_ids = set(cv_ids)
+        # CVs touched by touch_related_changes() since their last change
+        self.touched = set()
+        self.pending = True
+
+    def __call__(self):
+        # Run callbacks can stay registered, e.g. under captureOnCommitCallbacks
+        self.pending = False
+        # CVs deleted later in the transaction are skipped by every step
+        cv_ids = list(
+            CV.objects.filter(pk__in=self.cv_ids).values_list("pk", flat=True)
+        )
+        touch_cvs([cv_id for cv_id in cv_ids if cv_id not in self.touched])
+        reindex_cvs(cv_ids)
+        for cv_id in cv_ids:
+            schedule_pdf_prerender(cv_id)
+
+
+def _pending_related_changes():
+    # Callbacks of rolled back savepoints are dropped together with their CVs
+    for _, callback, _ in transaction.get_connection().run_on_commit:
+        if isinstance(callback, RelatedChanges) and callback.pending:
+            return callback
+    return None
+
+
+def related_changed(cv_ids):
+    """Add CVs to the RelatedChanges of the current transaction"""
+    changes = _pending_related_changes()
+    if changes is None:
+        transaction.on_commit(RelatedChanges(cv_ids))
+    else:
+        changes.cv_ids.update(cv_ids)
+        changes.touched.difference_update(cv_ids)
+
+
+def touch_related_changes(cv_ids):
+    """
+    Touch CVs with related changes in the current transaction now rather
+    than when it commits, so validators read before the commit stay current
+    """
+    changes = _pending_related_changes()
+    if changes is not None:
+        cv_ids = (changes.cv_ids & set(cv_ids)) - changes.touched
+        touch_cvs(cv_ids)
+        changes.touched.update(cv_ids)
+
+
+def _deleted_with_cv(origin):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is CV
+
+
+@receiver(post_save, sender=CV)
+def cv_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reindex_cvs([instance.pk])
+        schedule_pdf_prerender(instance.pk)
+
+
+@receiver(post_delete, sender=CV)
+def cv_deleted(sender, instance, **kwargs):
+    remove_from_index(instance.pk)
+    CVDeletion.objects.create(cv_id=instance.pk)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        related_changed([instance.cv_id])
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, origin=None, **kwargs):
+    # Projects deleted along with their CV leave nothing to update
+    if not _deleted_with_cv(origin):
+        related_changed([instance.cv_id])
+
+
+@receiver(m2m_changed, sender=CV.skills.through)
+def cv_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            related_changed([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        # skill.cv_skills.add(...) changes the CVs in pk_set
+        related_changed(pk_set)
+    elif action == "pre_clear":
+        # The CVs losing this skill are only known before the clear;
+        # the updates themselves still run after commit
+        related_changed(list(instance.cv_skills.values_list("pk", flat=True)))
+
+
+@receiver(post_save, sender=Skill)
+def skill_saved(sender, instance, created, raw=False, **kwargs):
+    # A renamed skill changes every CV listing it; new skills are on none
+    if not created and not raw:
+        schedule_reindex(instance.cv_skills.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Skill)
+def skill_deleting(sender, instance, **kwargs):
+    # The CVs listing the skill are only known before the delete
+    schedule_reindex(instance.cv_skills.values_list("pk", flat=True))
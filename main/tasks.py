@@ -1,46 +1,45 @@
 from celery import shared_task
-from django.core.mail import EmailMessage
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
 from django.template.loader import render_to_string
+from django.urls import reverse
 from django.conf import settings
-from .models import CV
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-import io
+from . import idempotency
+from .models import CV, TranslationBatch
+from .pdf.export import (
+    export_archive_path,
+    remove_export_parts,
+    remove_expired_exports,
+    render_export_parts,
+    write_export_archive,
+)
+from .pdf.renderers import render_cv_pdf
 import logging
+import os
 from .services import TranslationService
+from .translation_batch import translate_next_chunk
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def send_cv_pdf_email(cv_id, recipient_email):
+@shared_task(bind=True)
+def send_cv_pdf_email(self, cv_id, recipient_email, idempotency_key=None):
     """
-    Generate CV PDF and send it via email
+    Generate CV PDF and send it via email. A failed send releases its
+    idempotency key so the user can try again straight away.
     """
     try:
         # Get CV object
-        cv = CV.objects.get(id=cv_id)
-
-        # Generate PDF
-        pdf_buffer = generate_cv_pdf(cv)
-
-        # Create email
-        subject = f"CV for {cv.full_name}"
-        message = render_to_string(
-            "main/email_cv_template.txt", {"cv": cv, "recipient_email": recipient_email}
+        cv = (
+            CV.objects.defer("search_vector")
+            .prefetch_related("skills", "project_set")
+            .get(id=cv_id)
         )
 
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[recipient_email],
-        )
+        # Generate PDF, shared with the download view when both use one backend
+        pdf = render_cv_pdf(cv, "email")
 
-        # Attach PDF
-        email.attach(f"{cv.full_name}_CV.pdf", pdf_buffer.getvalue(), "application/pdf")
+        email = build_cv_email(cv, pdf, recipient_email)
 
         # Send email
         email.send()
@@ -50,109 +49,251 @@ def send_cv_pdf_email(cv_id, recipient_email):
 
     except CV.DoesNotExist:
         logger.error(f"CV with ID {cv_id} not found")
+        if idempotency_key:
+            idempotency.release(idempotency_key, self.request.id)
         return f"CV with ID {cv_id} not found"
     except Exception as e:
         logger.error(f"Error sending CV PDF: {str(e)}")
+        if idempotency_key:
+            idempotency.release(idempotency_key, self.request.id)
         return f"Error sending email: {str(e)}"
 
 
-def generate_cv_pdf(cv):
-    """
-    Generate PDF from CV data
-    """
-    buffer = io.BytesIO()
-
-    # Create the PDF object
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Title
-    title = Paragraph(f"<b>{cv.full_name}</b>", styles["Title"])
-    story.append(title)
-    story.append(Spacer(1, 12))
-
-    # Professional Title
-    if cv.title:
-        prof_title = Paragraph(f"<b>{cv.title}</b>", styles["Heading2"])
-        story.append(prof_title)
-        story.append(Spacer(1, 12))
-
-    # Contact Information
-    contact_info = f"""
-    <b>Email:</b> {cv.email}<br/>
-    <b>Phone:</b> {cv.phone or 'Not provided'}<br/>
-    <b>Location:</b> {cv.location or 'Not provided'}
-    """
-    contact_para = Paragraph(contact_info, styles["Normal"])
-    story.append(contact_para)
-    story.append(Spacer(1, 12))
-
-    # Professional Summary
-    if cv.bio:
-        bio_title = Paragraph("<b>Professional Summary</b>", styles["Heading3"])
-        story.append(bio_title)
-        bio_para = Paragraph(cv.bio, styles["Normal"])
-        story.append(bio_para)
-        story.append(Spacer(1, 12))
-
-    # Experience
-    if cv.experience:
-        exp_title = Paragraph("<b>Work Experience</b>", styles["Heading3"])
-        story.append(exp_title)
-        exp_para = Paragraph(cv.experience, styles["Normal"])
-        story.append(exp_para)
-        story.append(Spacer(1, 12))
-
-    # Education
-    if cv.education:
-        edu_title = Paragraph("<b>Education</b>", styles["Heading3"])
-        story.append(edu_title)
-        edu_para = Paragraph(cv.education, styles["Normal"])
-        story.append(edu_para)
-        story.append(Spacer(1, 12))
-
-    # Skills
-    if cv.skills.exists():
-        skills_title = Paragraph("<b>Skills</b>", styles["Heading3"])
-        story.append(skills_title)
-        skills_list = ", ".join([skill.name for skill in cv.skills.all()])
-        skills_para = Paragraph(skills_list, styles["Normal"])
-        story.append(skills_para)
-        story.append(Spacer(1, 12))
-
-    # URLs
-    urls = []
-    if cv.portfolio_url:
-        urls.append(f"Portfolio: {cv.portfolio_url}")
-    if cv.linkedin_url:
-        urls.append(f"LinkedIn: {cv.linkedin_url}")
-    if cv.github_url:
-        urls.append(f"GitHub: {cv.github_url}")
-
-    if urls:
-        urls_title = Paragraph("<b>Links</b>", styles["Heading3"])
-        story.append(urls_title)
-        urls_para = Paragraph("<br/>".join(urls), styles["Normal"])
-        story.append(urls_para)
-
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-
-    return buffer
+def build_cv_email(cv, pdf, recipient_email):
+    """
+    Build the email carrying a CV's PDF to one recipient
+    """
+    subject = f"CV for {cv.full_name}"
+    message = render_to_string(
+        "main/email_cv_template.txt", {"cv": cv, "recipient_email": recipient_email}
+    )
+
+    email = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient_email],
+    )
+
+    # Attach PDF
+    email.attach(f"{cv.full_name}_CV.pdf", pdf.content, "application/pdf")
+    return email
 
 
 @shared_task
-def translate_cv_content_task(cv_id, target_language):
+def send_cv_pdf_batch_email(cv_ids, recipient_emails):
     """
-    Translate CV content asynchronously
+    Send the PDFs of one or more CVs to a list of recipients. Each PDF is
+    rendered once, and the emails go out over one mail connection per chunk
+    of EMAIL_BATCH_SIZE messages. Reports the outcome for every recipient.
     """
+    results = []
+
+    def record(cv_id, recipient_email, error=None):
+        outcome = {"cv_id": cv_id, "email": recipient_email, "sent": error is None}
+        if error is not None:
+            outcome["error"] = error
+        results.append(outcome)
+
+    # Render every CV up front; a CV that fails fails for all its recipients
+    messages = []
+    cvs = (
+        CV.objects.filter(pk__in=cv_ids)
+        .defer("search_vector")
+        .prefetch_related("skills", "project_set")
+    )
+    cvs_by_id = {cv.pk: cv for cv in cvs}
+    for cv_id in cv_ids:
+        cv = cvs_by_id.get(cv_id)
+        if cv is None:
+            error = f"CV with ID {cv_id} not found"
+        else:
+            try:
+                pdf = render_cv_pdf(cv, "email")
+                error = None
+            except Exception as e:
+                logger.error(f"Error rendering PDF for CV ID {cv_id}: {str(e)}")
+                error = f"Error generating PDF: {str(e)}"
+
+        for recipient_email in recipient_emails:
+            if error is None:
+                messages.append(
+                    (cv_id, recipient_email, build_cv_email(cv, pdf, recipient_email))
+                )
+            else:
+                record(cv_id, recipient_email, error)
+
+    chunk_size = settings.EMAIL_BATCH_SIZE
+    for i in range(0, len(messages), chunk_size):
+        _send_email_chunk(messages[i : i + chunk_size], record)
+
+    sent = sum(1 for outcome in results if outcome["sent"])
+    logger.info(f"Batch CV email sent {sent} of {len(results)} messages")
+    return {"sent": sent, "failed": len(results) - sent, "results": results}
+
+
+def _send_email_chunk(messages, record):
+    """
+    Send (cv_id, recipient_email, email) messages over one mail connection
+    """
+    connection = get_connection()
+    pending = list(messages)
     try:
-        cv = CV.objects.get(id=cv_id)
+        connection.open()
+        while pending:
+            cv_id, recipient_email, email = pending.pop(0)
+            email.connection = connection
+            try:
+                email.send()
+                record(cv_id, recipient_email)
+            except Exception as e:
+                logger.error(f"Error sending CV PDF to {recipient_email}: {str(e)}")
+                record(cv_id, recipient_email, f"Error sending email: {str(e)}")
+                # The server may have dropped the session, so start a new one
+                connection.close()
+                connection.open()
+    except Exception as e:
+        logger.error(f"Mail connection failed: {str(e)}")
+        for cv_id, recipient_email, _ in pending:
+            record(cv_id, recipient_email, f"Error sending email: {str(e)}")
+    finally:
+        connection.close()
+
+
+@shared_task
+def prerender_cv_pdf_task(cv_id):
+    """
+    Render a changed CV into the PDF cache ahead of the first download or email
+    """
+    from .signals import prerender_key
+
+    # Edits from now on schedule a new render instead of being folded into this one
+    cache.delete(prerender_key(cv_id))
+
+    try:
+        cv = (
+            CV.objects.defer("search_vector")
+            .prefetch_related("skills", "project_set")
+            .get(id=cv_id)
+        )
+
+        # Purposes sharing a backend share the cache entry, so they render once
+        for purpose in settings.PDF_PRERENDER["PURPOSES"]:
+            render_cv_pdf(cv, purpose)
+
+        logger.info(f"PDF pre-rendered for CV ID: {cv_id}")
+        return f"PDF pre-rendered for CV ID: {cv_id}"
+
+    except CV.DoesNotExist:
+        logger.info(f"CV with ID {cv_id} was deleted before pre-rendering")
+        return f"CV with ID {cv_id} not found"
+    except Exception as e:
+        logger.error(f"Error pre-rendering CV PDF: {str(e)}")
+        return f"Error pre-rendering PDF: {str(e)}"
+
+
+@shared_task
+def reindex_cvs_task(cv_ids):
+    """
+    Touch and reindex one batch of CVs after a skill they list was renamed
+    or deleted
+    """
+    from .search import reindex_cvs
+    from .signals import touch_cvs
+
+    touch_cvs(cv_ids)
+    reindex_cvs(cv_ids)
+    logger.info(f"Reindexed {len(cv_ids)} CVs")
+
+
+@shared_task
+def render_cv_pdfs_task(cv_ids, export_id):
+    """
+    Render a chunk of CV PDFs into the parts directory of a bulk export
+    """
+    cvs = (
+        CV.objects.filter(pk__in=cv_ids)
+        .defer("search_vector")
+        .prefetch_related("skills", "project_set")
+    )
+    parts, failed = render_export_parts(cvs, export_id)
+    return {"parts": parts, "failed": failed}
+
+
+@shared_task(bind=True)
+def build_cv_archive_task(self, chunk_results, cv_ids):
+    """
+    Write the PDFs rendered by the chunk tasks of a bulk export into a ZIP
+    archive and remove them
+    """
+    export_id = self.request.id
+    archive_path = export_archive_path(export_id)
+    os.makedirs(settings.PDF_EXPORT_DIR, exist_ok=True)
+    parts = [part for result in chunk_results for part in result["parts"]]
+    failed = [cv_id for result in chunk_results for cv_id in result["failed"]]
+
+    def report_progress(done, total):
+        self.update_state(state="ARCHIVING", meta={"done": done, "total": total})
+
+    try:
+        with open(archive_path, "wb") as archive_file:
+            failed += write_export_archive(
+                export_id, parts, archive_file, on_progress=report_progress
+            )
+        # CVs deleted since the selection was made
+        rendered = {cv_id for cv_id, _ in parts}
+        failed += [
+            cv_id for cv_id in cv_ids if cv_id not in rendered and cv_id not in failed
+        ]
+
+        logger.info(f"Exported {len(cv_ids) - len(failed)} CV PDFs to {archive_path}")
+        return {"success": True, "total": len(cv_ids), "failed": failed}
+
+    except Exception as e:
+        logger.error(f"Error exporting CV PDFs: {str(e)}")
+        if os.path.exists(archive_path):
+            os.unlink(archive_path)
+        return {"success": False, "error": str(e)}
+    finally:
+        remove_export_parts(export_id)
+
+
+@shared_task
+def remove_expired_exports_task():
+    """
+    Delete bulk export archives older than PDF_EXPORT_RETENTION
+    """
+    removed = remove_expired_exports()
+    logger.info(f"Removed {removed} expired export archives")
+    return removed
+
+
+@shared_task(bind=True)
+def translate_cv_content_task(self, cv_id, target_language, single_flight_key=None):
+    """
+    Translate CV content asynchronously, publishing fields already found in
+    the translation memory while the rest is translated. The single-flight
+    key, if given, is released when the task is done.
+    """
+
+    def report_partial(translated_content):
+        if self.request.id:
+            self.update_state(
+                state="PROGRESS", meta={"translated_content": translated_content}
+            )
+
+    try:
+        cv = CV.objects.prefetch_related("skills").get(id=cv_id)
         translation_service = TranslationService()
 
-        result = translation_service.translate_cv_content(cv, target_language)
+        result = translation_service.translate_cv_content(
+            cv, target_language, on_partial=report_partial
+        )
+        if result["success"]:
+            translation_service.save_translation(
+                cv, target_language, result["translated_content"]
+            )
+            result.update(_translation_urls(cv_id, target_language))
 
         logger.info(f"Translation completed for CV ID: {cv_id} to {target_language}")
         return result
@@ -163,3 +304,92 @@ def translate_cv_content_task(cv_id, target_language):
     except Exception as e:
         logger.error(f"Error translating CV: {str(e)}")
         return {"success": False, "error": str(e)}
+    finally:
+        if single_flight_key:
+            idempotency.release(single_flight_key, self.request.id)
+
+
+@shared_task(bind=True)
+def translate_cv_languages_task(self, cv_id, target_languages, single_flight_key=None):
+    """
+    Translate CV content into several languages concurrently, reporting
+    the status of each language while it runs. The single-flight key, if
+    given, is released when the task is done.
+    """
+    progress = {language: "pending" for language in target_languages}
+    finished = {}
+
+    def report_progress(language, status, result=None):
+        progress[language] = status
+        if result is not None:
+            # Store each language as soon as it is done
+            if result["success"]:
+                translation_service.save_translation(
+                    cv, language, result["translated_content"]
+                )
+                result.update(_translation_urls(cv_id, language))
+            finished[language] = result
+        self.update_state(
+            state="PROGRESS",
+            meta={
+                "languages": dict(progress),
+                "done": len(finished),
+                "total": len(progress),
+                # Results of the languages finished so far
+                "results": dict(finished),
+            },
+        )
+
+    try:
+        cv = CV.objects.prefetch_related("skills").get(id=cv_id)
+        translation_service = TranslationService()
+
+        results = translation_service.translate_cv_languages(
+            cv, target_languages, on_progress=report_progress
+        )
+
+        failed = [
+            language for language, result in results.items() if not result["success"]
+        ]
+        logger.info(
+            f"Translation completed for CV ID: {cv_id} to "
+            f"{len(results) - len(failed)} of {len(results)} languages"
+        )
+        return {"success": not failed, "translations": results, "failed": failed}
+
+    except CV.DoesNotExist:
+        logger.error(f"CV with ID {cv_id} not found")
+        return {"success": False, "error": f"CV with ID {cv_id} not found"}
+    except Exception as e:
+        logger.error(f"Error translating CV: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        if single_flight_key:
+            idempotency.release(single_flight_key, self.request.id)
+
+
+@shared_task
+def translate_cv_batch_task(batch_id):
+    """
+    Translate the next chunk of a translation batch, then queue the task
+    for the chunk after it
+    """
+    try:
+        batch = TranslationBatch.objects.get(pk=batch_id)
+        if batch.finished_at is None and translate_next_chunk(batch):
+            translate_cv_batch_task.delay(batch_id)
+        else:
+            logger.info(f"Translation batch {batch_id} finished")
+        return batch.stats()
+
+    except TranslationBatch.DoesNotExist:
+        logger.error(f"Translation batch {batch_id} not found")
+        return {"success": False, "error": f"Translation batch {batch_id} not found"}
+
+
+def _translation_urls(cv_id, language):
+    """Links to the stored translation of a CV"""
+    return {
+        "detail_url": reverse("main:cv_detail_translated", args=[cv_id, language]),
+        "pdf_url": reverse("main:cv_pdf_download_translated", args=[cv_id, language]),
+    }
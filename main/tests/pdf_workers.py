@@ -0,0 +1,15 @@
+"""
+Render functions for the pool tests. Pool processes import this module
+without setting up Django, so it must not import models or test utilities.
+"""
+
+import time
+
+from main.pdf.pool import _render_in_worker
+
+
+def hanging_render(html_string, stylesheet_paths):
+    """Never finish rendering documents that ask to hang"""
+    if html_string == "hang":
+        time.sleep(3600)
+    return _render_in_worker(html_string, stylesheet_paths)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import CV, CVTranslation, Skill
+from ..tasks import reindex_cvs_task
+
+
+class CVConditionalViewTestCase(TestCase):
+    """Test cases for ETag and Last-Modified on the CV list and detail pages"""
+
+    def setUp(self):
+        cache.clear()
+        self.skill = Skill.objects.create(name="Python")
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Software Developer",
+            bio="Experienced developer",
+            experience="5+ years of software development experience",
+            education="Bachelor's in Computer Science",
+        )
+        self.cv.skills.add(self.skill)
+        self.detail_url = reverse("main:cv_detail", kwargs={"pk": self.cv.pk})
+        self.list_url = reverse("main:cv_list")
+
+    def test_unchanged_pages_are_not_modified(self):
+        """Test that both pages answer 304 without rendering"""
+        for url in [self.list_url, self.detail_url]:
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+
+                with self.assertTemplateNotUsed("main/base.html"):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_renamed_skill_changes_the_page(self):
+        """Test that renaming a skill touches the CVs listing it"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with mock.patch.object(reindex_cvs_task, "delay", reindex_cvs_task):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.skill.name = "Python 3"
+                self.skill.save()
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Python 3")
+
+    def test_new_translation_changes_the_detail_page(self):
+        """Test that a stored translation invalidates the detail page"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        CVTranslation.objects.create(
+            cv=self.cv,
+            language="breton",
+            source_version=CVTranslation.version_for(self.cv),
+            title="Diorroer",
+            bio="Bio",
+            experience="Skiant",
+            education="Deskadurezh",
+        )
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_cv_is_not_found(self):
+        """Test that a missing CV returns 404 before any validators"""
+        response = self.client.get(reverse("main:cv_detail", kwargs={"pk": 9999}))
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,216 @@
+import json
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from ..models import CV
+from ..pdf.renderers import WeasyPrintRenderer
+from ..tasks import send_cv_pdf_batch_email, send_cv_pdf_email
+from .utils import PdfCacheTestMixin
+
+
+class BatchEmailTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for sending CV PDFs to many recipients"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+        settings_override = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            EMAIL_BATCH_SIZE=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        render_patch = mock.patch.object(
+            WeasyPrintRenderer, "render", return_value=b"%PDF-1.7 email"
+        )
+        self.render = render_patch.start()
+        self.addCleanup(render_patch.stop)
+
+        self.cv1 = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+        )
+        self.cv2 = CV.objects.create(
+            first_name="Jane",
+            last_name="Smith",
+            email="jane.smith@example.com",
+            title="Frontend Developer",
+            bio="Creative frontend developer",
+        )
+        self.recipients = [f"recipient{i}@example.com" for i in range(5)]
+
+    def test_batch_renders_each_pdf_once(self):
+        """Test that every recipient gets each CV from a single render"""
+        result = send_cv_pdf_batch_email([self.cv1.pk, self.cv2.pk], self.recipients)
+
+        self.assertEqual(result["sent"], 10)
+        self.assertEqual(result["failed"], 0)
+        self.assertEqual(len(mail.outbox), 10)
+        self.assertEqual(self.render.call_count, 2)
+        self.assertEqual(mail.outbox[0].attachments[0][2], "application/pdf")
+
+    def test_batch_reuses_connection_per_chunk(self):
+        """Test that messages share one mail connection per chunk"""
+        with mock.patch("main.tasks.get_connection", wraps=mail.get_connection) as get:
+            send_cv_pdf_batch_email([self.cv1.pk], self.recipients)
+
+        # Five messages in chunks of two
+        self.assertEqual(get.call_count, 3)
+
+    def test_batch_reports_failures_per_recipient(self):
+        """Test that one failing recipient does not stop the others"""
+        original_send = mail.EmailMessage.send
+
+        def send(message, *args, **kwargs):
+            if message.to == ["recipient1@example.com"]:
+                raise ConnectionError("Recipient refused")
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(mail.EmailMessage, "send", send):
+            result = send_cv_pdf_batch_email([self.cv1.pk, 99999], self.recipients[:2])
+
+        outcomes = {(r["cv_id"], r["email"]): r for r in result["results"]}
+        self.assertTrue(outcomes[(self.cv1.pk, "recipient0@example.com")]["sent"])
+        self.assertFalse(outcomes[(self.cv1.pk, "recipient1@example.com")]["sent"])
+        self.assertIn("not found", outcomes[(99999, "recipient0@example.com")]["error"])
+        self.assertEqual(result["sent"], 1)
+        self.assertEqual(result["failed"], 3)
+
+    def test_batch_view_triggers_task(self):
+        """Test that the batch endpoint validates input and queues one task"""
+        with mock.patch("main.views.send_cv_pdf_batch_email.delay") as delay:
+            delay.return_value.id = "task-id"
+            response = self.client.post(
+                reverse("main:send_cv_email_batch"),
+                json.dumps(
+                    {
+                        "cv_ids": [self.cv1.pk, self.cv2.pk],
+                        "emails": self.recipients + [self.recipients[0]],
+                    }
+                ),
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 10)
+        delay.assert_called_once_with([self.cv1.pk, self.cv2.pk], self.recipients)
+
+    def test_batch_view_rejects_invalid_input(self):
+        """Test invalid addresses, unknown CVs and oversized batches"""
+        url = reverse("main:send_cv_email_batch")
+
+        response = self.client.post(
+            url,
+            json.dumps({"cv_ids": [self.cv1.pk], "emails": ["not-an-email"]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["invalid_emails"], ["not-an-email"])
+
+        response = self.client.post(
+            url,
+            json.dumps({"cv_ids": [99999], "emails": self.recipients}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+        with override_settings(EMAIL_BATCH_MAX_RECIPIENTS=3):
+            response = self.client.post(
+                url,
+                json.dumps({"cv_ids": [self.cv1.pk], "emails": self.recipients}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 400)
+
+
+class SendEmailIdempotencyTestCase(TestCase):
+    """Test cases for coalescing repeated single CV email sends"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+        )
+        self.url = reverse("main:send_cv_email", args=[self.cv.pk])
+
+        apply_async_patch = mock.patch("main.views.send_cv_pdf_email.apply_async")
+        self.apply_async = apply_async_patch.start()
+        self.addCleanup(apply_async_patch.stop)
+
+    def send(self, email="recruiter@example.com", **headers):
+        return self.client.post(
+            self.url,
+            json.dumps({"email": email}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+    def test_double_click_returns_existing_task(self):
+        """Test that a repeated send is not enqueued again"""
+        first = self.send().json()
+        second = self.send(email=" Recruiter@Example.com").json()
+
+        self.assertEqual(self.apply_async.call_count, 1)
+        self.assertEqual(second["task_id"], first["task_id"])
+        self.assertTrue(second["duplicate"])
+        self.assertEqual(self.apply_async.call_args.kwargs["task_id"], first["task_id"])
+
+    def test_changed_cv_is_sent_again(self):
+        """Test that a new CV version gets its own send"""
+        self.send()
+        self.cv.title = "Senior Python Developer"
+        self.cv.save()
+        self.send()
+
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_client_idempotency_key(self):
+        """Test that the Idempotency-Key header decides what is a repeat"""
+        first = self.send(**{"Idempotency-Key": "abc"}).json()
+        second = self.send(**{"Idempotency-Key": "abc"}).json()
+        self.send(**{"Idempotency-Key": "def"})
+
+        self.assertEqual(second["task_id"], first["task_id"])
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_client_idempotency_key_with_other_payload(self):
+        """Test that reusing an Idempotency-Key for another payload is rejected"""
+        first = self.send(**{"Idempotency-Key": "abc"}).json()
+        repeat = self.send(email="Recruiter@example.com", **{"Idempotency-Key": "abc"})
+        other = self.send(email="other@example.com", **{"Idempotency-Key": "abc"})
+
+        self.assertEqual(repeat.json()["task_id"], first["task_id"])
+        self.assertEqual(other.status_code, 422)
+        self.assertEqual(self.apply_async.call_count, 1)
+
+    def test_failed_send_releases_key(self):
+        """Test that a failed task lets the next request enqueue again"""
+        task_id = self.send().json()["task_id"]
+        key = self.apply_async.call_args.args[1]["idempotency_key"]
+
+        with mock.patch.object(
+            WeasyPrintRenderer, "render", side_effect=RuntimeError("boom")
+        ):
+            send_cv_pdf_email.apply(
+                (self.cv.pk, "recruiter@example.com"),
+                {"idempotency_key": key},
+                task_id=task_id,
+            )
+
+        response = self.send().json()
+        self.assertNotIn("duplicate", response)
+        self.assertEqual(self.apply_async.call_count, 2)
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from unittest import mock
+
+import openai
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..llm import CircuitBreaker, CircuitOpenError, get_llm_client, get_llm_metrics
+from ..services import TranslationService
+from .utils import OpenAIHandler, StubOpenAIServerMixin
+
+CLIENT_CONFIG = {
+    "TIMEOUT": 2,
+    "CONNECT_TIMEOUT": 1,
+    "MAX_RETRIES": 2,
+    "BACKOFF": 0,
+    "MAX_BACKOFF": 0,
+    "MAX_CONNECTIONS": 2,
+    "CIRCUIT_FAILURE_THRESHOLD": 3,
+    "CIRCUIT_RESET_TIMEOUT": 30,
+}
+
+
+class ScriptedOpenAIHandler(OpenAIHandler):
+    """
+    OpenAI-compatible chat completions endpoint that answers with the
+    statuses queued in server.script, then with successful completions
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.read_json()
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            status = server.script.pop(0) if server.script else 200
+
+        if status == "slow":
+            time.sleep(0.5)
+            status = 200
+
+        if status == 200:
+            self.send_completion("ok", usage=(12, 3))
+        else:
+            self.send_json(
+                status,
+                {"error": {"message": f"status {status}", "type": "error"}},
+                {"Retry-After": "0"} if status == 429 else None,
+            )
+
+
+class LLMClientTestCase(StubOpenAIServerMixin, TestCase):
+    """Test cases for the pooled, retrying OpenAI client"""
+
+    handler_class = ScriptedOpenAIHandler
+
+    def setUp(self):
+        self.server.requests = 0
+        self.server.connections = set()
+        self.server.script = []
+        self.configure()
+        cache.clear()
+
+    def configure(self, **client_config):
+        settings_override = override_settings(
+            OPENAI_API_KEY="test-key",
+            OPENAI_BASE_URL=self.openai_base_url,
+            OPENAI_CLIENT={**CLIENT_CONFIG, **client_config},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def chat(self):
+        response = get_llm_client().chat(
+            model="test-model", messages=[{"role": "user", "content": "Hi"}]
+        )
+        return response.choices[0].message.content
+
+    def test_connection_is_kept_alive(self):
+        """Test that consecutive requests share one connection"""
+        for _ in range(3):
+            self.assertEqual(self.chat(), "ok")
+
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(len(self.server.connections), 1)
+        metrics = get_llm_metrics()
+        self.assertEqual(metrics["requests"], 3)
+        self.assertEqual(metrics["tokens"], {"prompt": 36, "completion": 9})
+
+    def test_rate_limited_request_is_retried(self):
+        """Test that a 429 response is retried"""
+        self.server.script = [429]
+
+        self.assertEqual(self.chat(), "ok")
+
+        metrics = get_llm_metrics()
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(metrics["retries"], 1)
+        self.assertEqual(metrics["errors"]["rate_limited"], 1)
+
+    def test_server_errors_exhaust_retries(self):
+        """Test that 5xx responses are retried MAX_RETRIES times"""
+        self.server.script = [500, 502, 503]
+
+        with self.assertRaises(openai.InternalServerError):
+            self.chat()
+
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(get_llm_metrics()["errors"]["server_error"], 3)
+
+    def test_client_error_is_not_retried(self):
+        """Test that a 400 response is raised at once"""
+        self.server.script = [400]
+
+        with self.assertRaises(openai.BadRequestError):
+            self.chat()
+
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(get_llm_client().breaker.state, CircuitBreaker.CLOSED)
+
+    def test_timeout_is_bounded(self):
+        """Test that a slow response times out instead of blocking"""
+        self.configure(TIMEOUT=0.1, MAX_RETRIES=0)
+        self.server.script = ["slow"]
+
+        with self.assertRaises(openai.APITimeoutError):
+            self.chat()
+
+        self.assertEqual(get_llm_metrics()["errors"]["timeout"], 1)
+
+    def test_circuit_opens_and_fails_fast(self):
+        """Test that repeated failures stop requests reaching the server"""
+        self.server.script = [500, 500, 500]
+
+        with self.assertRaises(openai.InternalServerError):
+            self.chat()
+        with self.assertRaises(CircuitOpenError):
+            self.chat()
+
+        metrics = get_llm_metrics()
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(metrics["circuit_opened"], 1)
+        self.assertEqual(metrics["circuit_rejected"], 1)
+
+    def test_circuit_closes_after_successful_trial(self):
+        """Test that a successful request after the reset timeout closes the circuit"""
+        self.configure(
+            CIRCUIT_RESET_TIMEOUT=0.1, MAX_RETRIES=0, CIRCUIT_FAILURE_THRESHOLD=1
+        )
+        self.server.script = [500]
+        with self.assertRaises(openai.InternalServerError):
+            self.chat()
+        self.assertEqual(get_llm_client().breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.15)
+
+        self.assertEqual(self.chat(), "ok")
+        self.assertEqual(get_llm_client().breaker.state, CircuitBreaker.CLOSED)
+
+    def open_circuit(self):
+        self.configure(
+            CIRCUIT_RESET_TIMEOUT=0.1, MAX_RETRIES=0, CIRCUIT_FAILURE_THRESHOLD=1
+        )
+        self.server.script = [500]
+        with self.assertRaises(openai.InternalServerError):
+            self.chat()
+        time.sleep(0.15)
+
+    def test_rate_limited_trial_reopens_the_circuit(self):
+        """Test that a 429 during the half-open trial opens the circuit until the next trial"""
+        self.open_circuit()
+        self.server.script = [429]
+
+        with self.assertRaises(openai.RateLimitError):
+            self.chat()
+        self.assertEqual(get_llm_client().breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.chat()
+
+        time.sleep(0.15)
+        self.assertEqual(self.chat(), "ok")
+        self.assertEqual(get_llm_client().breaker.state, CircuitBreaker.CLOSED)
+
+    def test_unexpected_error_ends_the_trial(self):
+        """Test that a trial failing outside the API errors lets the next request try"""
+        self.open_circuit()
+        llm = get_llm_client()
+
+        with mock.patch.object(
+            llm.client.chat.completions, "create", side_effect=RuntimeError("bug")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.chat()
+
+        self.assertEqual(llm.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.chat(), "ok")
+        self.assertEqual(llm.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_async_requests_are_retried(self):
+        """Test that the async client goes through the same retries"""
+        self.server.script = [503]
+        llm = get_llm_client()
+
+        async def chat():
+            async with llm.async_client() as client:
+                return await llm.achat(
+                    client,
+                    model="test-model",
+                    messages=[{"role": "user", "content": "Hi"}],
+                )
+
+        response = asyncio.run(chat())
+
+        self.assertEqual(response.choices[0].message.content, "ok")
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(get_llm_metrics()["retries"], 1)
+
+    def test_service_leaves_global_api_key_alone(self):
+        """Test that TranslationService no longer sets openai.api_key"""
+        original = openai.api_key
+        self.addCleanup(setattr, openai, "api_key", original)
+        openai.api_key = None
+
+        TranslationService()
+
+        self.assertIsNone(openai.api_key)
+
+    def test_llm_stats_require_staff(self):
+        """Test that the LLM stats page is limited to staff"""
+        self.chat()
+        stats_url = reverse("main:llm_stats")
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, 302)
+
+        User.objects.create_user(username="staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["requests"], 1)
+        self.assertEqual(response.json()["circuit"], "closed")
@@ -0,0 +1,100 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from ..models import CV
+from ..pdf.benchmark import create_benchmark_cv, find_regressions
+
+
+def make_result(case, median, peak_rss_kb):
+    return {
+        "case": case,
+        "wall_time": {"min": median, "median": median, "max": median},
+        "peak_rss_kb": peak_rss_kb,
+    }
+
+
+class PDFBenchmarkTestCase(TestCase):
+    """Test cases for the PDF rendering benchmark"""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+
+    def test_create_benchmark_cv(self):
+        """Test that benchmark CVs have the requested size"""
+        cv = create_benchmark_cv(projects=3, skills=5, text_size=1000)
+
+        self.assertEqual(len(cv.project_set.all()), 3)
+        self.assertEqual(len(cv.skills.all()), 5)
+        self.assertEqual(len(cv.bio), 1000)
+
+    def test_find_regressions(self):
+        """Test that only cases beyond the thresholds are reported"""
+        baseline = [
+            make_result("a", 1.0, 100000),
+            make_result("b", 1.0, 100000),
+            make_result("c", 1.0, 100000),
+        ]
+        results = [
+            make_result("a", 1.1, 105000),
+            make_result("b", 1.5, 100000),
+            make_result("c", 1.0, 120000),
+            make_result("new", 9.0, 900000),
+        ]
+
+        regressions = find_regressions(baseline, results, 20, 10)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("b: median wall time"))
+        self.assertTrue(regressions[1].startswith("c: peak RSS"))
+
+    def test_command_writes_results_and_checks_baseline(self):
+        """Test the benchmark command output and its threshold mode"""
+        output = os.path.join(self.location, "results.json")
+        options = [
+            "--output",
+            output,
+            "--engines",
+            "reportlab",
+            "--projects",
+            "0",
+            "2",
+            "--skills",
+            "3",
+            "--text-size",
+            "500",
+            "--repeat",
+            "1",
+        ]
+
+        call_command("benchmark_pdf", *options, stdout=io.StringIO())
+
+        with open(output) as results_file:
+            results = json.load(results_file)["results"]
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(result["size_bytes"] > 0 for result in results))
+        self.assertTrue(all(result["peak_rss_kb"] > 0 for result in results))
+        # Generated CVs are rolled back
+        self.assertFalse(CV.objects.exists())
+
+        # A baseline that was ten times faster fails the run
+        for result in results:
+            result["wall_time"]["median"] /= 10
+        baseline = os.path.join(self.location, "baseline.json")
+        with open(baseline, "w") as baseline_file:
+            json.dump({"results": results}, baseline_file)
+
+        with self.assertRaisesMessage(CommandError, "regressed"):
+            call_command(
+                "benchmark_pdf",
+                *options,
+                "--baseline",
+                baseline,
+                stdout=io.StringIO(),
+            )
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from ..models import CV, Skill, Project
+from ..pdf.cache import FileSystemPdfStorage, get_pdf_cache
+from ..pdf.renderers import WeasyPrintRenderer
+from .utils import PdfCacheTestMixin
+
+
+class FileSystemPdfStorageTestCase(TestCase):
+    """Test cases for the filesystem PDF storage"""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+
+    def test_get_missing_key_returns_none(self):
+        """Test that an unknown key is a cache miss"""
+        storage = FileSystemPdfStorage(self.location)
+        self.assertIsNone(storage.get("ab" * 32))
+
+    def test_set_and_get_roundtrip(self):
+        """Test that stored content is returned unchanged"""
+        storage = FileSystemPdfStorage(self.location)
+        stored = storage.set("ab" * 32, b"%PDF-1.7 test")
+
+        cached = storage.get("ab" * 32)
+        self.assertEqual(cached.content, b"%PDF-1.7 test")
+        self.assertEqual(cached.rendered_at, stored.rendered_at)
+
+    def test_eviction_drops_least_recently_used(self):
+        """Test that the least recently read entry is evicted first"""
+        storage = FileSystemPdfStorage(self.location, max_size=250)
+        storage.set("aa" * 32, b"a" * 100)
+        storage.set("bb" * 32, b"b" * 100)
+
+        # Make "aa" look recently used and "bb" stale
+        past = time.time() - 3600
+        os.utime(storage._path("bb" * 32), (past, past))
+        storage.get("aa" * 32)
+
+        storage.set("cc" * 32, b"c" * 100)
+
+        self.assertIsNotNone(storage.get("aa" * 32))
+        self.assertIsNone(storage.get("bb" * 32))
+        self.assertIsNotNone(storage.get("cc" * 32))
+
+
+class CVPDFCacheTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for cached and conditional CV PDF downloads"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.cv.skills.add(Skill.objects.create(name="Python"))
+        self.project = Project.objects.create(
+            cv=self.cv,
+            title="Test Project",
+            description="A test project",
+            technologies="Python, Django",
+            start_date=date(2023, 1, 1),
+        )
+
+        self.url = reverse("main:cv_pdf_download", kwargs={"pk": self.cv.pk})
+
+    def _get_cached_cv(self):
+        return CV.objects.prefetch_related("skills", "project_set").get(pk=self.cv.pk)
+
+    def test_repeat_download_is_served_from_cache(self):
+        """Test that a second download does not render again"""
+        with mock.patch.object(
+            WeasyPrintRenderer, "render", return_value=b"%PDF-1.7 cached"
+        ) as render:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first.content, second.content)
+
+    def test_download_sets_validators(self):
+        """Test that ETag and Last-Modified headers are sent"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_matching_etag_returns_not_modified(self):
+        """Test that If-None-Match with the current ETag answers 304"""
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_unmodified_since_returns_not_modified(self):
+        """Test that If-Modified-Since with Last-Modified answers 304"""
+        last_modified = self.client.get(self.url)["Last-Modified"]
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_key_changes_with_cv_content(self):
+        """Test that editing the CV produces a new cache key"""
+        pdf_cache = get_pdf_cache()
+        renderer = WeasyPrintRenderer()
+        key = pdf_cache.key_for(self._get_cached_cv(), renderer)
+
+        self.cv.title = "Senior Python Developer"
+        self.cv.save()
+
+        self.assertNotEqual(key, pdf_cache.key_for(self._get_cached_cv(), renderer))
+
+    def test_key_changes_with_projects_and_skills(self):
+        """Test that project and skill edits produce a new cache key"""
+        pdf_cache = get_pdf_cache()
+        renderer = WeasyPrintRenderer()
+        key = pdf_cache.key_for(self._get_cached_cv(), renderer)
+
+        self.project.description = "An updated description"
+        self.project.save()
+        project_key = pdf_cache.key_for(self._get_cached_cv(), renderer)
+        self.assertNotEqual(key, project_key)
+
+        self.cv.skills.add(Skill.objects.create(name="Django"))
+        skill_key = pdf_cache.key_for(self._get_cached_cv(), renderer)
+        self.assertNotEqual(project_key, skill_key)
+
+    def test_stale_etag_returns_new_pdf(self):
+        """Test that an outdated ETag gets a full response"""
+        etag = self.client.get(self.url)["ETag"]
+
+        self.cv.bio = "Updated bio"
+        self.cv.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
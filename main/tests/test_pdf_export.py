@@ -0,0 +1,205 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from ..models import CV, Skill
+from ..pdf.export import (
+    ExportError,
+    export_archive_path,
+    export_parts_dir,
+    remove_expired_exports,
+    select_cv_ids,
+    write_cv_archive,
+)
+from ..pdf.renderers import WeasyPrintRenderer
+from ..tasks import build_cv_archive_task, render_cv_pdfs_task
+from .utils import PdfCacheTestMixin
+
+
+class CVExportTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for bulk CV PDF exports"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        settings_override = override_settings(
+            PDF_EXPORT_DIR=os.path.join(self.location, "exports")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        render_patch = mock.patch.object(
+            WeasyPrintRenderer, "render", return_value=b"%PDF-1.7 export"
+        )
+        self.render = render_patch.start()
+        self.addCleanup(render_patch.stop)
+
+        python = Skill.objects.create(name="Python")
+        self.cv1 = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            location="New York, NY",
+        )
+        self.cv1.skills.add(python)
+        self.cv2 = CV.objects.create(
+            first_name="Jane",
+            last_name="Smith",
+            email="jane.smith@example.com",
+            title="Frontend Developer",
+            bio="Creative frontend developer",
+            location="San Francisco, CA",
+        )
+
+    def test_select_by_ids_and_filters(self):
+        """Test that id lists and filters narrow the selection"""
+        self.assertEqual(select_cv_ids(ids=[self.cv2.pk]), [self.cv2.pk])
+        self.assertEqual(select_cv_ids(filters={"skill": "python"}), [self.cv1.pk])
+        self.assertEqual(
+            select_cv_ids(ids=[self.cv1.pk, self.cv2.pk], filters={"title": "front"}),
+            [self.cv2.pk],
+        )
+
+    def test_select_rejects_unknown_filter(self):
+        """Test that arbitrary queryset lookups are not accepted"""
+        with self.assertRaises(ExportError):
+            select_cv_ids(filters={"email__startswith": "john"})
+
+    def test_archive_contains_one_pdf_per_cv(self):
+        """Test that every selected CV ends up in the archive"""
+        buffer = io.BytesIO()
+        progress = []
+
+        failed = write_cv_archive(
+            [self.cv1.pk, self.cv2.pk],
+            buffer,
+            concurrency=2,
+            on_progress=lambda done, total: progress.append((done, total)),
+        )
+
+        self.assertEqual(failed, [])
+        self.assertEqual(progress[-1], (2, 2))
+        with zipfile.ZipFile(buffer) as archive:
+            names = sorted(archive.namelist())
+            self.assertEqual(len(names), 2)
+            self.assertEqual(archive.read(names[0]), b"%PDF-1.7 export")
+
+    def test_archive_reports_missing_cvs(self):
+        """Test that CVs deleted before export are reported as failed"""
+        failed = write_cv_archive([self.cv1.pk, 99999], io.BytesIO())
+        self.assertEqual(failed, [99999])
+
+    def test_chord_archives_its_own_renders(self):
+        """Test that the archive is built from the export's files, not the cache"""
+        export_id = str(uuid.uuid4())
+        chunk = render_cv_pdfs_task([self.cv1.pk, self.cv2.pk], export_id)
+        # Evict everything from the PDF cache; renders would now fail
+        shutil.rmtree(self.pdf_cache_location)
+        self.render.side_effect = AssertionError("rendered again")
+
+        with mock.patch.object(build_cv_archive_task, "update_state"):
+            result = build_cv_archive_task.apply(
+                ([chunk], [self.cv1.pk, self.cv2.pk, 99999]), task_id=export_id
+            ).get()
+
+        self.assertEqual(result["failed"], [99999])
+        with zipfile.ZipFile(export_archive_path(export_id)) as archive:
+            self.assertEqual(len(archive.namelist()), 2)
+            self.assertEqual(archive.read(archive.namelist()[0]), b"%PDF-1.7 export")
+        self.assertFalse(os.path.exists(export_parts_dir(export_id)))
+
+    def test_export_view_starts_export(self):
+        """Test that the export endpoint returns a pollable task id"""
+        with mock.patch(
+            "main.views.start_cv_export", return_value="export-id"
+        ) as start:
+            response = self.client.post(
+                reverse("main:export_cv_pdfs"),
+                json.dumps({"filters": {"location": "new york"}}),
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["task_id"], "export-id")
+        start.assert_called_once_with([self.cv1.pk])
+
+    def test_export_view_rejects_empty_selection(self):
+        """Test that an export without matching CVs is rejected"""
+        response = self.client.post(
+            reverse("main:export_cv_pdfs"),
+            json.dumps({"ids": [99999]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_download_streams_archive(self):
+        """Test that a finished archive is streamed as a ZIP attachment"""
+        export_id = str(uuid.uuid4())
+        os.makedirs(os.path.join(self.location, "exports"))
+        archive_path = os.path.join(self.location, "exports", f"{export_id}.zip")
+        with open(archive_path, "wb") as archive_file:
+            write_cv_archive([self.cv1.pk], archive_file)
+
+        url = reverse("main:export_cv_pdfs_download", args=[export_id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as zf:
+            self.assertEqual(len(zf.namelist()), 1)
+
+    def test_download_unknown_export_returns_404(self):
+        """Test that unknown or malformed export ids are not found"""
+        for export_id in [str(uuid.uuid4()), "..%2Fsettings"]:
+            url = reverse("main:export_cv_pdfs_download", args=[export_id])
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_expired_archives_are_removed(self):
+        """Test that archives older than the retention period are deleted"""
+        exports = os.path.join(self.location, "exports")
+        os.makedirs(exports)
+        old_path = os.path.join(exports, f"{uuid.uuid4()}.zip")
+        new_path = os.path.join(exports, f"{uuid.uuid4()}.zip")
+        for path in [old_path, new_path]:
+            with open(path, "wb") as archive_file:
+                archive_file.write(b"PK")
+        # Parts of an export whose archive was never built
+        old_parts = export_parts_dir(uuid.uuid4())
+        os.makedirs(old_parts)
+        old_time = time.time() - 2 * 60 * 60
+        for path in [old_path, old_parts]:
+            os.utime(path, (old_time, old_time))
+
+        removed = remove_expired_exports(max_age=60 * 60)
+
+        self.assertEqual(removed, 2)
+        self.assertFalse(os.path.exists(old_path))
+        self.assertFalse(os.path.exists(old_parts))
+        self.assertTrue(os.path.exists(new_path))
+
+    def test_management_command_writes_archive(self):
+        """Test that the management command exports the selection"""
+        output = os.path.join(self.location, "cvs.zip")
+
+        call_command(
+            "export_cv_pdfs", output, "--skill", "Python", stdout=io.StringIO()
+        )
+
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(len(archive.namelist()), 1)
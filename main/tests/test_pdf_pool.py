@@ -0,0 +1,170 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.template.loader import get_template
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from config.celery import render_pdfs_inline
+from ..models import CV
+from ..pdf import styles
+from ..pdf.pool import RenderPool, RenderPoolSaturated, RenderTimeout
+from .pdf_workers import hanging_render
+from .utils import PdfCacheTestMixin
+
+
+class RenderPoolTestCase(TestCase):
+    """Test cases for the WeasyPrint render pool"""
+
+    def test_inline_pool_renders_in_process(self):
+        """Test that a pool without workers renders in the calling process"""
+        pool = RenderPool(workers=0)
+
+        with mock.patch(
+            "main.pdf.pool.render_pdf", return_value=b"%PDF-1.7 inline"
+        ) as render_pdf:
+            content = pool.render("<p>Hello</p>")
+
+        render_pdf.assert_called_once_with("<p>Hello</p>", ())
+        self.assertEqual(content, b"%PDF-1.7 inline")
+
+    @override_settings(
+        PDF_RENDER_POOL={"WORKERS": 2, "QUEUE_SIZE": 1, "TIMEOUT": 30, "RETRY_AFTER": 5}
+    )
+    def test_celery_workers_render_inline(self):
+        """Test that starting a Celery worker switches off the render pool"""
+        render_pdfs_inline()
+
+        self.assertEqual(settings.PDF_RENDER_POOL["WORKERS"], 0)
+        self.assertEqual(settings.PDF_RENDER_POOL["QUEUE_SIZE"], 1)
+
+    def test_saturated_pool_fails_fast(self):
+        """Test that a render is rejected when no slot is free"""
+        pool = RenderPool(workers=1, queue_size=0)
+        pool._slots.acquire()
+
+        with self.assertRaises(RenderPoolSaturated):
+            pool.render("<p>Hello</p>")
+
+    def test_worker_process_renders_pdf_bytes(self):
+        """Test that a render process returns the PDF bytes in memory"""
+        pool = RenderPool(workers=1, timeout=60)
+        self.addCleanup(pool._reset_executor)
+
+        content = pool.render("<h1>John Doe</h1>")
+
+        self.assertTrue(content.startswith(b"%PDF"))
+
+    def test_timed_out_render_frees_its_slot(self):
+        """Test that a hanging render is killed and the pool keeps serving"""
+        pool = RenderPool(workers=1, timeout=5)
+        self.addCleanup(pool._reset_executor)
+        pool.start()
+
+        with mock.patch("main.pdf.pool._render_in_worker", hanging_render):
+            pool.timeout = 1
+            with self.assertRaises(RenderTimeout):
+                pool.render("hang")
+
+            pool.timeout = 60
+            content = pool.render("<h1>John Doe</h1>")
+
+        self.assertTrue(content.startswith(b"%PDF"))
+
+    def test_worker_process_parses_stylesheet_once(self):
+        """Test that repeat renders reuse the parsed stylesheet and fonts"""
+        pool = RenderPool(workers=1, timeout=60)
+        self.addCleanup(pool._reset_executor)
+        stylesheet = get_template("main/pdf/cv.css").origin.name
+
+        pool.render("<h1>John Doe</h1>", [stylesheet])
+        pool.render("<h1>Jane Smith</h1>", [stylesheet])
+
+        (info,) = pool.stats().values()
+        self.assertEqual(info["stylesheet_misses"], 1)
+        self.assertEqual(info["stylesheet_hits"], 1)
+        self.assertEqual(info["font_config_misses"], 1)
+
+
+class StylesheetCacheTestCase(TestCase):
+    """Test cases for the per-process stylesheet cache"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".css")
+        with os.fdopen(fd, "w") as css_file:
+            css_file.write("body { color: #333; }")
+        self.addCleanup(os.unlink, self.path)
+
+    def test_stylesheet_is_parsed_once(self):
+        """Test that a second lookup is a cache hit"""
+        font_config = styles.get_font_config()
+        before = styles.cache_info()
+
+        first = styles.get_stylesheet(self.path, font_config)
+        second = styles.get_stylesheet(self.path, font_config)
+
+        after = styles.cache_info()
+        self.assertIs(first, second)
+        self.assertEqual(after["stylesheet_misses"] - before["stylesheet_misses"], 1)
+        self.assertEqual(after["stylesheet_hits"] - before["stylesheet_hits"], 1)
+
+    def test_changed_file_is_parsed_again(self):
+        """Test that editing the stylesheet invalidates the cached CSS"""
+        font_config = styles.get_font_config()
+        first = styles.get_stylesheet(self.path, font_config)
+
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertIsNot(first, styles.get_stylesheet(self.path, font_config))
+
+
+class CVPDFBackpressureTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for PDF downloads when the render pool is busy"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.url = reverse("main:cv_pdf_download", kwargs={"pk": self.cv.pk})
+
+    def test_saturated_pool_returns_503(self):
+        """Test that a saturated pool answers 503 with Retry-After"""
+        with mock.patch("main.pdf.renderers.get_render_pool") as get_render_pool:
+            get_render_pool.return_value.render.side_effect = RenderPoolSaturated()
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    def test_render_stats_require_staff(self):
+        """Test that the render stats page is limited to staff"""
+        stats_url = reverse("main:pdf_render_stats")
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, 302)
+
+        User.objects.create_user(username="staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("processes", response.json())
+
+    def test_render_timeout_returns_503(self):
+        """Test that a timed out render answers 503 with Retry-After"""
+        with mock.patch("main.pdf.renderers.get_render_pool") as get_render_pool:
+            get_render_pool.return_value.render.side_effect = RenderTimeout()
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
@@ -0,0 +1,95 @@
+import io
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from ..models import CV, Skill, Project
+from ..pdf.renderers import (
+    ReportLabRenderer,
+    WeasyPrintRenderer,
+    get_renderer,
+    render_cv_pdf,
+)
+from ..tasks import send_cv_pdf_email
+from .utils import PdfCacheTestMixin
+
+from PyPDF2 import PdfReader
+
+
+class PdfRendererTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for the PDF renderer backends"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.cv.skills.add(Skill.objects.create(name="Python"))
+        Project.objects.create(
+            cv=self.cv,
+            title="Test Project",
+            description="A test project",
+            technologies="Python, Django",
+        )
+
+    def _get_cv(self):
+        return CV.objects.prefetch_related("skills", "project_set").get(pk=self.cv.pk)
+
+    def test_reportlab_renderer_produces_valid_pdf(self):
+        """Test that the ReportLab backend renders a readable PDF"""
+        content = ReportLabRenderer().render(self._get_cv())
+
+        pdf_reader = PdfReader(io.BytesIO(content))
+        self.assertTrue(len(pdf_reader.pages) > 0)
+        self.assertIn("Test Project", pdf_reader.pages[0].extract_text())
+
+    @override_settings(
+        PDF_RENDERERS={
+            "email": {
+                "BACKEND": "main.pdf.renderers.ReportLabRenderer",
+            }
+        }
+    )
+    def test_get_renderer_uses_configured_backend(self):
+        """Test that the backend is selected per call site by setting"""
+        self.assertIsInstance(get_renderer("email"), ReportLabRenderer)
+
+    def test_backends_do_not_share_cache_entries(self):
+        """Test that each backend gets its own cached output"""
+        with mock.patch.object(
+            WeasyPrintRenderer, "render", return_value=b"%PDF-1.7 weasyprint"
+        ):
+            weasyprint_pdf = render_cv_pdf(self._get_cv(), "download")
+
+        with override_settings(
+            PDF_RENDERERS={
+                "email": {"BACKEND": "main.pdf.renderers.ReportLabRenderer"},
+            }
+        ):
+            reportlab_pdf = render_cv_pdf(self._get_cv(), "email")
+
+        self.assertNotEqual(weasyprint_pdf.key, reportlab_pdf.key)
+        self.assertNotEqual(weasyprint_pdf.content, reportlab_pdf.content)
+
+    def test_email_and_download_share_cached_pdf(self):
+        """Test that the email task reuses the PDF rendered for download"""
+        url = reverse("main:cv_pdf_download", kwargs={"pk": self.cv.pk})
+
+        with mock.patch.object(
+            WeasyPrintRenderer, "render", return_value=b"%PDF-1.7 shared"
+        ) as render:
+            response = Client().get(url)
+            send_cv_pdf_email(self.cv.pk, "recruiter@example.com")
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        attachment = mail.outbox[0].attachments[0]
+        self.assertEqual(attachment[1], response.content)
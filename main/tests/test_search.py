@@ -0,0 +1,200 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import CV, Project, Skill
+from ..pdf.cache import PdfCache
+from ..search import SearchError, search_cvs
+from ..tasks import reindex_cvs_task
+
+
+# Pre-rendering is not under test and needs a broker
+@override_settings(
+    PDF_PRERENDER={"ENABLED": False, "DEBOUNCE": 10, "PURPOSES": ["download"]}
+)
+class CVSearchTestCase(TestCase):
+    """Test cases for the full-text CV search and its index"""
+
+    def setUp(self):
+        self.django = Skill.objects.create(name="Django")
+        self.backend = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Backend Developer",
+            bio="Builds web services",
+            experience="Senior engineer at TechCorp",
+            education="Computer Science Degree",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.backend.skills.add(self.django)
+        self.designer = CV.objects.create(
+            first_name="Jane",
+            last_name="Smith",
+            email="jane.smith@example.com",
+            title="UX Designer",
+            bio="Designs interfaces for developers",
+            experience="Design lead",
+            education="Master's in Design",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(
+                cv=self.designer,
+                title="Design system",
+                description="Component library",
+                technologies="Figma, Storybook",
+            )
+
+    def search(self, query):
+        return [cv.pk for cv in search_cvs(CV.objects.all(), query)]
+
+    def test_searches_every_section(self):
+        """Test that skills, projects and text fields are all searchable"""
+        self.assertEqual(self.search("django"), [self.backend.pk])
+        self.assertEqual(self.search("storybook"), [self.designer.pk])
+        self.assertEqual(self.search("techcorp engineer"), [self.backend.pk])
+        self.assertEqual(self.search("django storybook"), [])
+
+    def test_better_matches_rank_first(self):
+        """Test that a title match ranks above a match in the bio, with stemming"""
+        self.assertEqual(self.search("developers"), [self.backend.pk, self.designer.pk])
+
+    def test_index_follows_writes(self):
+        """Test that edits to CVs, skills and projects update the index"""
+        self.backend.bio = "Maintains Kubernetes clusters"
+        self.backend.save()
+        self.assertEqual(self.search("kubernetes"), [self.backend.pk])
+
+        # Skill changes are reindexed by a task; run it in place
+        with mock.patch.object(reindex_cvs_task, "delay", reindex_cvs_task):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.django.name = "Flask"
+                self.django.save()
+        self.assertEqual(self.search("flask"), [self.backend.pk])
+        self.assertEqual(self.search("django"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(cv=self.designer).delete()
+        self.assertEqual(self.search("storybook"), [])
+
+        self.backend.delete()
+        self.assertEqual(self.search("kubernetes"), [])
+
+    @override_settings(SEARCH_REINDEX_BATCH_SIZE=1)
+    def test_skill_changes_are_reindexed_in_batches(self):
+        """Test that a renamed or deleted skill queues bounded reindex tasks"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.designer.skills.add(self.django)
+
+        with mock.patch.object(reindex_cvs_task, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.django.name = "Flask"
+                self.django.save()
+                # Nothing is queued or reindexed inside the request's transaction
+                delay.assert_not_called()
+            self.assertCountEqual(
+                self.search("django"), [self.backend.pk, self.designer.pk]
+            )
+            self.assertCountEqual(
+                [call.args[0] for call in delay.call_args_list],
+                [[self.backend.pk], [self.designer.pk]],
+            )
+
+            delay.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.django.delete()
+            self.assertCountEqual(
+                [call.args[0] for call in delay.call_args_list],
+                [[self.backend.pk], [self.designer.pk]],
+            )
+
+        reindex_cvs_task([self.backend.pk, self.designer.pk])
+        self.assertEqual(self.search("django"), [])
+
+    def test_search_syntax_is_not_interpreted(self):
+        """Test that quotes and operators in a query are searched as words"""
+        self.assertEqual(self.search('django" OR (design*'), [])
+        with self.assertRaises(SearchError):
+            self.search('" ( * -')
+
+    def test_fallback_searches_the_same_sections(self):
+        """Test that backends without an index match the same CVs"""
+        queries = ["django", "storybook", "system", "techcorp engineer", "design"]
+        indexed = [set(self.search(query)) for query in queries]
+
+        with mock.patch("main.search.connection") as fallback:
+            fallback.vendor = "mysql"
+            scanned = [set(self.search(query)) for query in queries]
+
+        self.assertEqual(scanned, indexed)
+
+    def test_pdf_cache_key_ignores_the_search_vector(self):
+        """Test that the PDF cache key does not depend on the search index"""
+        renderer = mock.Mock(fingerprint=mock.Mock(return_value="layout"))
+        renderer.name = "html"
+        cache = PdfCache(storage=None)
+        full = CV.objects.get(pk=self.backend.pk)
+        full.search_vector = "'django':1A"
+        deferred = CV.objects.defer("search_vector").get(pk=self.backend.pk)
+
+        with self.assertNumQueries(2):
+            deferred_key = cache.key_for(deferred, renderer)
+        self.assertEqual(cache.key_for(full, renderer), deferred_key)
+
+    def test_search_page(self):
+        """Test that the search page lists matches and keeps the query in links"""
+        response = self.client.get(reverse("main:cv_search"), {"q": "design"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cvs"]), [self.designer])
+        self.assertContains(response, 'value="design"')
+
+        response = self.client.get(reverse("main:cv_search"), {"q": "  "})
+        self.assertRedirects(response, reverse("main:cv_list"))
+
+
+@skipUnless(connection.vendor == "postgresql", "PostgreSQL full-text search")
+@override_settings(
+    PDF_PRERENDER={"ENABLED": False, "DEBOUNCE": 10, "PURPOSES": ["download"]}
+)
+class PostgreSQLSearchTestCase(TestCase):
+    """Test cases for the tsvector index on PostgreSQL"""
+
+    def setUp(self):
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Backend Developer",
+            bio="Builds web services",
+            experience="Senior engineer at TechCorp",
+            education="Computer Science Degree",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.skills.add(Skill.objects.create(name="Django"))
+
+    def test_vector_is_stored_with_weights(self):
+        """Test that writes store a weighted vector on the CV row"""
+        vector = CV.objects.values_list("search_vector", flat=True).get(pk=self.cv.pk)
+
+        self.assertIn("'django':", vector)
+        self.assertIn("'develop':", vector)
+        self.assertIn("A", vector)
+
+    def test_vector_is_gin_indexed(self):
+        """Test that the search vector column has its GIN index"""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, "main_cv")
+
+        index = constraints["cv_search_vector_idx"]
+        self.assertEqual(index["columns"], ["search_vector"])
+        self.assertEqual(index["type"], "gin")
+
+    def test_ranked_search_uses_stemming(self):
+        """Test that queries match stemmed words and carry a rank"""
+        (result,) = search_cvs(CV.objects.all(), "developers services")
+
+        self.assertEqual(result.pk, self.cv.pk)
+        self.assertGreater(result.rank, 0)
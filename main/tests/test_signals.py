@@ -0,0 +1,172 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from ..models import CV, Skill, Project
+from ..pdf.cache import get_pdf_cache
+from ..pdf.renderers import WeasyPrintRenderer, get_renderer
+from ..tasks import prerender_cv_pdf_task
+from .utils import PdfCacheTestMixin
+
+
+class PDFPrerenderSignalTestCase(TestCase):
+    """Test cases for pre-rendering PDFs when CVs change"""
+
+    def setUp(self):
+        cache.clear()
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.skill = Skill.objects.create(name="Python")
+
+        apply_async_patch = mock.patch.object(prerender_cv_pdf_task, "apply_async")
+        self.apply_async = apply_async_patch.start()
+        self.addCleanup(apply_async_patch.stop)
+
+    def test_cv_save_schedules_prerender(self):
+        """Test that saving a CV queues a render after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.title = "Senior Python Developer"
+            self.cv.save()
+
+        self.apply_async.assert_called_once()
+        self.assertEqual(self.apply_async.call_args.args[0], (self.cv.pk,))
+
+    def test_burst_of_edits_is_debounced(self):
+        """Test that many edits to one CV queue a single render"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.save()
+            for index in range(5):
+                Project.objects.create(
+                    cv=self.cv,
+                    title=f"Project {index}",
+                    description="A test project",
+                    technologies="Python",
+                )
+            self.cv.skills.add(self.skill)
+
+        self.assertEqual(self.apply_async.call_count, 1)
+
+    def test_debounce_lock_outlives_the_countdown(self):
+        """Test that a render waiting in the queue still holds its lock"""
+        with mock.patch("main.signals.cache.add", wraps=cache.add) as add:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.cv.save()
+
+        countdown = self.apply_async.call_args.kwargs["countdown"]
+        self.assertGreater(add.call_args.kwargs["timeout"], countdown)
+
+    def test_reverse_skill_changes_schedule_each_cv(self):
+        """Test that skill.cv_skills changes schedule the affected CVs"""
+        other_cv = CV.objects.create(
+            first_name="Jane",
+            last_name="Smith",
+            email="jane.smith@example.com",
+            title="Frontend Developer",
+            bio="Creative frontend developer",
+        )
+        cache.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.skill.cv_skills.add(self.cv, other_cv)
+
+        scheduled = {call.args[0][0] for call in self.apply_async.call_args_list}
+        self.assertEqual(scheduled, {self.cv.pk, other_cv.pk})
+
+    def test_related_changes_are_applied_once_per_transaction(self):
+        """Test that project and skill edits touch and reindex a CV once"""
+        with (
+            mock.patch("main.signals.touch_cvs") as touch_cvs,
+            mock.patch("main.signals.reindex_cvs") as reindex_cvs,
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                for index in range(3):
+                    Project.objects.create(
+                        cv=self.cv,
+                        title=f"Project {index}",
+                        description="A test project",
+                        technologies="Python",
+                    )
+                self.cv.skills.add(self.skill)
+                touch_cvs.assert_not_called()
+
+        touch_cvs.assert_called_once_with([self.cv.pk])
+        reindex_cvs.assert_called_once_with([self.cv.pk])
+
+    def test_deleting_a_cv_skips_its_projects(self):
+        """Test that projects deleted with their CV queue no updates"""
+        for index in range(3):
+            Project.objects.create(
+                cv=self.cv,
+                title=f"Project {index}",
+                description="A test project",
+                technologies="Python",
+            )
+
+        with mock.patch("main.signals.related_changed") as related_changed:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.cv.delete()
+
+        related_changed.assert_not_called()
+        self.apply_async.assert_not_called()
+
+    def test_nothing_is_scheduled_before_commit(self):
+        """Test that renders are not queued for uncommitted changes"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.cv.save()
+
+        self.apply_async.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+
+    @override_settings(
+        PDF_PRERENDER={"ENABLED": False, "DEBOUNCE": 10, "PURPOSES": ["download"]}
+    )
+    def test_disabled_prerender_schedules_nothing(self):
+        """Test that pre-rendering can be switched off"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.save()
+
+        self.apply_async.assert_not_called()
+
+
+class PDFPrerenderTaskTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for the PDF pre-render task"""
+
+    def setUp(self):
+        super().setUp()
+
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+
+    def test_task_warms_pdf_cache(self):
+        """Test that a pre-rendered PDF is a cache hit for downloads"""
+        with mock.patch.object(
+            WeasyPrintRenderer, "render", return_value=b"%PDF-1.7 warm"
+        ) as render:
+            prerender_cv_pdf_task(self.cv.pk)
+
+        # Download and email share the WeasyPrint backend, so one render
+        self.assertEqual(render.call_count, 1)
+
+        cv = CV.objects.prefetch_related("skills", "project_set").get(pk=self.cv.pk)
+        pdf_cache = get_pdf_cache()
+        key = pdf_cache.key_for(cv, get_renderer("download"))
+        self.assertEqual(pdf_cache.storage.get(key).content, b"%PDF-1.7 warm")
+
+    def test_task_ignores_deleted_cv(self):
+        """Test that a CV deleted before the render is skipped"""
+        result = prerender_cv_pdf_task(99999)
+        self.assertIn("not found", result)
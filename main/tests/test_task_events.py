@@ -0,0 +1,101 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+
+def parse_events(response):
+    """Split a text/event-stream body into (event, data) pairs"""
+    events = []
+    body = b"".join(response.streaming_content).decode()
+    for block in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1)
+            for line in block.splitlines()
+            if not line.startswith(":")
+        )
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@override_settings(TASK_EVENTS_POLL_INTERVAL=0, TASK_EVENTS_TIMEOUT=5)
+class TaskEventsTestCase(TestCase):
+    """Test cases for the Server-Sent Events task progress stream"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        result_patch = mock.patch("celery.result.AsyncResult")
+        self.result = result_patch.start().return_value
+        self.addCleanup(result_patch.stop)
+
+    def stream(self, states):
+        """Serve the given (state, info) pairs, one per check"""
+        type(self.result).state = mock.PropertyMock(side_effect=[s for s, _ in states])
+        type(self.result).info = mock.PropertyMock(side_effect=[i for _, i in states])
+        return self.client.get(reverse("main:task_events", args=["task-id"]))
+
+    def test_stream_pushes_changes_until_completion(self):
+        """Test that state changes and partial results are pushed once each"""
+        partial = {"translated_content": {"title": "Diorroer Python"}}
+        response = self.stream(
+            [
+                ("PENDING", None),
+                ("PENDING", None),
+                ("PROGRESS", partial),
+                ("PROGRESS", partial),
+                ("SUCCESS", {"success": True}),
+            ]
+        )
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(
+            parse_events(response),
+            [
+                ("status", {"status": "pending", "state": "PENDING"}),
+                ("status", {"status": "running", "state": "PROGRESS"}),
+                ("progress", partial),
+                ("complete", {"status": "completed", "result": {"success": True}}),
+            ],
+        )
+
+    def test_stream_reports_failure(self):
+        """Test that failed tasks end the stream with the error"""
+        type(self.result).state = mock.PropertyMock(return_value="FAILURE")
+        type(self.result).info = mock.PropertyMock(return_value=ValueError("boom"))
+        response = self.client.get(reverse("main:task_events", args=["task-id"]))
+
+        self.assertEqual(
+            parse_events(response), [("failed", {"status": "failed", "error": "boom"})]
+        )
+
+    @override_settings(TASK_EVENTS_TIMEOUT=0)
+    def test_stream_closes_after_timeout(self):
+        """Test that long-running tasks close the stream for a reconnect"""
+        response = self.stream([("PENDING", None)])
+
+        self.assertEqual(parse_events(response)[-1], ("timeout", {"status": "pending"}))
+
+    @override_settings(TASK_EVENTS_MAX_STREAMS=1)
+    def test_streams_past_the_cap_are_sent_away(self):
+        """Test that streams past the cap free their thread and reconnect later"""
+        url = reverse("main:task_events", args=["task-id"])
+        type(self.result).state = mock.PropertyMock(return_value="PENDING")
+        type(self.result).info = mock.PropertyMock(return_value=None)
+        first = self.client.get(url)
+        first_content = iter(first.streaming_content)
+        next(first_content)
+
+        busy = b"".join(self.client.get(url).streaming_content).decode()
+        self.assertTrue(busy.startswith("retry: 10000\n\n"))
+        self.assertEqual(parse_events(self.client.get(url)), [])
+
+        # Closing the open stream frees its slot
+        first.close()
+        self.assertEqual(
+            parse_events(self.stream([("SUCCESS", "done")])),
+            [("complete", {"status": "completed", "result": "done"})],
+        )
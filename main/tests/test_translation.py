@@ -0,0 +1,821 @@
+import asyncio
+import json
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from ..models import CV, CVTranslation, Skill, SkillTranslation, TranslationMemory
+from ..pdf.renderers import WeasyPrintRenderer
+from ..llm import (
+    TokenBucket,
+    estimate_tokens,
+    get_llm_client,
+    reset_llm_client,
+    split_text,
+)
+from ..services import InvalidReply, TranslationService
+from ..tasks import translate_cv_content_task
+from .utils import OpenAIHandler, PdfCacheTestMixin, StubOpenAIServerMixin
+
+
+def completion(content):
+    """Build a minimal chat completion response"""
+    message = mock.Mock(content=content)
+    return mock.Mock(choices=[mock.Mock(message=message)], usage=None)
+
+
+def mock_openai(test):
+    """Patch the OpenAI client for one test and return its create() mock"""
+    client_patch = mock.patch("main.llm.openai.OpenAI")
+    openai_class = client_patch.start()
+    test.addCleanup(client_patch.stop)
+    # The pooled client is built on first use, so it is built from the mock
+    reset_llm_client()
+    test.addCleanup(reset_llm_client)
+    return openai_class.return_value.chat.completions.create
+
+
+def translated_reply(translations):
+    """Build a create() side effect answering only the keys a prompt asks for"""
+
+    def create(**kwargs):
+        # Prompts end with their JSON payload
+        payload = json.loads(kwargs["messages"][1]["content"].rsplit("\n", 1)[1])
+        return completion(json.dumps({key: translations[key] for key in payload}))
+
+    return create
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MODEL="test-model")
+class TranslationMemoryTestCase(TestCase):
+    """Test cases for reusing remembered field translations"""
+
+    def setUp(self):
+        cache.clear()
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.cv.skills.add(Skill.objects.create(name="Python"))
+
+        self.create = mock_openai(self)
+        self.create.side_effect = translated_reply(
+            {
+                "title": "Diorroer Python",
+                "bio": "Diorroer Python skiantek",
+                "experience": "Diorroer uhel e TechCorp",
+                "education": "Diplom stlenneg",
+            }
+        )
+
+        # Skills are resolved from the shared dictionary
+        SkillTranslation.objects.create(
+            skill=self.cv.skills.get(), language="breton", name="Python"
+        )
+
+    def translate(self):
+        return TranslationService().translate_cv_content(self.cv, "breton")
+
+    def test_repeat_translation_uses_memory(self):
+        """Test that an unchanged CV is translated without calling the API"""
+        first = self.translate()
+        second = self.translate()
+
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(first["translated_content"], second["translated_content"])
+        self.assertEqual(
+            second["cached_fields"],
+            ["title", "bio", "experience", "education", "skills"],
+        )
+        self.assertEqual(second["translated_content"]["skills"], ["Python"])
+
+    def test_only_changed_fields_are_sent(self):
+        """Test that editing one field re-translates only that field"""
+        self.translate()
+        self.cv.bio = "Experienced Django developer"
+        self.create.side_effect = lambda **kwargs: completion(
+            json.dumps({"bio": "Diorroer Django skiantek"})
+        )
+
+        result = self.translate()
+
+        prompt = self.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("Experienced Django developer", prompt)
+        self.assertNotIn("Senior Developer at TechCorp", prompt)
+        self.assertEqual(
+            result["translated_content"]["bio"], "Diorroer Django skiantek"
+        )
+        self.assertEqual(result["translated_content"]["title"], "Diorroer Python")
+
+    def test_memory_is_per_language_and_model(self):
+        """Test that translations are not shared across languages or models"""
+        self.translate()
+        with override_settings(OPENAI_MODEL="other-model"):
+            self.translate()
+        SkillTranslation.objects.create(
+            skill=self.cv.skills.get(), language="cornish", name="Python"
+        )
+        TranslationService().translate_cv_content(self.cv, "cornish")
+
+        self.assertEqual(self.create.call_count, 3)
+
+    def test_unparseable_reply_is_asked_again(self):
+        """Test that a reply that is not a JSON object is requested once more"""
+        create = self.create.side_effect
+        replies = iter([lambda **kwargs: completion("{not json}"), create])
+        self.create.side_effect = lambda **kwargs: next(replies)(**kwargs)
+
+        result = self.translate()
+
+        self.assertEqual(self.create.call_count, 2)
+        self.assertEqual(result["translated_content"]["title"], "Diorroer Python")
+
+    def test_unparseable_replies_fail_the_translation(self):
+        """Test that repeated unparseable replies are not stored as translations"""
+        self.create.side_effect = lambda **kwargs: completion("{not json}")
+
+        result = self.translate()
+
+        self.assertFalse(result["success"])
+        self.assertEqual(self.create.call_count, 2)
+        self.assertFalse(TranslationMemory.objects.exists())
+
+    def test_reply_without_the_requested_keys_fails_the_translation(self):
+        """Test that valid JSON missing the requested keys is not a translation"""
+        for reply in [
+            {"unexpected": "x"},
+            {"title": "Diorroer Python", "bio": "", "experience": "x"},
+            {
+                "title": "Diorroer Python",
+                "bio": "Diorroer Python skiantek",
+                "experience": "Diorroer uhel e TechCorp",
+                "education": "Diplom stlenneg",
+                "notes": "x",
+            },
+        ]:
+            self.create.reset_mock()
+            self.create.side_effect = lambda **kwargs: completion(json.dumps(reply))
+
+            result = translate_cv_content_task(self.cv.pk, "breton")
+
+            self.assertFalse(result["success"])
+            self.assertEqual(self.create.call_count, 2)
+            self.assertFalse(TranslationMemory.objects.exists())
+            self.assertFalse(CVTranslation.objects.exists())
+
+    def test_prompt_is_compact_json_with_response_format(self):
+        """Test that prompts carry compact JSON and ask for a JSON reply"""
+        self.translate()
+
+        kwargs = self.create.call_args.kwargs
+        prompt = kwargs["messages"][1]["content"]
+        self.assertEqual(
+            json.loads(prompt.rsplit("\n", 1)[1]),
+            {
+                "title": "Python Developer",
+                "bio": "Experienced Python developer",
+                "experience": "Senior Developer at TechCorp",
+                "education": "Computer Science Degree",
+            },
+        )
+        self.assertNotIn("  ", prompt)
+        self.assertEqual(kwargs["response_format"], {"type": "json_object"})
+
+        with override_settings(OPENAI_RESPONSE_FORMATS={"default": "json_schema"}):
+            self.cv.title = "Senior Python Developer"
+            self.translate()
+        schema = self.create.call_args.kwargs["response_format"]["json_schema"][
+            "schema"
+        ]
+        self.assertEqual(schema["required"], ["title"])
+        self.assertFalse(schema["additionalProperties"])
+
+        with override_settings(OPENAI_RESPONSE_FORMATS={"default": None}):
+            self.cv.title = "Lead Python Developer"
+            self.translate()
+        self.assertNotIn("response_format", self.create.call_args.kwargs)
+
+    @override_settings(OPENAI_API_KEY="")
+    def test_cached_translation_needs_no_api_key(self):
+        """Test that fully remembered CVs translate without an API key"""
+        with override_settings(OPENAI_API_KEY="test-key"):
+            self.translate()
+
+        self.assertTrue(self.translate()["success"])
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MODEL="test-model")
+class SkillTranslationTestCase(TestCase):
+    """Test cases for the shared skill translation dictionary"""
+
+    def setUp(self):
+        cache.clear()
+        self.python = Skill.objects.create(name="Python")
+        self.management = Skill.objects.create(name="Project Management")
+        self.teamwork = Skill.objects.create(name="Teamwork")
+
+        self.create = mock_openai(self)
+        self.create.return_value = completion(
+            json.dumps(
+                {"Project Management": "Merañ raktresoù", "Teamwork": "Labour a-stroll"}
+            )
+        )
+
+        SkillTranslation.objects.create(
+            skill=self.python, language="breton", name="Python"
+        )
+
+    def test_missing_skills_are_translated_in_one_request(self):
+        """Test that all untranslated skills go out in a single request"""
+        names = TranslationService().translate_skills(
+            [self.python, self.management, self.teamwork], "breton"
+        )
+
+        self.assertEqual(self.create.call_count, 1)
+        prompt = self.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("Project Management", prompt)
+        self.assertNotIn('"Python"', prompt)
+        self.assertEqual(names[self.management.pk], "Merañ raktresoù")
+        self.assertEqual(SkillTranslation.objects.filter(language="breton").count(), 3)
+
+    def test_skills_are_shared_across_cvs(self):
+        """Test that a skill translated for one CV is reused for the next"""
+        cvs = []
+        for index in range(2):
+            cv = CV.objects.create(
+                first_name="John",
+                last_name=f"Doe {index}",
+                email=f"john.doe{index}@example.com",
+                title="",
+                bio="",
+                experience="",
+                education="",
+            )
+            cv.skills.add(self.management, self.teamwork)
+            cvs.append(cv)
+
+        service = TranslationService()
+        results = [service.translate_cv_content(cv, "breton") for cv in cvs]
+
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(
+            results[1]["translated_content"]["skills"],
+            ["Merañ raktresoù", "Labour a-stroll"],
+        )
+
+    def test_reply_missing_a_skill_is_rejected(self):
+        """Test that skills missing from the reply are asked again, then fail"""
+        self.create.return_value = completion(
+            json.dumps({"Teamwork": "Labour a-stroll"})
+        )
+
+        with self.assertRaises(InvalidReply):
+            TranslationService().translate_skills(
+                [self.management, self.teamwork], "breton"
+            )
+
+        self.assertEqual(self.create.call_count, 2)
+        self.assertFalse(
+            SkillTranslation.objects.filter(
+                skill__in=[self.management, self.teamwork]
+            ).exists()
+        )
+
+
+class StubOpenAIHandler(OpenAIHandler):
+    """Answers chat completions like OpenAI, tagging texts with the language"""
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.requests += 1
+
+        body = self.read_json()
+        system, user = (message["content"] for message in body["messages"])
+        language = system.rsplit(" to ", 1)[1].split(".")[0]
+        server.response_formats.append(body.get("response_format"))
+        # Prompts end with their JSON payload
+        payload = json.loads(user.rsplit("\n", 1)[1])
+        if isinstance(payload, list):
+            reply = {name: f"{name} ({language})" for name in payload}
+        elif list(payload) == ["text"]:
+            # A chunk of a long section; uppercase shows where each chunk went
+            reply = {"text": payload["text"].upper()}
+        else:
+            reply = {field: f"{field} ({language})" for field in payload}
+        time.sleep(0.05)
+
+        with server.lock:
+            server.in_flight -= 1
+        self.send_completion(json.dumps(reply), model=body["model"])
+
+
+class MultiLanguageTranslationTestCase(StubOpenAIServerMixin, TestCase):
+    """Test cases for concurrent translation into several languages"""
+
+    handler_class = StubOpenAIHandler
+
+    def setUp(self):
+        cache.clear()
+        self.server.in_flight = self.server.max_in_flight = self.server.requests = 0
+        self.server.response_formats = []
+        settings_override = override_settings(
+            OPENAI_API_KEY="test-key",
+            OPENAI_MODEL="test-model",
+            OPENAI_BASE_URL=self.openai_base_url,
+            OPENAI_CONCURRENCY=2,
+            OPENAI_REQUESTS_PER_MINUTE=0,
+            OPENAI_TOKENS_PER_MINUTE=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.cv.skills.add(Skill.objects.create(name="Python"))
+        self.languages = ["breton", "cornish", "manx", "occitan", "bislama"]
+
+    def test_languages_are_translated_concurrently(self):
+        """Test the fan-out against a stub server with a concurrency cap"""
+        progress = []
+
+        results = TranslationService().translate_cv_languages(
+            self.cv,
+            self.languages,
+            on_progress=lambda language, status, result=None: progress.append(
+                (language, status)
+            ),
+        )
+
+        self.assertEqual(list(results), self.languages)
+        self.assertTrue(all(result["success"] for result in results.values()))
+        self.assertEqual(
+            results["breton"]["translated_content"]["title"],
+            "title (Breton (Brezhoneg))",
+        )
+        self.assertEqual(
+            results["manx"]["translated_content"]["skills"], ["Python (Manx (Gaelg))"]
+        )
+        # One request for the fields and one for the skills per language
+        self.assertEqual(self.server.requests, 10)
+        self.assertLessEqual(self.server.max_in_flight, 2)
+        self.assertEqual(self.server.response_formats, [{"type": "json_object"}] * 10)
+        self.assertEqual(len(progress), 10)
+        self.assertEqual(progress[-1][1], "completed")
+
+        # Everything is remembered now
+        TranslationService().translate_cv_languages(self.cv, self.languages)
+        self.assertEqual(self.server.requests, 10)
+
+    def test_failed_language_does_not_fail_the_others(self):
+        """Test that each language reports its own failure"""
+        original_achat = TranslationService._achat
+
+        async def achat(service, client, system_prompt, prompt, keys):
+            if "Cornish" in system_prompt:
+                raise ConnectionError("refused")
+            return await original_achat(service, client, system_prompt, prompt, keys)
+
+        with mock.patch.object(TranslationService, "_achat", achat):
+            results = TranslationService().translate_cv_languages(
+                self.cv, ["breton", "cornish"]
+            )
+
+        self.assertTrue(results["breton"]["success"])
+        self.assertFalse(results["cornish"]["success"])
+        self.assertIn("refused", results["cornish"]["error"])
+
+    def test_rate_limiter_waits_for_tokens(self):
+        """Test that the token bucket delays requests beyond the limit"""
+
+        async def acquire_twice():
+            bucket = TokenBucket(6000)
+            await bucket.aacquire(6000)
+            started = time.monotonic()
+            await bucket.aacquire(10)
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(acquire_twice()), 0.09)
+
+    def test_requests_share_the_process_rate_limit(self):
+        """Test that consecutive translations draw on one requests budget"""
+        with override_settings(OPENAI_REQUESTS_PER_MINUTE=60):
+            service = TranslationService()
+            service.translate_many([(self.cv, "breton")])
+            first = self.server.requests
+            service.translate_many([(self.cv, "manx")])
+            # Single-language translations send their requests synchronously
+            service.translate_cv_content(self.cv, "cornish")
+
+            limiter = get_llm_client().limiter
+            # Refills add about one request a second while this runs
+            self.assertLessEqual(limiter.requests.tokens, 60 - self.server.requests + 1)
+
+        self.assertGreater(first, 0)
+        self.assertGreater(self.server.requests, 2 * first)
+
+    def test_view_starts_multi_language_task(self):
+        """Test that translate_cv queues one task for all languages"""
+        with mock.patch(
+            "main.views.translate_cv_languages_task.apply_async"
+        ) as apply_async:
+            response = self.client.post(
+                reverse("main:translate_cv", args=[self.cv.pk]),
+                json.dumps({"languages": "all"}),
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        apply_async.assert_called_once()
+        self.assertEqual(
+            apply_async.call_args.args[0],
+            (self.cv.pk, list(TranslationService.SUPPORTED_LANGUAGES)),
+        )
+        self.assertEqual(
+            response.json()["task_id"], apply_async.call_args.kwargs["task_id"]
+        )
+
+        response = self.client.post(
+            reverse("main:translate_cv", args=[self.cv.pk]),
+            json.dumps({"languages": ["breton", "klingon"]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["unsupported"], ["klingon"])
+
+    def test_result_view_reports_progress(self):
+        """Test that running multi-language tasks report each language"""
+        progress = {
+            "languages": {"breton": "completed", "manx": "running"},
+            "done": 1,
+            "total": 2,
+        }
+        with mock.patch("celery.result.AsyncResult") as async_result:
+            async_result.return_value.ready.return_value = False
+            async_result.return_value.state = "PROGRESS"
+            async_result.return_value.info = progress
+            response = self.client.get(
+                reverse("main:translation_result", args=["task-id"])
+            )
+
+        self.assertEqual(response.json(), {"status": "running", "progress": progress})
+
+
+class ChunkedTranslationTestCase(StubOpenAIServerMixin, TestCase):
+    """Test cases for splitting long sections into translation chunks"""
+
+    handler_class = StubOpenAIHandler
+
+    def setUp(self):
+        cache.clear()
+        self.server.in_flight = self.server.max_in_flight = self.server.requests = 0
+        self.server.response_formats = []
+        settings_override = override_settings(
+            OPENAI_API_KEY="test-key",
+            OPENAI_MODEL="test-model",
+            OPENAI_BASE_URL=self.openai_base_url,
+            OPENAI_CONCURRENCY=2,
+            OPENAI_REQUESTS_PER_MINUTE=0,
+            OPENAI_TOKENS_PER_MINUTE=0,
+            OPENAI_TRANSLATION_BUDGETS={
+                "default": {"CHUNK_TOKENS": 1000, "MAX_TOKENS": 2000},
+                "test-model": {"CHUNK_TOKENS": 60, "MAX_TOKENS": 200},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.paragraphs = [
+            f"Role {i}: built and operated backend services for a large "
+            f"marketplace, led migration number {i} without downtime."
+            for i in range(6)
+        ]
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="\n\n".join(self.paragraphs),
+            education="Computer Science Degree",
+        )
+
+    def test_split_text_keeps_paragraphs_and_separators(self):
+        """Test that chunks join back into the original text within budget"""
+        text = "First paragraph.\n\nSecond one.\n \nThird, much longer paragraph. " * 20
+
+        chunks = split_text(text, 40)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            "".join(chunk + separator for chunk, separator in chunks), text
+        )
+        self.assertTrue(all(estimate_tokens(chunk) <= 40 for chunk, _ in chunks))
+        self.assertEqual(split_text("Short", 40), [("Short", "")])
+
+    def test_estimate_counts_non_ascii_characters(self):
+        """Test that scripts other than ASCII count as more tokens"""
+        self.assertEqual(estimate_tokens("abcdefgh"), 3)
+        self.assertEqual(estimate_tokens("абвгдежз"), 9)
+
+    def test_long_section_is_translated_in_parallel_chunks(self):
+        """Test that a long section is chunked, translated concurrently and reassembled"""
+        results = TranslationService().translate_cv_languages(self.cv, ["breton"])
+
+        result = results["breton"]
+        self.assertTrue(result["success"])
+        self.assertEqual(
+            result["translated_content"]["experience"],
+            "\n\n".join(paragraph.upper() for paragraph in self.paragraphs),
+        )
+        # One request for the short fields, the rest for experience chunks
+        self.assertGreater(self.server.requests, 3)
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    def test_only_changed_chunks_are_sent_again(self):
+        """Test that chunks are remembered, so an edit re-sends only its chunk"""
+        service = TranslationService()
+        service.translate_cv_content(self.cv, "breton")
+        first_requests = self.server.requests
+
+        self.paragraphs[-1] = "Role 5: mentored engineers."
+        self.cv.experience = "\n\n".join(self.paragraphs)
+        result = service.translate_cv_content(self.cv, "breton")
+
+        self.assertEqual(self.server.requests, first_requests + 1)
+        self.assertEqual(
+            result["translated_content"]["experience"],
+            "\n\n".join(paragraph.upper() for paragraph in self.paragraphs),
+        )
+
+    def test_budget_is_chosen_per_model(self):
+        """Test that models without a budget of their own use the default"""
+        with override_settings(OPENAI_MODEL="other-model"):
+            job = TranslationService()._start_translation(self.cv, "breton")
+
+        self.assertEqual(list(job.prompts), ["fields:0"])
+        self.assertEqual(job.chunks, {})
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MODEL="test-model")
+class SingleFlightTranslationTestCase(TestCase):
+    """Test cases for sharing one task between identical translation requests"""
+
+    def setUp(self):
+        cache.clear()
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        apply_async_patch = mock.patch(
+            "main.views.translate_cv_content_task.apply_async"
+        )
+        self.apply_async = apply_async_patch.start()
+        self.addCleanup(apply_async_patch.stop)
+        # The holder of a key is running until a test says otherwise
+        async_result_patch = mock.patch("celery.result.AsyncResult")
+        self.async_result = async_result_patch.start().return_value
+        self.async_result.ready.return_value = False
+        self.addCleanup(async_result_patch.stop)
+
+    def translate(self, language="breton"):
+        response = self.client.post(
+            reverse("main:translate_cv", args=[self.cv.pk]),
+            json.dumps({"language": language}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_concurrent_requests_share_one_task(self):
+        """Test that a repeated request joins the task in flight"""
+        first = self.translate()
+        second = self.translate()
+
+        self.apply_async.assert_called_once()
+        self.assertEqual(second["task_id"], first["task_id"])
+        self.assertNotIn("coalesced", first)
+        self.assertTrue(second["coalesced"])
+
+        # Other languages and edited CVs are separate flights
+        self.assertNotEqual(self.translate("manx")["task_id"], first["task_id"])
+        self.cv.bio = "Changed bio"
+        self.cv.save()
+        self.assertNotEqual(self.translate()["task_id"], first["task_id"])
+
+    def test_finished_task_releases_the_key(self):
+        """Test that the task frees the key, so later requests start anew"""
+        first = self.translate()
+        args, kwargs = self.apply_async.call_args.args
+        mock_openai(self).return_value = completion(
+            json.dumps(
+                {
+                    "title": "Diorroer Python",
+                    "bio": "Diorroer Python skiantek",
+                    "experience": "Diorroer uhel e TechCorp",
+                    "education": "Diplom stlenneg",
+                }
+            )
+        )
+
+        translate_cv_content_task.apply(args, kwargs, task_id=first["task_id"])
+
+        self.assertNotEqual(self.translate()["task_id"], first["task_id"])
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_key_of_finished_holder_is_taken_over(self):
+        """Test that a key left behind by a finished task does not block requests"""
+        first = self.translate()
+
+        self.async_result.ready.return_value = True
+        second = self.translate()
+
+        self.assertNotEqual(second["task_id"], first["task_id"])
+        self.assertNotIn("coalesced", second)
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_failed_enqueue_releases_the_key(self):
+        """Test that a broker error does not leave the key claimed"""
+        self.apply_async.side_effect = ConnectionError("broker down")
+        response = self.client.post(
+            reverse("main:translate_cv", args=[self.cv.pk]),
+            json.dumps({"language": "breton"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 500)
+
+        self.apply_async.side_effect = None
+        self.assertNotIn("coalesced", self.translate())
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MODEL="test-model")
+class PartialTranslationTestCase(TestCase):
+    """Test cases for publishing remembered fields before the API replies"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_remembered_fields_are_reported_first(self):
+        """Test that on_partial gets the fields found in memory"""
+        cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="",
+            education="",
+        )
+        service = TranslationService()
+        service._remember_translations(
+            {"title": cv.title}, {"title": "Diorroer Python"}, "breton"
+        )
+        partials = []
+
+        mock_openai(self).return_value = completion(
+            json.dumps({"bio": "Diorroer Python skiantek"})
+        )
+        result = service.translate_cv_content(cv, "breton", on_partial=partials.append)
+
+        self.assertEqual(
+            partials,
+            [
+                {
+                    "title": "Diorroer Python",
+                    "experience": "",
+                    "education": "",
+                    "skills": [],
+                }
+            ],
+        )
+        self.assertEqual(
+            result["translated_content"]["bio"], "Diorroer Python skiantek"
+        )
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MODEL="test-model")
+class StoredTranslationTestCase(PdfCacheTestMixin, TestCase):
+    """Test cases for persisted CV translations and their pages"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.cv = CV.objects.create(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            title="Python Developer",
+            bio="Experienced Python developer",
+            experience="Senior Developer at TechCorp",
+            education="Computer Science Degree",
+        )
+        self.cv.skills.add(Skill.objects.create(name="Teamwork"))
+
+        self.create = mock_openai(self)
+        self.create.side_effect = translated_reply(
+            {
+                "Teamwork": "Labour a-stroll",
+                "title": "Diorroer Python",
+                "bio": "Diorroer Python skiantek",
+                "experience": "Diorroer uhel e TechCorp",
+                "education": "Diplom stlenneg",
+            }
+        )
+
+    def test_task_stores_translation(self):
+        """Test that a finished translation is stored and linked"""
+        result = translate_cv_content_task(self.cv.pk, "breton")
+
+        # The result is plain JSON for the Celery result backend
+        json.dumps(result)
+        translation = CVTranslation.objects.get(cv=self.cv, language="breton")
+        self.assertEqual(translation.title, "Diorroer Python")
+        self.assertEqual(translation.skills, ["Labour a-stroll"])
+        self.assertEqual(
+            result["detail_url"],
+            reverse("main:cv_detail_translated", args=[self.cv.pk, "breton"]),
+        )
+
+    def test_translated_detail_page(self):
+        """Test that stored translations render without calling the API"""
+        translate_cv_content_task(self.cv.pk, "breton")
+
+        self.create.reset_mock()
+        response = self.client.get(
+            reverse("main:cv_detail_translated", args=[self.cv.pk, "breton"])
+        )
+        self.create.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Diorroer Python")
+        self.assertContains(response, "Labour a-stroll")
+
+        # The original page links to the stored translation
+        response = self.client.get(reverse("main:cv_detail", args=[self.cv.pk]))
+        self.assertContains(
+            response, reverse("main:cv_detail_translated", args=[self.cv.pk, "breton"])
+        )
+
+    def test_edited_cv_invalidates_translation(self):
+        """Test that translations of an older CV version are not shown"""
+        translate_cv_content_task(self.cv.pk, "breton")
+        self.cv.bio = "Experienced Django developer"
+        self.cv.save()
+
+        url = reverse("main:cv_detail_translated", args=[self.cv.pk, "breton"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        # Translating the new version replaces the old one
+        translate_cv_content_task(self.cv.pk, "breton")
+        self.assertEqual(CVTranslation.objects.filter(cv=self.cv).count(), 1)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_unknown_translation_returns_404(self):
+        """Test missing and unsupported languages"""
+        for language in ["manx", "klingon"]:
+            url = reverse("main:cv_detail_translated", args=[self.cv.pk, language])
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_translated_pdf(self):
+        """Test that the PDF route renders the stored translation"""
+        translate_cv_content_task(self.cv.pk, "breton")
+        rendered = []
+
+        def render(renderer, cv):
+            rendered.append((cv.title, [skill.name for skill in cv.skills.all()]))
+            return b"%PDF-1.7 translated"
+
+        with mock.patch.object(WeasyPrintRenderer, "render", render):
+            response = self.client.get(
+                reverse("main:cv_pdf_download_translated", args=[self.cv.pk, "breton"])
+            )
+            original = self.client.get(
+                reverse("main:cv_pdf_download", args=[self.cv.pk])
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("_breton.pdf", response["Content-Disposition"])
+        self.assertEqual(rendered[0], ("Diorroer Python", ["Labour a-stroll"]))
+        # Translated and original PDFs are cached separately
+        self.assertNotEqual(response["ETag"], original["ETag"])
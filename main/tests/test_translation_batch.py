@@ -0,0 +1,126 @@
+import io
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from ..models import CV, CVTranslation, Skill, TranslationBatch
+from ..services import TranslationService
+from ..tasks import translate_cv_batch_task
+from ..translation_batch import start_translation_batch, translate_next_chunk
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MODEL="test-model")
+class TranslationBatchTestCase(TestCase):
+    """Test cases for translating every CV in resumable chunks"""
+
+    def setUp(self):
+        cache.clear()
+        python = Skill.objects.create(name="Python")
+        self.cvs = []
+        for i in range(5):
+            cv = CV.objects.create(
+                first_name="John",
+                last_name=f"Doe {i}",
+                email=f"john.doe{i}@example.com",
+                title=f"Python Developer {i}",
+                bio=f"Experienced Python developer {i}",
+                experience=f"Senior Developer at TechCorp {i}",
+                education="Computer Science Degree",
+            )
+            cv.skills.add(python)
+            self.cvs.append(cv)
+
+        self.prompts = []
+
+        async def achat(service, client, system_prompt, prompt, keys):
+            self.prompts.append(prompt)
+            return json.dumps({key: f"{key} (brezhoneg)" for key in keys})
+
+        achat_patch = mock.patch.object(TranslationService, "_achat", achat)
+        achat_patch.start()
+        self.addCleanup(achat_patch.stop)
+
+    def run_command(self, *args):
+        output = io.StringIO()
+        call_command("translate_cvs", *args, stdout=output)
+        return output.getvalue()
+
+    def test_command_translates_every_cv_in_chunks(self):
+        """Test that all CVs are translated and throughput is reported"""
+        output = self.run_command("breton", "--chunk-size", "2")
+
+        self.assertEqual(CVTranslation.objects.filter(language="breton").count(), 5)
+        batch = TranslationBatch.objects.get()
+        stats = batch.stats()
+        self.assertTrue(stats["finished"])
+        self.assertEqual(stats["cvs"], 5)
+        self.assertEqual(stats["translated"], 5)
+        self.assertEqual(stats["last_cv_id"], self.cvs[-1].pk)
+        self.assertGreater(batch.tokens, 0)
+        self.assertIn("CVs/s", output)
+        self.assertIn("tokens/s", output)
+        self.assertIn("cache hit rate", output)
+
+    def test_current_translations_are_skipped(self):
+        """Test that a second batch finds every translation current"""
+        self.run_command("breton")
+        self.prompts.clear()
+
+        self.run_command("breton")
+
+        self.assertEqual(self.prompts, [])
+        stats = TranslationBatch.objects.latest("pk").stats()
+        self.assertEqual(stats["skipped"], 5)
+        self.assertEqual(stats["translated"], 0)
+        self.assertEqual(stats["cache_hit_rate"], 1)
+
+    def test_changed_cv_is_translated_again(self):
+        """Test that only the CV edited since the last batch is sent"""
+        self.run_command("breton")
+        self.cvs[2].bio = "Changed bio"
+        self.cvs[2].save()
+        self.prompts.clear()
+
+        self.run_command("breton")
+
+        self.assertEqual(len(self.prompts), 1)
+        stats = TranslationBatch.objects.latest("pk").stats()
+        self.assertEqual((stats["translated"], stats["skipped"]), (1, 4))
+
+    def test_interrupted_batch_resumes_after_checkpoint(self):
+        """Test that --resume continues after the last finished chunk"""
+        batch = start_translation_batch(["breton"], chunk_size=2)
+        translate_next_chunk(batch)
+        self.assertEqual(batch.last_cv_id, self.cvs[1].pk)
+
+        self.run_command("--resume", str(batch.pk))
+
+        batch.refresh_from_db()
+        self.assertEqual((batch.cvs, batch.translated, batch.skipped), (5, 5, 0))
+        self.assertIsNotNone(batch.finished_at)
+        with self.assertRaises(CommandError):
+            self.run_command("--resume", str(batch.pk))
+
+    def test_task_chains_the_next_chunk(self):
+        """Test that the Celery task queues itself until no CVs are left"""
+        batch = start_translation_batch(["breton"], chunk_size=5)
+
+        with mock.patch.object(translate_cv_batch_task, "delay") as delay:
+            translate_cv_batch_task(batch.pk)
+            delay.assert_called_once_with(batch.pk)
+
+            delay.reset_mock()
+            stats = translate_cv_batch_task(batch.pk)
+            delay.assert_not_called()
+
+        self.assertTrue(stats["finished"])
+        self.assertEqual(stats["translated"], 5)
+
+    def test_unsupported_language_is_rejected(self):
+        """Test that the command validates languages before starting"""
+        with self.assertRaises(CommandError):
+            self.run_command("klingon")
+        self.assertFalse(TranslationBatch.objects.exists())
@@ -4,6 +4,7 @@ from datetime import date
 from django.test import TestCase, Client
 from django.urls import reverse
 from ..models import CV, Skill, Project
+from .utils import PdfCacheTestMixin
 
 from PyPDF2 import PdfReader
 
@@ -107,10 +108,11 @@ class CVDetailViewTestCase(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
-class CVPDFTestCase(TestCase):
+class CVPDFTestCase(PdfCacheTestMixin, TestCase):
     """Test cases for CV PDF generation"""
 
     def setUp(self):
+        super().setUp()
         self.client = Client()
 
         # Create test CV
@@ -0,0 +1,91 @@
+import json
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import override_settings
+
+
+class PdfCacheTestMixin:
+    """Keep the PDFs rendered by a test in a temporary PDF cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.pdf_cache_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pdf_cache_location, ignore_errors=True)
+        settings_override = override_settings(
+            PDF_CACHE={
+                "STORAGE": "main.pdf.cache.FileSystemPdfStorage",
+                "OPTIONS": {"location": self.pdf_cache_location},
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class OpenAIHandler(BaseHTTPRequestHandler):
+    """Base for stub OpenAI endpoints; subclasses implement do_POST"""
+
+    def read_json(self):
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+    def send_completion(self, content, model="test-model", usage=(1, 1)):
+        """Answer with a chat completion whose message is content"""
+        prompt_tokens, completion_tokens = usage
+        self.send_json(
+            200,
+            {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubOpenAIServerMixin:
+    """
+    Run handler_class on a local HTTP server for the test case; point
+    OPENAI_BASE_URL at self.openai_base_url
+    """
+
+    handler_class = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), cls.handler_class)
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    @property
+    def openai_base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
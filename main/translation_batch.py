@@ -0,0 +1,117 @@
+"""
+Translate every CV into a set of languages in keyset-ordered chunks.
+Each chunk moves the batch's checkpoint forward, so a crashed batch
+resumes after the last finished chunk, and CVs whose stored translation
+is current are skipped without calling the API.
+"""
+
+import logging
+import time
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CV, CVTranslation, TranslationBatch
+from .services import TranslationService
+
+logger = logging.getLogger(__name__)
+
+# Text fields plus the skills of a CV translation
+SECTIONS_PER_TRANSLATION = len(TranslationService.TRANSLATED_FIELDS) + 1
+
+
+class BatchError(Exception):
+    """Raised when a translation batch cannot be started"""
+
+
+def start_translation_batch(languages, chunk_size=50, concurrency=4):
+    """Create a batch for the given languages"""
+    unsupported = [
+        language
+        for language in languages
+        if language not in TranslationService.SUPPORTED_LANGUAGES
+    ]
+    if unsupported:
+        raise BatchError(f"Unsupported languages: {', '.join(unsupported)}")
+    if not languages:
+        raise BatchError("At least one language is required")
+    if chunk_size < 1 or concurrency < 1:
+        raise BatchError("Chunk size and concurrency must be at least 1")
+
+    return TranslationBatch.objects.create(
+        languages=list(dict.fromkeys(languages)),
+        chunk_size=chunk_size,
+        concurrency=concurrency,
+    )
+
+
+def translate_next_chunk(batch):
+    """
+    Translate the next chunk of CVs after the batch's checkpoint and store
+    the results. Returns False, and marks the batch finished, when no CVs
+    are left.
+    """
+    started = time.monotonic()
+    cvs = list(
+        CV.objects.filter(pk__gt=batch.last_cv_id)
+        .prefetch_related("skills")
+        .order_by("pk")[: batch.chunk_size]
+    )
+    if not cvs:
+        batch.finished_at = timezone.now()
+        batch.save(update_fields=["finished_at", "updated_at"])
+        return False
+
+    current = set(
+        CVTranslation.objects.filter(
+            cv__in=cvs, language__in=batch.languages
+        ).values_list("cv_id", "language", "source_version")
+    )
+    pairs = []
+    skipped = 0
+    for cv in cvs:
+        version = CVTranslation.version_for(cv)
+        for language in batch.languages:
+            if (cv.pk, language, version) in current:
+                skipped += 1
+            else:
+                pairs.append((cv, language))
+
+    service = TranslationService()
+    results = (
+        service.translate_many(pairs, concurrency=batch.concurrency) if pairs else []
+    )
+
+    translated = failed = tokens = cached_sections = 0
+    for cv, language, result in results:
+        if result["success"]:
+            service.save_translation(cv, language, result["translated_content"])
+            translated += 1
+            tokens += result["tokens"]
+            cached_sections += len(result["cached_fields"])
+        else:
+            logger.warning(
+                f"Batch {batch.pk}: translating CV {cv.pk} to {language} failed: "
+                f"{result['error']}"
+            )
+            failed += 1
+
+    # Counters and checkpoint move in one update, so a crash repeats at most
+    # this chunk, whose translations are remembered by then
+    TranslationBatch.objects.filter(pk=batch.pk).update(
+        last_cv_id=cvs[-1].pk,
+        cvs=F("cvs") + len(cvs),
+        translated=F("translated") + translated,
+        skipped=F("skipped") + skipped,
+        failed=F("failed") + failed,
+        tokens=F("tokens") + tokens,
+        cached_sections=F("cached_sections")
+        + cached_sections
+        + skipped * SECTIONS_PER_TRANSLATION,
+        sections=F("sections")
+        + len(cvs) * len(batch.languages) * SECTIONS_PER_TRANSLATION,
+        elapsed=F("elapsed") + (time.monotonic() - started),
+        updated_at=timezone.now(),
+    )
+    batch.refresh_from_db()
+    return True
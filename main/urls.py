@@ -1,16 +1,57 @@
 from django.urls import path
 from . import views
-from .views import settings_view, detailed_settings_view, send_cv_email, translate_cv, get_translation_result
+from .views import (
+    settings_view,
+    detailed_settings_view,
+    send_cv_email,
+    translate_cv,
+    get_translation_result,
+)
 
 app_name = "main"
 
 urlpatterns = [
     path("", views.CVListView.as_view(), name="cv_list"),
+    path("search/", views.CVSearchView.as_view(), name="cv_search"),
     path("cv/<int:pk>/", views.CVDetailView.as_view(), name="cv_detail"),
     path("cv/<int:pk>/pdf/", views.cv_pdf_download, name="cv_pdf_download"),
+    path(
+        "cv/<int:pk>/translations/<str:language>/",
+        views.cv_detail_translated,
+        name="cv_detail_translated",
+    ),
+    path(
+        "cv/<int:pk>/translations/<str:language>/pdf/",
+        views.cv_pdf_download,
+        name="cv_pdf_download_translated",
+    ),
+    path("cv/export/", views.export_cv_pdfs, name="export_cv_pdfs"),
+    path(
+        "cv/export/<str:task_id>/",
+        views.export_cv_pdfs_status,
+        name="export_cv_pdfs_status",
+    ),
+    path(
+        "cv/export/<str:task_id>/download/",
+        views.export_cv_pdfs_download,
+        name="export_cv_pdfs_download",
+    ),
     path("settings/", settings_view, name="settings"),
     path("settings/detailed/", detailed_settings_view, name="detailed_settings"),
+    path("settings/pdf-render-stats/", views.pdf_render_stats, name="pdf_render_stats"),
+    path("settings/llm-stats/", views.llm_stats, name="llm_stats"),
     path("cv/<int:cv_id>/send-email/", send_cv_email, name="send_cv_email"),
+    path("cv/send-email/", views.send_cv_email_batch, name="send_cv_email_batch"),
+    path(
+        "cv/send-email/<str:task_id>/",
+        views.send_cv_email_batch_status,
+        name="send_cv_email_batch_status",
+    ),
     path("cv/<int:cv_id>/translate/", translate_cv, name="translate_cv"),
-    path("translation-result/<str:task_id>/", get_translation_result, name="translation_result"),
+    path(
+        "translation-result/<str:task_id>/",
+        get_translation_result,
+        name="translation_result",
+    ),
+    path("tasks/<str:task_id>/events/", views.task_events, name="task_events"),
 ]
@@ -1,20 +1,48 @@
-import os
-import tempfile
+import calendar
 import json
+import logging
+import threading
+import time
 
-from weasyprint import HTML
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.views.generic import ListView, DetailView
-from django.http import HttpResponse, JsonResponse
-from django.template.loader import render_to_string
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.contrib.admin.views.decorators import staff_member_required
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
-from main.models import CV
-from .tasks import send_cv_pdf_email
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from main.conditional import conditional_response, cv_list_validators, cv_validators
+from main.models import CV, CVTranslation
+from main.pdf.cache import get_pdf_cache
+from main.pdf.export import (
+    EXPORT_FILTERS,
+    ExportError,
+    export_archive_path,
+    get_export_progress,
+    select_cv_ids,
+    start_cv_export,
+)
+from main.pdf.pool import RenderPoolError, get_render_pool
+from main.pdf.renderers import get_renderer
+from main.search import search_cvs, search_terms
+from .tasks import send_cv_pdf_batch_email, send_cv_pdf_email
+from . import idempotency
+from .llm import get_llm_client, get_llm_metrics
 from .services import TranslationService
-from .tasks import translate_cv_content_task
+from .tasks import translate_cv_content_task, translate_cv_languages_task
+
+logger = logging.getLogger(__name__)
 
 
 class CVListView(ListView):
@@ -24,10 +52,43 @@ class CVListView(ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        return CV.objects.prefetch_related("skills", "project_set").order_by(
-            "-updated_at"
+        return (
+            CV.objects.defer("search_vector")
+            .prefetch_related("skills", "project_set")
+            .order_by("-updated_at")
+        )
+
+    def get(self, request, *args, **kwargs):
+        return conditional_response(
+            request, cv_list_validators(), super().get, *args, **kwargs
+        )
+
+
+class CVSearchView(ListView):
+    """CVs matching every word of ?q=, best match first"""
+
+    model = CV
+    template_name = "main/cv_list.html"
+    context_object_name = "cvs"
+    paginate_by = 10
+
+    def get(self, request, *args, **kwargs):
+        self.query = request.GET.get("q", "").strip()
+        if not search_terms(self.query):
+            return redirect("main:cv_list")
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return search_cvs(
+            CV.objects.defer("search_vector").prefetch_related("skills", "project_set"),
+            self.query,
         )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        return context
+
 
 class CVDetailView(DetailView):
     model = CV
@@ -37,38 +98,194 @@ class CVDetailView(DetailView):
     def get_queryset(self):
         return CV.objects.prefetch_related("skills", "project_set")
 
-
-def cv_pdf_download(request, pk):
-    """Generate and download CV as PDF"""
+    def get(self, request, *args, **kwargs):
+        validators = cv_validators(kwargs["pk"], with_translations=True)
+        if validators is None:
+            raise Http404("CV not found")
+        return conditional_response(request, validators, super().get, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Stored translations of the CV as it is now
+        version = CVTranslation.version_for(self.object)
+        languages = TranslationService.get_supported_languages()
+        context["translations"] = [
+            (language, languages.get(language, language))
+            for language in self.object.translations.filter(
+                source_version=version
+            ).values_list("language", flat=True)
+        ]
+        return context
+
+
+def cv_detail_translated(request, pk, language):
+    """Show a CV in a stored translation, without calling the translation API"""
     cv = get_object_or_404(CV.objects.prefetch_related("skills", "project_set"), pk=pk)
+    translation = _get_stored_translation(cv, language)
+
+    return render(
+        request,
+        "main/cv_detail.html",
+        {
+            "cv": translation.apply(cv),
+            "translation": translation,
+            "language_name": TranslationService.get_supported_languages()[language],
+        },
+    )
+
+
+def _get_stored_translation(cv, language):
+    if language not in TranslationService.get_supported_languages():
+        raise Http404("Unsupported language")
+
+    translation = TranslationService().get_translation(cv, language)
+    if translation is None:
+        raise Http404("This CV has not been translated to this language yet")
+    return translation
+
+
+def cv_pdf_download(request, pk, language=None):
+    """Generate and download CV as PDF, optionally in a stored translation"""
+    cv = get_object_or_404(
+        CV.objects.defer("search_vector").prefetch_related("skills", "project_set"),
+        pk=pk,
+    )
+    filename = f"{cv.full_name}_CV.pdf"
+    if language is not None:
+        _get_stored_translation(cv, language).apply(cv)
+        filename = f"{cv.full_name}_CV_{language}.pdf"
+
+    renderer = get_renderer("download")
+    pdf_cache = get_pdf_cache()
+    cache_key = pdf_cache.key_for(cv, renderer)
+    etag = quote_etag(cache_key)
+
+    # The ETag is derived from the content, so a matching If-None-Match
+    # can be answered without touching the cache storage at all
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            pdf = pdf_cache.get_or_render(cv, renderer, key=cache_key)
+        except RenderPoolError as e:
+            response = HttpResponse(
+                "PDF rendering is busy, please retry shortly.",
+                content_type="text/plain",
+                status=503,
+            )
+            response["Retry-After"] = settings.PDF_RENDER_POOL["RETRY_AFTER"]
+            logger.warning(f"PDF download for CV ID {pk} rejected: {e}")
+            return response
+
+        last_modified = calendar.timegm(pdf.rendered_at.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+
+        if response is None:
+            response = HttpResponse(pdf.content, content_type="application/pdf")
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Last-Modified"] = http_date(last_modified)
 
-    # Render the PDF template
-    html_string = render_to_string("main/pdf/cv.html", {"cv": cv})
+    response["ETag"] = etag
+    patch_cache_control(response, no_cache=True)
 
-    # Create PDF
-    html = HTML(string=html_string)
+    return response
 
-    # Generate PDF in memory
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        html.write_pdf(tmp_file.name)
 
-        # Read the PDF content
-        with open(tmp_file.name, "rb") as pdf_file:
-            pdf_content = pdf_file.read()
+@require_POST
+def export_cv_pdfs(request):
+    """
+    Start a bulk PDF export of CVs selected by id list and/or filters
+    """
+    try:
+        data = json.loads(request.body)
+        cv_ids = select_cv_ids(ids=data.get("ids"), filters=data.get("filters"))
 
-        # Clean up temporary file
-        os.unlink(tmp_file.name)
+        if not cv_ids:
+            return JsonResponse({"error": "No CVs match the selection"}, status=400)
 
-    # Create HTTP response
-    response = HttpResponse(pdf_content, content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="{cv.full_name}_CV.pdf"'
+        export_id = start_cv_export(cv_ids)
 
-    return response
+        return JsonResponse(
+            {
+                "message": "Export is being processed",
+                "task_id": export_id,
+                "total": len(cv_ids),
+            }
+        )
+
+    except ExportError as e:
+        return JsonResponse(
+            {"error": str(e), "filters": sorted(EXPORT_FILTERS)}, status=400
+        )
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def export_cv_pdfs_status(request, task_id):
+    """
+    Get the progress of a bulk PDF export
+    """
+    from celery.result import AsyncResult
+
+    try:
+        result = AsyncResult(task_id)
+
+        if result.ready():
+            if result.successful():
+                outcome = result.result
+            else:
+                outcome = {"success": False, "error": str(result.info)}
+
+            if outcome.get("success"):
+                return JsonResponse(
+                    {
+                        "status": "completed",
+                        "result": outcome,
+                        "download_url": reverse(
+                            "main:export_cv_pdfs_download", args=[task_id]
+                        ),
+                    }
+                )
+            return JsonResponse({"status": "failed", "error": outcome.get("error")})
+
+        if result.state == "ARCHIVING":
+            return JsonResponse({"status": "archiving", **result.info})
+
+        progress = get_export_progress(task_id)
+        if progress is None:
+            return JsonResponse({"status": "pending"})
+        done, total = progress
+        return JsonResponse({"status": "rendering", "done": done, "total": total})
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def export_cv_pdfs_download(request, task_id):
+    """
+    Stream the ZIP archive of a finished bulk PDF export
+    """
+    try:
+        archive_path = export_archive_path(task_id)
+        archive_file = open(archive_path, "rb")
+    except (ValueError, FileNotFoundError):
+        raise Http404("Export not found")
+
+    return FileResponse(
+        archive_file, as_attachment=True, filename=f"cv_export_{task_id}.zip"
+    )
 
 
 # Function-based view alternative
 def cv_list(request):
-    cvs = CV.objects.prefetch_related("skills", "project_set").order_by("-updated_at")
+    cvs = (
+        CV.objects.defer("search_vector")
+        .prefetch_related("skills", "project_set")
+        .order_by("-updated_at")
+    )
     return render(request, "main/cv_list.html", {"cvs": cvs})
 
 
@@ -136,6 +353,32 @@ def detailed_settings_view(request):
     return render(request, "main/detailed_settings.html", context)
 
 
+@staff_member_required
+def pdf_render_stats(request):
+    """
+    Report the stylesheet and font cache counters of this web worker's
+    PDF render processes (staff only).
+    """
+    render_pool = get_render_pool()
+    return JsonResponse(
+        {
+            "workers": render_pool.workers,
+            "processes": {str(pid): info for pid, info in render_pool.stats().items()},
+        }
+    )
+
+
+@staff_member_required
+def llm_stats(request):
+    """
+    Report OpenAI request, retry and error counts and latencies of all
+    workers, and the circuit breaker state of this web worker (staff only).
+    """
+    return JsonResponse(
+        {**get_llm_metrics(), "circuit": get_llm_client().breaker.state}
+    )
+
+
 @require_POST
 def send_cv_email(request, cv_id):
     """
@@ -151,10 +394,54 @@ def send_cv_email(request, cv_id):
         # Get CV to validate it exists
         cv = CV.objects.get(id=cv_id)
 
+        # Repeated sends of the same CV version to the same recipient are
+        # coalesced unless the client supplies its own Idempotency-Key, which
+        # must not be reused with a different payload
+        client_key = request.headers.get("Idempotency-Key")
+        if client_key:
+            digest = idempotency.payload_digest(
+                {**data, "email": recipient_email.strip().lower()}
+            )
+            if not idempotency.claim_payload(
+                idempotency.make_key("send-cv-email-payload", cv_id, client_key),
+                digest,
+                settings.EMAIL_IDEMPOTENCY_TIMEOUT,
+            ):
+                return JsonResponse(
+                    {"error": "Idempotency-Key was already used with another payload"},
+                    status=422,
+                )
+            key = idempotency.make_key("send-cv-email", cv_id, client_key, digest)
+        else:
+            key = idempotency.make_key(
+                "send-cv-email",
+                cv_id,
+                recipient_email.strip().lower(),
+                cv.updated_at.isoformat(),
+            )
+
+        task_id, created = idempotency.claim_task_id(
+            key, settings.EMAIL_IDEMPOTENCY_TIMEOUT
+        )
+        if not created:
+            return JsonResponse(
+                {
+                    "message": "Email is already being sent",
+                    "task_id": task_id,
+                    "duplicate": True,
+                }
+            )
+
         # Trigger Celery task
-        task = send_cv_pdf_email.delay(cv_id, recipient_email)
+        try:
+            send_cv_pdf_email.apply_async(
+                (cv_id, recipient_email), {"idempotency_key": key}, task_id=task_id
+            )
+        except Exception:
+            idempotency.release(key, task_id)
+            raise
 
-        return JsonResponse({"message": "Email is being sent", "task_id": task.id})
+        return JsonResponse({"message": "Email is being sent", "task_id": task_id})
 
     except CV.DoesNotExist:
         return JsonResponse({"error": "CV not found"}, status=404)
@@ -164,34 +451,179 @@ def send_cv_email(request, cv_id):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+@require_POST
+def send_cv_email_batch(request):
+    """
+    Trigger one Celery task sending the PDFs of several CVs to several recipients
+    """
+    try:
+        data = json.loads(request.body)
+        cv_ids = data.get("cv_ids")
+        recipient_emails = data.get("emails")
+
+        if not cv_ids or not isinstance(cv_ids, list):
+            return JsonResponse(
+                {"error": "cv_ids must be a non-empty list"}, status=400
+            )
+        if not recipient_emails or not isinstance(recipient_emails, list):
+            return JsonResponse(
+                {"error": "emails must be a non-empty list"}, status=400
+            )
+
+        # Drop duplicates, keeping the order of the request
+        try:
+            cv_ids = list(dict.fromkeys(int(cv_id) for cv_id in cv_ids))
+        except (TypeError, ValueError):
+            return JsonResponse({"error": "CV ids must be integers"}, status=400)
+        recipient_emails = list(dict.fromkeys(recipient_emails))
+
+        if len(recipient_emails) > settings.EMAIL_BATCH_MAX_RECIPIENTS:
+            return JsonResponse(
+                {
+                    "error": "Too many recipients, the maximum is "
+                    f"{settings.EMAIL_BATCH_MAX_RECIPIENTS}"
+                },
+                status=400,
+            )
+
+        invalid_emails = []
+        for recipient_email in recipient_emails:
+            try:
+                validate_email(recipient_email)
+            except ValidationError:
+                invalid_emails.append(recipient_email)
+        if invalid_emails:
+            return JsonResponse(
+                {"error": "Invalid email addresses", "invalid_emails": invalid_emails},
+                status=400,
+            )
+
+        # Validate the CVs exist
+        found = set(CV.objects.filter(pk__in=cv_ids).values_list("pk", flat=True))
+        missing = [cv_id for cv_id in cv_ids if cv_id not in found]
+        if missing:
+            return JsonResponse(
+                {"error": "CV not found", "missing_cv_ids": missing}, status=404
+            )
+
+        # Trigger Celery task
+        task = send_cv_pdf_batch_email.delay(cv_ids, recipient_emails)
+
+        return JsonResponse(
+            {
+                "message": "Emails are being sent",
+                "task_id": task.id,
+                "total": len(cv_ids) * len(recipient_emails),
+            }
+        )
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def send_cv_email_batch_status(request, task_id):
+    """
+    Get the per-recipient outcome of a batch CV email task
+    """
+    from celery.result import AsyncResult
+
+    try:
+        result = AsyncResult(task_id)
+
+        if result.ready():
+            if result.successful():
+                return JsonResponse({"status": "completed", "result": result.get()})
+            else:
+                return JsonResponse({"status": "failed", "error": str(result.info)})
+        else:
+            return JsonResponse({"status": "pending"})
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
 @require_POST
 def translate_cv(request, cv_id):
     """
-    Trigger CV translation via OpenAI
+    Trigger CV translation via OpenAI. Pass "language" for one language,
+    or "languages" (a list, or "all") to translate into several at once.
     """
     try:
         data = json.loads(request.body)
         target_language = data.get("language")
+        target_languages = data.get("languages")
+        supported_languages = TranslationService.get_supported_languages()
+
+        if target_languages:
+            if target_languages == "all":
+                target_languages = list(supported_languages)
+            if not isinstance(target_languages, list):
+                return JsonResponse(
+                    {"error": 'Languages must be a list or "all"'}, status=400
+                )
+
+            target_languages = list(dict.fromkeys(target_languages))
+            unsupported = [
+                language
+                for language in target_languages
+                if language not in supported_languages
+            ]
+            if unsupported:
+                return JsonResponse(
+                    {"error": "Unsupported language", "unsupported": unsupported},
+                    status=400,
+                )
+
+            # Get CV to validate it exists
+            cv = CV.objects.prefetch_related("skills").get(id=cv_id)
+
+            task_id, coalesced = _start_single_flight(
+                translate_cv_languages_task,
+                cv,
+                (cv_id, target_languages),
+                "translate-cv-languages",
+                *sorted(target_languages),
+            )
+
+            return JsonResponse(
+                {
+                    "message": "Translations are being processed",
+                    "task_id": task_id,
+                    "target_languages": {
+                        language: supported_languages[language]
+                        for language in target_languages
+                    },
+                    **({"coalesced": True} if coalesced else {}),
+                }
+            )
 
         if not target_language:
             return JsonResponse({"error": "Language is required"}, status=400)
 
         # Validate language
-        supported_languages = TranslationService.get_supported_languages()
         if target_language not in supported_languages:
             return JsonResponse({"error": "Unsupported language"}, status=400)
 
         # Get CV to validate it exists
-        cv = CV.objects.get(id=cv_id)
-
-        # Trigger translation task
-        task = translate_cv_content_task.delay(cv_id, target_language)
+        cv = CV.objects.prefetch_related("skills").get(id=cv_id)
+
+        # Trigger translation task, or join the one already running
+        task_id, coalesced = _start_single_flight(
+            translate_cv_content_task,
+            cv,
+            (cv_id, target_language),
+            "translate-cv",
+            target_language,
+        )
 
         return JsonResponse(
             {
                 "message": "Translation is being processed",
-                "task_id": task.id,
+                "task_id": task_id,
                 "target_language": supported_languages[target_language],
+                **({"coalesced": True} if coalesced else {}),
             }
         )
 
@@ -203,6 +635,27 @@ def translate_cv(request, cv_id):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def _start_single_flight(task, cv, args, namespace, *languages):
+    """
+    Enqueue a translation task unless one for the same CV version and
+    languages is already in flight. Returns (task_id, coalesced); coalesced
+    requests get the running task's id and add no OpenAI calls.
+    """
+    key = idempotency.make_key(
+        namespace, cv.pk, CVTranslation.version_for(cv), *languages
+    )
+    task_id, created = idempotency.claim_single_flight(
+        key, settings.TRANSLATION_SINGLE_FLIGHT_TIMEOUT
+    )
+    if created:
+        try:
+            task.apply_async(args, {"single_flight_key": key}, task_id=task_id)
+        except Exception:
+            idempotency.release(key, task_id)
+            raise
+    return task_id, not created
+
+
 def get_translation_result(request, task_id):
     """
     Get translation task result
@@ -217,8 +670,126 @@ def get_translation_result(request, task_id):
                 return JsonResponse({"status": "completed", "result": result.get()})
             else:
                 return JsonResponse({"status": "failed", "error": str(result.info)})
+        elif result.state == "PROGRESS":
+            # Multi-language translations report each language's status
+            return JsonResponse({"status": "running", "progress": result.info})
         else:
             return JsonResponse({"status": "pending"})
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+# Celery states reported while a task runs, mapped to the status sent to clients
+TASK_EVENT_STATUSES = {
+    "PENDING": "pending",
+    "RECEIVED": "pending",
+    "STARTED": "running",
+    "PROGRESS": "running",
+    "ARCHIVING": "running",
+    "RETRY": "retrying",
+}
+
+# Seconds between comments that keep idle proxies from closing the stream
+TASK_EVENTS_KEEPALIVE = 15
+
+# Seconds a client turned away by TASK_EVENTS_MAX_STREAMS waits to reconnect
+TASK_EVENTS_BUSY_RETRY = 10
+
+# Streams open in this process; each holds a server thread while it lasts
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+
+def task_events(request, task_id):
+    """
+    Stream the progress of a Celery task as Server-Sent Events, from one
+    long-lived request instead of repeated polling. Sends "status" when the
+    task state changes, "progress" with partial results, then "complete"
+    or "failed" and closes.
+    """
+    response = StreamingHttpResponse(
+        _task_event_stream(task_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _task_event_stream(task_id):
+    global _open_streams
+
+    with _open_streams_lock:
+        claimed = _open_streams < settings.TASK_EVENTS_MAX_STREAMS
+        if claimed:
+            _open_streams += 1
+    if not claimed:
+        # Past the cap, EventSource is told to come back instead of
+        # taking one more thread from the other requests
+        yield f"retry: {TASK_EVENTS_BUSY_RETRY * 1000}\n\n: busy\n\n"
+        return
+
+    try:
+        yield from _poll_task_events(task_id)
+    finally:
+        with _open_streams_lock:
+            _open_streams -= 1
+
+
+def _poll_task_events(task_id):
+    from celery.result import AsyncResult
+
+    result = AsyncResult(task_id)
+    started = time.monotonic()
+    last_sent = started
+    last_state = None
+    last_info = None
+    event_id = 0
+
+    def event(name, data):
+        nonlocal event_id, last_sent
+        event_id += 1
+        last_sent = time.monotonic()
+        return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data)}\n\n"
+
+    # Tell EventSource how long to wait before reconnecting
+    yield f"retry: {int(settings.TASK_EVENTS_POLL_INTERVAL * 1000) + 1000}\n\n"
+
+    while True:
+        try:
+            state = result.state
+            info = result.info
+
+            if state == "SUCCESS":
+                yield event("complete", {"status": "completed", "result": info})
+                return
+            if state in ("FAILURE", "REVOKED"):
+                yield event("failed", {"status": "failed", "error": str(info)})
+                return
+
+            if state != last_state:
+                status = TASK_EVENT_STATUSES.get(state, state.lower())
+                yield event("status", {"status": status, "state": state})
+                last_state = state
+            if isinstance(info, dict) and info != last_info:
+                yield event("progress", info)
+                last_info = info
+
+        except Exception as e:
+            logger.error(f"Error streaming events for task {task_id}: {e}")
+            yield event("failed", {"status": "failed", "error": str(e)})
+            return
+
+        now = time.monotonic()
+        if now - started > settings.TASK_EVENTS_TIMEOUT:
+            # The client reconnects and picks up the current state
+            yield event(
+                "timeout", {"status": TASK_EVENT_STATUSES.get(last_state, "pending")}
+            )
+            return
+        if now - last_sent > TASK_EVENTS_KEEPALIVE:
+            yield ": keep-alive\n\n"
+            last_sent = now
+
+        time.sleep(settings.TASK_EVENTS_POLL_INTERVAL)